@@ -14,8 +14,29 @@ type Contract = {
   state: string
 }
 
+type CorrelationRow = {
+  politician: string
+  symbol: string
+  contract_id: string
+  company: string
+  agency: string
+  contract_amount: number
+  contract_date: string
+  first_trade_date: string
+  days_before_award: number
+  trade_count: number
+  signal: 'SUSPICIOUS' | 'INTERESTING'
+  score: number
+}
+
 type ContractCorrelation = {
-  contract: Contract
+  contract: {
+    contract_id: string
+    company_name: string
+    contract_amount: number
+    agency: string
+    award_date: string
+  }
   trades: Array<{
     politician_name: string
     transaction_type: string
@@ -44,49 +65,37 @@ export default function FederalContracts() {
 
       setContracts(contractData || [])
 
-      // Fetch congressional trades to find correlations
-      const { data: trades } = await supabase
-        .from('congressional_trades')
-        .select('*')
-        .in('stock_symbol', ['MSFT', 'PLTR', 'NVDA', 'AMZN', 'LMT', 'BA', 'NOC', 'GD'])
-
-      // Map companies to stock symbols
-      const companyToSymbol: { [key: string]: string } = {
-        'microsoft': 'MSFT',
-        'palantir': 'PLTR',
-        'amazon': 'AMZN',
-        'nvidia': 'NVDA',
-        'lockheed': 'LMT',
-        'boeing': 'BA',
-        'northrop': 'NOC'
-      }
+      // Correlations are joined and scored by the Python pipeline
+      // (contract_trade_correlations), so only the top rows come down
+      const { data: correlationRows } = await supabase
+        .from('contract_trade_correlations')
+        .select('politician, symbol, contract_id, company, agency, contract_amount, contract_date, first_trade_date, days_before_award, trade_count, signal, score')
+        .order('score', { ascending: false })
+        .limit(50)
 
-      // Find correlations
+      // Group politicians under their contract, keeping score order
+      const rows = (correlationRows || []) as CorrelationRow[]
       const correlationMap = new Map<string, ContractCorrelation>()
       
-      contractData?.forEach(contract => {
-        const companyLower = contract.company_name.toLowerCase()
-        let symbol = ''
-        
-        // Find matching symbol
-        for (const [key, sym] of Object.entries(companyToSymbol)) {
-          if (companyLower.includes(key)) {
-            symbol = sym
-            break
-          }
-        }
-
-        if (symbol) {
-          // Find trades for this symbol
-          const relatedTrades = trades?.filter(t => t.stock_symbol === symbol) || []
-          
-          if (relatedTrades.length > 0) {
-            correlationMap.set(contract.id.toString(), {
-              contract,
-              trades: relatedTrades
-            })
-          }
+      rows.forEach(row => {
+        if (!correlationMap.has(row.contract_id)) {
+          correlationMap.set(row.contract_id, {
+            contract: {
+              contract_id: row.contract_id,
+              company_name: row.company,
+              contract_amount: row.contract_amount,
+              agency: row.agency,
+              award_date: row.contract_date
+            },
+            trades: []
+          })
         }
+        correlationMap.get(row.contract_id)!.trades.push({
+          politician_name: row.politician,
+          transaction_type: 'BUY',
+          transaction_date: row.first_trade_date,
+          stock_symbol: row.symbol
+        })
       })
 
       setCorrelations(Array.from(correlationMap.values()))
@@ -110,7 +119,7 @@ export default function FederalContracts() {
             🚨 Contract-Trade Correlations Found!
           </h3>
           {correlations.map(({ contract, trades }) => (
-            <div key={contract.id} className="mb-4 p-3 bg-white rounded">
+            <div key={contract.contract_id} className="mb-4 p-3 bg-white rounded">
               <div className="flex justify-between items-start">
                 <div>
                   <p className="font-bold">{contract.company_name}</p>
@@ -0,0 +1,9 @@
+"""Smart money data scrapers.
+
+Importing the package (or any one scraper) loads no credentials and no
+heavy dependencies: the Supabase client (or a LocalStore, when
+SCRAPERS_LOCAL_DB is set) comes from config.get_store() on first use,
+and yfinance, pandas/NumPy and pyarrow are imported by the code paths
+that need them. Run a scraper from the repo root with e.g.
+`python -m scrapers.federal_contracts_scraper`.
+"""
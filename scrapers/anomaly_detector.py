@@ -0,0 +1,334 @@
+import argparse
+import json
+import os
+from bisect import bisect_right
+from collections import deque
+
+from .instrumentation import metrics
+from .records import Trade, from_ordinal
+
+DEFAULT_DETECTOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.anomaly_state.json')
+TRADE_COLUMNS = 'id,politician_name,stock_symbol,transaction_type,transaction_date,amount_range'
+
+
+class RollingWindow:
+    """Events from the last `days` days, in day order, with running counts and sums.
+
+    add and expire are O(1) amortized: events only ever leave from the left.
+    A late event (older than the newest one) is slotted into place, which
+    costs O(window) but only happens for out-of-order disclosures.
+    """
+
+    def __init__(self, days):
+        self.days = days
+        self.events = deque()
+        self.counts = {}
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, day, key, amount=0.0):
+        event = (day, key, amount)
+        if not self.events or day >= self.events[-1][0]:
+            self.events.append(event)
+        else:
+            days = [e[0] for e in self.events]
+            self.events.insert(bisect_right(days, day), event)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += amount
+
+    def expire(self, today):
+        """Drop events that fell out of the window ending on day `today`"""
+        horizon = today - self.days
+        while self.events and self.events[0][0] <= horizon:
+            _, key, amount = self.events.popleft()
+            self.total -= amount
+            if self.counts[key] == 1:
+                del self.counts[key]
+            else:
+                self.counts[key] -= 1
+        if not self.events:
+            # Don't let float error build up across refills
+            self.total = 0.0
+
+    def to_state(self):
+        return {'days': self.days, 'events': [list(e) for e in self.events]}
+
+    @classmethod
+    def from_state(cls, state):
+        window = cls(state['days'])
+        for day, key, amount in state['events']:
+            window.add(day, tuple(key) if isinstance(key, list) else key, amount)
+        return window
+
+
+class AnomalyDetector:
+    """Incremental detector for unusual congressional trading, fed one trade at a time.
+
+    Two kinds of alert come out of ingest():
+    - cluster: at least `cluster_members` different members bought the same
+      ticker within `cluster_days` days. Raised again each time another
+      member joins the cluster.
+    - volume_spike: a member's traded dollars over `spike_days` days reach
+      `spike_ratio` times what their own baseline (the `baseline_days`
+      before that) would predict, and `spike_ratio` times their average
+      trade, so one ordinary trade from an infrequent trader doesn't count.
+      Raised once per spike, re-armed when the member drops back below.
+
+    State is one short window per ticker and two per member, all expired
+    against the newest transaction date seen, so memory is bounded by the
+    baseline period rather than the whole history; idle keys are swept every
+    `sweep_every` trades. A trade already seen (same member, ticker and day,
+    the congressional_trades upsert key) inside the baseline is ignored, so
+    re-sent rows don't inflate the windows. Amounts are the midpoint of the
+    disclosed range, or its floor when it's open-ended.
+    """
+
+    def __init__(self, cluster_days=5, cluster_members=3, spike_days=7, baseline_days=180,
+                 spike_ratio=5.0, min_baseline_trades=5, sweep_every=10_000):
+        self.cluster_days = cluster_days
+        self.cluster_members = cluster_members
+        self.spike_days = spike_days
+        self.baseline_days = baseline_days
+        self.spike_ratio = spike_ratio
+        self.min_baseline_trades = min_baseline_trades
+        self.sweep_every = sweep_every
+        self.today = None
+        self.ingested = 0
+        # symbol -> RollingWindow of BUYs keyed by politician
+        self._symbols = {}
+        # politician -> [recent window, baseline window, spiking]
+        self._politicians = {}
+
+    @staticmethod
+    def _amount(trade):
+        if trade.amount_low is None:
+            return 0.0
+        if trade.amount_high is None:
+            return trade.amount_low
+        return (trade.amount_low + trade.amount_high) / 2
+
+    def ingest(self, trade):
+        """Add one records.Trade; returns the alerts (dicts) it raised"""
+        day = trade.transaction_date
+        if day is None:
+            return []
+        if self.today is None or day > self.today:
+            self.today = day
+        if day <= self.today - self.baseline_days:
+            # Disclosed too late to say anything about the current windows
+            metrics.count('anomaly_trades', outcome='late')
+            return []
+
+        state = self._politicians.get(trade.politician_name)
+        if state is None:
+            state = self._politicians[trade.politician_name] = [
+                RollingWindow(self.spike_days), RollingWindow(self.baseline_days), False]
+        recent, baseline, spiking = state
+        recent.expire(self.today)
+        baseline.expire(self.today)
+        if not recent:
+            state[2] = False
+
+        trade_key = (trade.stock_symbol, day)
+        if trade_key in baseline.counts:
+            metrics.count('anomaly_trades', outcome='duplicate')
+            return []
+
+        amount = self._amount(trade)
+        baseline.add(day, trade_key, amount)
+        if day > self.today - self.spike_days:
+            recent.add(day, trade_key, amount)
+
+        alerts = []
+        if trade.transaction_type == 'BUY' and day > self.today - self.cluster_days:
+            alert = self._check_cluster(trade, day)
+            if alert:
+                alerts.append(alert)
+
+        alert = self._check_spike(trade, state)
+        if alert:
+            alerts.append(alert)
+
+        self.ingested += 1
+        if self.sweep_every and self.ingested % self.sweep_every == 0:
+            self.sweep()
+
+        for alert in alerts:
+            metrics.count('anomalies', kind=alert['type'])
+        return alerts
+
+    def _check_cluster(self, trade, day):
+        window = self._symbols.get(trade.stock_symbol)
+        if window is None:
+            window = self._symbols[trade.stock_symbol] = RollingWindow(self.cluster_days)
+        window.expire(self.today)
+
+        new_member = trade.politician_name not in window.counts
+        window.add(day, trade.politician_name)
+        if not new_member or len(window.counts) < self.cluster_members:
+            return None
+
+        return {
+            'type': 'cluster',
+            'stock': trade.stock_symbol,
+            'politician': trade.politician_name,
+            'date': from_ordinal(day),
+            'members': sorted(window.counts),
+            'window_days': self.cluster_days
+        }
+
+    def _check_spike(self, trade, state):
+        recent, baseline, spiking = state
+        # Baseline is the part of the long window before the recent one
+        baseline_trades = len(baseline) - len(recent)
+        baseline_amount = baseline.total - recent.total
+        if baseline_trades < self.min_baseline_trades or baseline_amount <= 0:
+            return None
+
+        expected = baseline_amount * self.spike_days / (self.baseline_days - self.spike_days)
+        ratio = recent.total / expected
+        typical = baseline_amount / baseline_trades
+        if ratio < self.spike_ratio or recent.total < self.spike_ratio * typical:
+            state[2] = False
+            return None
+        if spiking:
+            return None
+
+        state[2] = True
+        return {
+            'type': 'volume_spike',
+            'stock': trade.stock_symbol,
+            'politician': trade.politician_name,
+            'date': from_ordinal(trade.transaction_date),
+            'amount': round(recent.total, 2),
+            'expected': round(expected, 2),
+            'ratio': round(ratio, 2),
+            'window_days': self.spike_days
+        }
+
+    def sweep(self):
+        """Expire every window and forget tickers and members with nothing left in them"""
+        if self.today is None:
+            return
+        for symbol, window in list(self._symbols.items()):
+            window.expire(self.today)
+            if not window:
+                del self._symbols[symbol]
+        for politician, (recent, baseline, _) in list(self._politicians.items()):
+            recent.expire(self.today)
+            baseline.expire(self.today)
+            if not baseline:
+                del self._politicians[politician]
+
+    def ingest_all(self, trades):
+        """Ingest trades in transaction date order; returns every alert raised"""
+        alerts = []
+        with metrics.stage('anomalies') as stage:
+            for trade in sorted(trades, key=lambda t: t.transaction_date or 0):
+                alerts.extend(self.ingest(trade))
+                stage.rows += 1
+        return alerts
+
+    def to_state(self):
+        self.sweep()
+        return {
+            'today': self.today,
+            'ingested': self.ingested,
+            'symbols': {symbol: window.to_state() for symbol, window in self._symbols.items()},
+            'politicians': {politician: [recent.to_state(), baseline.to_state(), spiking]
+                            for politician, (recent, baseline, spiking) in self._politicians.items()}
+        }
+
+    def load_state(self, state):
+        self.today = state.get('today')
+        self.ingested = state.get('ingested', 0)
+        self._symbols = {symbol: RollingWindow.from_state(window)
+                         for symbol, window in state.get('symbols', {}).items()}
+        self._politicians = {politician: [RollingWindow.from_state(recent), RollingWindow.from_state(baseline),
+                                          spiking]
+                             for politician, (recent, baseline, spiking) in state.get('politicians', {}).items()}
+        return self
+
+    def save(self, path=DEFAULT_DETECTOR_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_state(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_DETECTOR_PATH, **kwargs):
+        """Detector with the windows saved at path, or an empty one"""
+        detector = cls(**kwargs)
+        if os.path.exists(path):
+            with open(path) as f:
+                detector.load_state(json.load(f))
+        return detector
+
+
+def describe(alert):
+    if alert['type'] == 'cluster':
+        return (f"🚨 CLUSTER: {len(alert['members'])} members bought {alert['stock']} within "
+                f"{alert['window_days']} days (latest {alert['politician']} on {alert['date']})")
+    return (f"📈 VOLUME SPIKE: {alert['politician']} traded ${alert['amount']:,.0f} in {alert['window_days']} days, "
+            f"{alert['ratio']:.1f}x their usual (latest {alert['stock']} on {alert['date']})")
+
+
+def detect_new_trades(client, detector, state=None, sink=None, path=None, page_size=1000):
+    """Feed congressional_trades rows added since the last run through the detector.
+
+    Rows are paged by id from the SyncState mark 'anomalies:congressional_trades',
+    so each run only reads what's new. Alerts go to sink when given. With a
+    path the windows are saved there before the mark moves, so a crash can
+    replay trades (which the detector dedupes) but never skip them.
+    """
+    from .streaming_correlations import iter_table
+
+    last_id = state.get('anomalies:congressional_trades') if state else None
+    filters = [lambda q: q.gt('id', last_id)] if last_id is not None else []
+    rows = list(iter_table(client, 'congressional_trades', TRADE_COLUMNS, filters=filters, page_size=page_size))
+
+    alerts = detector.ingest_all(Trade.from_row(row) for row in rows)
+    for alert in alerts:
+        print(describe(alert))
+        if sink:
+            sink.write(alert)
+
+    if path:
+        detector.save(path)
+    if state and rows:
+        state.advance('anomalies:congressional_trades', max(row['id'] for row in rows))
+    print(f"✅ Checked {len(rows)} new trades, {len(alerts)} alerts")
+    return alerts
+
+
+if __name__ == "__main__":
+    from .config import get_store
+    from .streaming_correlations import JsonlSink
+    from .sync_state import SyncState
+
+    parser = argparse.ArgumentParser(description="Flag trade clusters and volume spikes in new congressional trades")
+    parser.add_argument('--out', help="Also write alerts to this JSONL file")
+    parser.add_argument('--state-file', default=DEFAULT_DETECTOR_PATH, help="Where the rolling windows are kept")
+    parser.add_argument('--cluster-days', type=int, default=5)
+    parser.add_argument('--cluster-members', type=int, default=3)
+    parser.add_argument('--spike-days', type=int, default=7)
+    parser.add_argument('--baseline-days', type=int, default=180)
+    parser.add_argument('--spike-ratio', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("TRADE ANOMALY DETECTOR")
+    print("=" * 50)
+
+    detector = AnomalyDetector.load(args.state_file, cluster_days=args.cluster_days,
+                                    cluster_members=args.cluster_members, spike_days=args.spike_days,
+                                    baseline_days=args.baseline_days, spike_ratio=args.spike_ratio)
+    sink = JsonlSink(args.out) if args.out else None
+    try:
+        detect_new_trades(get_store(), detector, state=SyncState(), sink=sink, path=args.state_file)
+    finally:
+        if sink:
+            sink.close()
+    metrics.report()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from .instrumentation import metrics
+from .usaspending_fetcher import BASE_URL, USAspendingFetcher, normalize_award
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.backfill')
+
+
+def make_shards(start_date, end_date, shard_days=30):
+    """Split [start_date, end_date] into consecutive inclusive (start, end) shards"""
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        shard_end = min(shard_start + timedelta(days=shard_days - 1), end_date)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + timedelta(days=1)
+    return shards
+
+
+class USAspendingShardFetcher:
+    """Picklable fetcher for worker processes; each worker gets its own transport"""
+
+    def __init__(self, base_url=BASE_URL, window_days=7, threads_per_shard=2):
+        self.base_url = base_url
+        self.window_days = window_days
+        self.threads_per_shard = threads_per_shard
+
+    def __call__(self, start_date, end_date):
+        fetcher = USAspendingFetcher(self.base_url, max_workers=self.threads_per_shard,
+                                     window_days=self.window_days)
+        return fetcher.iter_awards(start_date, end_date)
+
+
+def shard_path(checkpoint_dir, shard):
+    start_date, end_date = shard
+    return os.path.join(checkpoint_dir, f"shard-{start_date.isoformat()}_{end_date.isoformat()}.jsonl")
+
+
+def run_shard(shard, fetcher, checkpoint_dir, min_amount=10000000):
+    """Fetch, normalize and checkpoint one shard; returns (shard, row count).
+
+    Rows are sorted by (award_date, contract_id) and written to a temp file
+    that is renamed into place, so a file only exists once its shard is
+    complete. That file is the checkpoint.
+    """
+    contracts = []
+    for count, item in enumerate(fetcher(*shard)):
+        # An award without an id gets one numbered within the shard; the shard's start
+        # keeps it apart from other shards' in iter_merged
+        contract = normalize_award(item, f"{shard[0].isoformat()}-{count}")
+        if contract and contract['contract_amount'] > min_amount:
+            contracts.append(contract)
+    contracts.sort(key=lambda c: (c['award_date'], c['contract_id']))
+
+    path = shard_path(checkpoint_dir, shard)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for contract in contracts:
+            f.write(json.dumps(contract, sort_keys=True) + '\n')
+    os.replace(tmp_path, path)
+    return shard, len(contracts)
+
+
+def iter_merged(shards, checkpoint_dir):
+    """Stream every checkpointed row in shard order, first copy of each contract_id wins"""
+    seen = set()
+    for shard in sorted(shards):
+        with open(shard_path(checkpoint_dir, shard)) as f:
+            for line in f:
+                contract = json.loads(line)
+                if contract['contract_id'] in seen:
+                    continue
+                seen.add(contract['contract_id'])
+                yield contract
+
+
+def run_backfill(start_date, end_date, fetcher=None, shard_days=30, max_workers=None,
+                 checkpoint_dir=DEFAULT_CHECKPOINT_DIR, executor_class=ProcessPoolExecutor):
+    """Run every shard not yet checkpointed across a process pool.
+
+    Returns the full shard list; completed shards are skipped, so rerunning
+    after a crash resumes where it stopped. The fetcher is any picklable
+    callable (start_date, end_date) -> iterable of raw award rows.
+    """
+    fetcher = fetcher or USAspendingShardFetcher()
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    shards = make_shards(start_date, end_date, shard_days)
+    pending = [shard for shard in shards if not os.path.exists(shard_path(checkpoint_dir, shard))]
+    print(f"🗂️ {len(shards)} shards, {len(shards) - len(pending)} already done")
+
+    failed = []
+    if pending:
+        with executor_class(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = {executor.submit(run_shard, shard, fetcher, checkpoint_dir): shard for shard in pending}
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    _, count = future.result()
+                    print(f"  ✓ {shard[0]} → {shard[1]}: {count} contracts")
+                except Exception as e:
+                    failed.append(shard)
+                    print(f"  ✗ {shard[0]} → {shard[1]}: {e}")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} shards failed; rerun to retry them")
+    return shards
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill USAspending contract history in parallel shards")
+    parser.add_argument('--start', required=True, type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument('--end', default=date.today(), type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument('--shard-days', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CHECKPOINT_DIR)
+    parser.add_argument('--out', help="Write the merged contracts to this JSONL file")
+    parser.add_argument('--write-db', action='store_true', help="Upsert merged contracts into federal_contracts")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("FEDERAL CONTRACTS BACKFILL")
+    print("=" * 50)
+
+    shards = run_backfill(args.start, args.end, shard_days=args.shard_days,
+                          max_workers=args.workers, checkpoint_dir=args.checkpoint_dir)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            for contract in iter_merged(shards, args.checkpoint_dir):
+                f.write(json.dumps(contract, sort_keys=True) + '\n')
+
+    if args.write_db:
+        from .batch_writer import BatchUpserter
+        from .config import get_store
+
+        writer = BatchUpserter(get_store(), 'federal_contracts', 'contract_id', ignore_duplicates=True)
+        stats = writer.write(iter_merged(shards, args.checkpoint_dir))
+        print(f"✅ {stats['inserted']} contracts added, {stats['skipped']} skipped")
+
+    print("\nBackfill complete!")
+    # Shards run in worker processes, so only the merge and write show up here
+    metrics.report()
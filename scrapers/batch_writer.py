@@ -0,0 +1,114 @@
+from .instrumentation import metrics
+
+# PostgREST's default max-rows: a select can't return more than this in one response
+MAX_ROWS = 1000
+
+
+class BatchUpserter:
+    """Buffers rows and writes them with one upsert per chunk.
+
+    Only uses the table(...).select/in_/upsert/execute subset of the Supabase
+    client, so any object with that shape (e.g. an in-memory fake) works.
+    Rows are deduplicated on the conflict columns inside each chunk (last
+    one wins, as Postgres refuses to upsert the same key twice in one
+    statement) and the writer keeps inserted/updated/skipped counts.
+    """
+
+    def __init__(self, client, table, on_conflict, chunk_size=500,
+                 ignore_duplicates=False, count_existing=True):
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.key_columns = [column.strip() for column in on_conflict.split(',')]
+        self.chunk_size = chunk_size
+        self.ignore_duplicates = ignore_duplicates
+        self.count_existing = count_existing
+        self.stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        self.requests = 0
+        self._buffer = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def _key(self, row):
+        return tuple(str(row[column]) for column in self.key_columns)
+
+    def add(self, row):
+        if any(row.get(column) is None for column in self.key_columns):
+            self.stats['skipped'] += 1
+            return
+
+        key = self._key(row)
+        if key in self._buffer:
+            # Same key twice in one chunk, keep the latest version
+            self.stats['skipped'] += 1
+            del self._buffer[key]
+        self._buffer[key] = row
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write(self, rows):
+        for row in rows:
+            self.add(row)
+        self.flush()
+        return self.stats
+
+    def _existing_keys(self, keys):
+        """Which of these keys are already in the table (usually one round trip)
+
+        Every key column is filtered with in_, so for a composite key only
+        rows whose values all occur among the keys come back. A response of
+        MAX_ROWS rows may have been cut off by PostgREST, so the keys are
+        split in half and looked up again.
+        """
+        keys = sorted(keys)
+        query = self.client.table(self.table).select(','.join(self.key_columns))
+        for position, column in enumerate(self.key_columns):
+            query = query.in_(column, sorted({key[position] for key in keys}))
+        with metrics.timed('db_request_seconds', table=self.table, op='select'):
+            result = query.execute()
+        self.requests += 1
+
+        rows = result.data or []
+        if len(rows) >= MAX_ROWS and len(keys) > 1:
+            middle = len(keys) // 2
+            return self._existing_keys(keys[:middle]) | self._existing_keys(keys[middle:])
+        return {self._key(row) for row in rows} & set(keys)
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        keys = list(self._buffer)
+        rows = list(self._buffer.values())
+        self._buffer = {}
+
+        with metrics.stage('write') as stage:
+            # Without the lookup every row is reported as inserted
+            existing = self._existing_keys(keys) if self.count_existing else set()
+
+            if self.ignore_duplicates:
+                # Existing rows are left alone, only send the new ones
+                rows = [row for key, row in zip(keys, rows) if key not in existing]
+
+            if rows:
+                with metrics.timed('db_request_seconds', table=self.table, op='upsert'):
+                    self.client.table(self.table).upsert(
+                        rows,
+                        on_conflict=self.on_conflict,
+                        ignore_duplicates=self.ignore_duplicates
+                    ).execute()
+                self.requests += 1
+            stage.rows = len(keys)
+
+        new_rows = len(keys) - len(existing)
+        self.stats['inserted'] += new_rows
+        if self.ignore_duplicates:
+            self.stats['skipped'] += len(existing)
+        else:
+            self.stats['updated'] += len(existing)
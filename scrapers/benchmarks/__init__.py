@@ -0,0 +1 @@
+"""Synthetic-data benchmarks; run with `python -m scrapers.benchmarks.run_benchmarks`"""
@@ -0,0 +1,159 @@
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """The subset of the PostgREST query builder the scrapers use"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self._columns = '*'
+        self._filters = []
+        self._order = None
+        self._limit = None
+        self._write = None
+
+    def select(self, columns='*'):
+        self._columns = columns
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(('in', column, {str(value)}))
+        return self
+
+    def in_(self, column, values):
+        self._filters.append(('in', column, {str(value) for value in values}))
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(('gt', column, value))
+        return self
+
+    def lte(self, column, value):
+        self._filters.append(('lte', column, value))
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def insert(self, rows):
+        self._write = ('insert', rows, None, False)
+        return self
+
+    def upsert(self, rows, on_conflict='', ignore_duplicates=False):
+        self._write = ('upsert', rows, on_conflict, ignore_duplicates)
+        return self
+
+    def execute(self):
+        self.client.requests += 1
+        if self._write:
+            return FakeResult(self.client._write(self.table, *self._write))
+        return FakeResult(self.client._select(self.table, self))
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase client.
+
+    Equality and in_ lookups go through per-column hash indexes built on
+    first use, and upserts through a dict per conflict key, so the fake
+    stays out of the way of the code being measured even at 10^6 rows.
+    """
+
+    def __init__(self, tables=None):
+        self.tables = {}
+        self._indexes = {}
+        self._unique = {}
+        self._next_id = {}
+        self.requests = 0
+        for table, rows in (tables or {}).items():
+            self.load(table, rows)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def load(self, table, rows):
+        for row in rows:
+            self._append(table, dict(row))
+
+    def _append(self, table, row):
+        rows = self.tables.setdefault(table, [])
+        if 'id' not in row:
+            row['id'] = self._next_id.get(table, len(rows)) + 1
+        self._next_id[table] = max(self._next_id.get(table, 0), row['id'])
+        rows.append(row)
+        for (index_table, column), index in self._indexes.items():
+            if index_table == table:
+                index.setdefault(str(row.get(column)), []).append(row)
+        for (unique_table, columns), index in self._unique.items():
+            if unique_table == table:
+                index[tuple(str(row.get(column)) for column in columns)] = row
+
+    def _index(self, table, column):
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = self._indexes[(table, column)] = {}
+            for row in self.tables.get(table, []):
+                index.setdefault(str(row.get(column)), []).append(row)
+        return index
+
+    def _unique_index(self, table, columns):
+        index = self._unique.get((table, columns))
+        if index is None:
+            index = self._unique[(table, columns)] = {
+                tuple(str(row.get(column)) for column in columns): row
+                for row in self.tables.get(table, [])
+            }
+        return index
+
+    def _select(self, table, query):
+        rows = None
+        for kind, column, value in query._filters:
+            if kind == 'in':
+                index = self._index(table, column)
+                rows = [row for key in value for row in index.get(key, [])]
+                break
+        if rows is None:
+            rows = self.tables.get(table, [])
+
+        for kind, column, value in query._filters:
+            if kind == 'in':
+                rows = [row for row in rows if str(row.get(column)) in value]
+            elif kind == 'gt':
+                rows = [row for row in rows if row[column] > value]
+            elif kind == 'lte':
+                rows = [row for row in rows if row[column] <= value]
+
+        if query._order:
+            column, desc = query._order
+            rows = sorted(rows, key=lambda row: row[column], reverse=desc)
+        if query._limit is not None:
+            rows = rows[:query._limit]
+
+        if query._columns.strip() == '*':
+            return [dict(row) for row in rows]
+        columns = [column.strip() for column in query._columns.split(',')]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def _write(self, table, kind, rows, on_conflict, ignore_duplicates):
+        rows = rows if isinstance(rows, list) else [rows]
+        if kind == 'insert':
+            for row in rows:
+                self._append(table, dict(row))
+            return rows
+
+        columns = tuple(column.strip() for column in on_conflict.split(','))
+        index = self._unique_index(table, columns)
+        for row in rows:
+            stored = index.get(tuple(str(row.get(column)) for column in columns))
+            if stored is None:
+                self._append(table, dict(row))
+            elif not ignore_duplicates:
+                stored.update(row)
+        return rows
@@ -0,0 +1,214 @@
+import math
+import random
+from datetime import date, timedelta
+
+# Contractors the ticker table knows, as USAspending spells them
+LISTED_COMPANIES = [
+    ('Microsoft Corporation', 'MSFT'),
+    ('Amazon Web Services', 'AMZN'),
+    ('Palantir Technologies', 'PLTR'),
+    ('NVIDIA Corporation', 'NVDA'),
+    ('Lockheed Martin', 'LMT'),
+    ('The Boeing Company', 'BA'),
+    ('Raytheon Company', 'RTX'),
+    ('Northrop Grumman Systems', 'NOC'),
+    ('General Dynamics Information Technology', 'GD'),
+    ('SpaceX', 'SPACE'),
+    ('L3Harris Technologies', 'LHX'),
+    ('Huntington Ingalls Industries', 'HII'),
+    ('Leidos Inc', 'LDOS'),
+    ('Booz Allen Hamilton', 'BAH'),
+    ('CACI International', 'CACI'),
+]
+
+# Words that don't contain any alias, for the long tail of private contractors
+_NAME_WORDS = ['Acorn', 'Birch', 'Cobalt', 'Dune', 'Ember', 'Fjord', 'Granite', 'Harbor',
+               'Ivory', 'Juniper', 'Kestrel', 'Lumen', 'Nimbus', 'Orchid', 'Prairie',
+               'Quartz', 'Ridge', 'Summit', 'Tundra', 'Willow']
+_NAME_SUFFIXES = ['LLC', 'Inc', 'Group', 'Solutions', 'Services', 'Partners']
+
+AGENCIES = ['Department of Defense', 'Department of the Army', 'U.S. Air Force', 'NASA',
+            'Department of Energy', 'Department of Homeland Security', 'NSA', 'CIA']
+STATES = ['VA', 'MD', 'TX', 'CA', 'WA', 'CO', 'FL', 'AL', 'NY', 'AZ']
+PARTIES = ['Democrat', 'Republican']
+AMOUNT_RANGES = ['$1K - $15K', '$15K - $50K', '$50K - $100K', '$100K - $250K',
+                 '$250K - $500K', '$500K - $1M', '$1M - $5M']
+# Plenty of tickers nobody wins contracts under, so most trades never join
+OTHER_TICKERS = [f"X{i:03d}" for i in range(400)]
+FUNDS = ['Vanguard Group Inc', 'Blackrock Inc.', 'State Street Corporation', 'FMR, LLC',
+         'Geode Capital Management, LLC', 'Capital World Investors', 'Norges Bank Investment Management']
+
+START_DATE = date(2023, 1, 1)
+SPAN_DAYS = 730
+# Above this many rows the date range stretches with the row count, so the
+# matches per contract stay flat and the join output grows linearly
+SPAN_ROWS = 10_000
+
+
+def _private_name(rng, pool_size):
+    """One of pool_size repeatable private company names"""
+    number = rng.randrange(pool_size)
+    word = _NAME_WORDS[number % len(_NAME_WORDS)]
+    suffix = _NAME_SUFFIXES[number // len(_NAME_WORDS) % len(_NAME_SUFFIXES)]
+    return f"{word} {suffix} {number}"
+
+
+def _span(rows):
+    return max(SPAN_DAYS, rows * SPAN_DAYS // SPAN_ROWS)
+
+
+def _day(rng, span):
+    return START_DATE + timedelta(days=rng.randrange(span))
+
+
+def _company(rng, n, listed_share):
+    """(company name, ticker or None); only listed_share of awards go to listed contractors"""
+    if rng.random() < listed_share:
+        return rng.choice(LISTED_COMPANIES)
+    return _private_name(rng, max(n // 10, 1)), None
+
+
+def make_contracts(n, seed=0, listed_share=0.05):
+    """federal_contracts rows, shaped like get_mock_contracts plus the table id"""
+    rng = random.Random(seed)
+    span = _span(n)
+    contracts = []
+    for i in range(n):
+        company, _ = _company(rng, n, listed_share)
+        contracts.append({
+            'id': i + 1,
+            'company_name': company,
+            'contract_amount': float(rng.randrange(10_000_000, 2_000_000_000, 1000)),
+            'agency': rng.choice(AGENCIES),
+            'award_date': _day(rng, span).isoformat(),
+            'description': 'Synthetic Contract',
+            'contract_id': f"SYN-{seed}-{i:07d}",
+            'state': rng.choice(STATES)
+        })
+    return contracts
+
+
+def make_awards(n, seed=0, listed_share=0.05):
+    """Raw spending_by_award rows, the input of normalize_award"""
+    return [{
+        'Award ID': contract['contract_id'],
+        'Recipient Name': contract['company_name'].upper(),
+        'Award Amount': contract['contract_amount'],
+        'Awarding Agency': contract['agency'],
+        'Start Date': contract['award_date'],
+        'Description': contract['description'].upper(),
+        'Place of Performance State Code': contract['state'],
+        'generated_internal_id': f"CONT_AWD_{contract['contract_id']}"
+    } for contract in make_contracts(n, seed, listed_share)]
+
+
+def _ticker(rng, listed_share):
+    if rng.random() < listed_share:
+        return rng.choice(LISTED_COMPANIES)[1]
+    return rng.choice(OTHER_TICKERS)
+
+
+def make_congress_trades(m, seed=0, listed_share=0.1, politicians=500):
+    """congressional_trades rows as sync_to_database writes them, plus the table id"""
+    rng = random.Random(seed + 1)
+    span = _span(m)
+    trades = []
+    for i in range(m):
+        member = rng.randrange(politicians)
+        trades.append({
+            'id': i + 1,
+            'politician_name': f"Member {member}",
+            'politician_party': PARTIES[member % 2],
+            'politician_state': STATES[member % len(STATES)],
+            'stock_symbol': _ticker(rng, listed_share),
+            'transaction_type': 'BUY' if rng.random() < 0.5 else 'SELL',
+            'amount_range': rng.choice(AMOUNT_RANGES),
+            'transaction_date': _day(rng, span).isoformat()
+        })
+    return trades
+
+
+def make_quiver_trades(m, seed=0, listed_share=0.1, politicians=500):
+    """QuiverQuant congress/trades rows, shaped like _mock_congress_trades"""
+    return [{
+        'Representative': trade['politician_name'],
+        'Transaction': 'Purchase' if trade['transaction_type'] == 'BUY' else 'Sale',
+        'Ticker': trade['stock_symbol'],
+        'Amount': trade['amount_range'],
+        'Date': trade['transaction_date'],
+        'ReportDate': (date.fromisoformat(trade['transaction_date']) + timedelta(days=30)).isoformat(),
+        'Party': trade['politician_party'],
+        'State': trade['politician_state']
+    } for trade in make_congress_trades(m, seed, listed_share, politicians)]
+
+
+def make_quiver_contracts(n, seed=0, listed_share=0.05):
+    """QuiverQuant government/contracts rows, shaped like _mock_contracts"""
+    return [{
+        'Company': contract['company_name'],
+        'Amount': int(contract['contract_amount']),
+        'Agency': contract['agency'],
+        'Date': contract['award_date'],
+        'Description': contract['description']
+    } for contract in make_contracts(n, seed, listed_share)]
+
+
+def make_holder_records(k, seed=0):
+    """Yahoo institutional_holders records (Holder, Shares, Value, Date Reported)"""
+    import pandas as pd
+
+    rng = random.Random(seed + 2)
+    span = _span(k)
+    records = []
+    for _ in range(k):
+        shares = rng.randrange(100_000, 500_000_000)
+        records.append({
+            'Holder': rng.choice(FUNDS),
+            'Shares': shares,
+            'Value': shares * rng.uniform(5, 900),
+            'Date Reported': pd.Timestamp(_day(rng, span))
+        })
+    return records
+
+
+def make_holdings(k, seed=0):
+    """institutional_trades rows, shaped like scrape_institutional_holdings output"""
+    rng = random.Random(seed + 3)
+    holdings = []
+    for record in make_holder_records(k, seed):
+        symbol = _ticker(rng, 0.5)
+        holdings.append({
+            'investor_name': record['Holder'],
+            'investor_type': 'INSTITUTIONAL',
+            'stock_symbol': symbol,
+            'company_name': f"{symbol} Corp",
+            'transaction_type': 'HOLD',
+            'shares_amount': int(record['Shares']),
+            'value_amount': float(record['Value']),
+            'filing_date': record['Date Reported'].strftime('%Y-%m-%d'),
+            'source': '13F'
+        })
+    return holdings
+
+
+def make_trade_correlations(n, seed=0, listed_share=0.5):
+    """Correlations with the politician/stock/trade_date keys the price enrichment reads"""
+    rng = random.Random(seed + 4)
+    return [{
+        'politician': f"Member {rng.randrange(500)}",
+        'stock': _ticker(rng, listed_share),
+        'trade_date': _day(rng, SPAN_DAYS).isoformat()
+    } for _ in range(n)]
+
+
+def make_prices(symbols, seed=0, days=SPAN_DAYS + 120):
+    """symbol,date,close rows: a daily random walk per symbol over the weekdays from START_DATE"""
+    rng = random.Random(seed + 5)
+    weekdays = [d for d in (START_DATE + timedelta(days=i) for i in range(days)) if d.weekday() < 5]
+    rows = []
+    for symbol in symbols:
+        close = rng.uniform(5, 500)
+        for day in weekdays:
+            close *= math.exp(rng.gauss(0.0003, 0.02))
+            rows.append({'symbol': symbol, 'date': day.isoformat(), 'close': round(close, 4)})
+    return rows
@@ -0,0 +1,355 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from . import generators
+from ..config import Config
+from ..instrumentation import metrics
+from ..records import Contract, Trade
+from .fake_supabase import FakeSupabase
+
+SCRAPERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeQuiverSession:
+    """Serves pre-generated QuiverQuant payloads by endpoint"""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def request(self, method, url, params=None, json=None, headers=None, timeout=None):
+        return FakeResponse(self.payloads[url.rsplit('/beta/', 1)[1]])
+
+
+class FakeTicker:
+    """yfinance.Ticker stand-in backed by a prebuilt holders frame"""
+
+    def __init__(self, holders, symbol):
+        self.institutional_holders = holders
+        self.info = {'longName': f"{symbol} Corp"}
+
+
+def _tracker(client):
+    from ..federal_contracts_scraper import FederalContractsTracker
+
+    return FederalContractsTracker(client=client)
+
+
+def _quiver_client(congress, contracts):
+    from ..http_transport import Transport
+    from ..quiver_client import QuiverClient
+
+    session = FakeQuiverSession({'congress/trades': congress, 'government/contracts': contracts,
+                                 'lobbying': []})
+    # An empty Config so nothing is read from the environment or .env.local
+    return QuiverClient(api_key='benchmark', transport=Transport(rates={}, session=session),
+                        client=FakeSupabase(), config=Config())
+
+
+# Each benchmark is (setup, prepare, max size). setup(size, seed) generates
+# the data once; prepare(data) builds fresh clients/tables before every
+# repetition and returns the zero-argument callable that is timed, which
+# returns how many rows came out. max size caps the quadratic paths that
+# would take hours at 10^6.
+
+def setup_correlations(size, seed):
+    return FakeSupabase({'federal_contracts': generators.make_contracts(size, seed),
+                         'congressional_trades': generators.make_congress_trades(size, seed)})
+
+
+def prepare_correlations(engine):
+    def prepare(client):
+        tracker = _tracker(client)
+        return lambda: len(tracker.find_contract_trade_correlations(engine=engine))
+    return prepare
+
+
+def setup_sql_correlations(size, seed):
+    from ..local_store import LocalStore
+    from ..ticker_resolver import get_resolver
+
+    store = LocalStore(':memory:')
+    store.table('federal_contracts').insert(generators.make_contracts(size, seed)).execute()
+    # The generator repeats a few (politician, symbol, date) keys, which the table's unique key folds
+    store.table('congressional_trades').upsert(generators.make_congress_trades(size, seed),
+                                               on_conflict='politician_name,stock_symbol,transaction_date').execute()
+    # A long-lived store has its company names resolved already
+    store.resolve_symbols(get_resolver())
+    return store
+
+
+def setup_quiver_correlations(size, seed):
+    return generators.make_quiver_trades(size, seed), generators.make_quiver_contracts(size, seed)
+
+
+def prepare_quiver_correlations(engine):
+    def prepare(data):
+        client = _quiver_client(*data)
+        return lambda: len(client.find_correlations(engine=engine))
+    return prepare
+
+
+def setup_federal_sync(size, seed):
+    # Every other contract is already stored, so both the insert and skip paths run
+    contracts = generators.make_contracts(size, seed)
+    return [Contract.from_row(c) for c in contracts], contracts[::2]
+
+
+def prepare_federal_sync(data):
+    contracts, stored = data
+    tracker = _tracker(FakeSupabase({'federal_contracts': stored}))
+
+    def run():
+        stats = tracker.sync_to_database(contracts)
+        return stats['inserted'] + stats['skipped']
+    return run
+
+
+def setup_quiver_sync(size, seed):
+    return generators.make_quiver_trades(size, seed)
+
+
+def prepare_quiver_sync(trades):
+    # No contracts: find_correlations is measured on its own above
+    client = _quiver_client(trades, [])
+    return lambda: client.sync_to_database()['trades_synced']
+
+
+def setup_anomalies(size, seed):
+    # In date order, as ingest_all feeds them
+    trades = [Trade.from_row(t) for t in generators.make_congress_trades(size, seed)]
+    return sorted(trades, key=lambda t: t.transaction_date)
+
+
+def prepare_anomalies(trades):
+    from ..anomaly_detector import AnomalyDetector
+
+    detector = AnomalyDetector()
+    # Alerts are far fewer than trades; count trades so rows/s compares across sizes
+    return lambda: sum(1 for trade in trades if detector.ingest(trade) is not None)
+
+
+def setup_normalize_awards(size, seed):
+    return generators.make_awards(size, seed)
+
+
+def prepare_normalize_awards(awards):
+    from ..usaspending_fetcher import normalize_award
+
+    return lambda: sum(1 for count, item in enumerate(awards) if normalize_award(item, count))
+
+
+def setup_institutional(size, seed, per_symbol=100):
+    import pandas as pd
+
+    records = generators.make_holder_records(size, seed)
+    frames = {}
+    for start in range(0, size, per_symbol):
+        frames[f"S{start // per_symbol:05d}"] = pd.DataFrame(records[start:start + per_symbol])
+    return frames, per_symbol
+
+
+def prepare_institutional(data):
+    from ..institutional_scraper import scrape_institutional_holdings
+
+    frames, per_symbol = data
+    client = FakeSupabase()
+    return lambda: len(scrape_institutional_holdings(
+        symbols=list(frames), top_n=per_symbol, client=client,
+        ticker_factory=lambda symbol: FakeTicker(frames[symbol], symbol)
+    ))
+
+
+def setup_price_enrichment(size, seed):
+    import pandas as pd
+
+    from ..price_enrichment import PriceTable
+
+    symbols = [ticker for _, ticker in generators.LISTED_COMPANIES] + generators.OTHER_TICKERS
+    prices = PriceTable.from_long(pd.DataFrame(generators.make_prices(symbols, seed)))
+    return generators.make_trade_correlations(size, seed), prices
+
+
+def prepare_price_enrichment(data):
+    from ..price_enrichment import enrich_correlations
+
+    correlations, prices = data
+    return lambda: len(enrich_correlations(correlations, prices=prices))
+
+
+BENCHMARKS = {
+    'correlations_python': (setup_correlations, prepare_correlations('python'), 10 ** 6),
+    'correlations_vectorized': (setup_correlations, prepare_correlations('vectorized'), 10 ** 6),
+    'correlations_records': (setup_correlations, prepare_correlations('records'), 10 ** 6),
+    'correlations_sql': (setup_sql_correlations, prepare_correlations('sql'), 10 ** 6),
+    'quiver_correlations_python': (setup_quiver_correlations, prepare_quiver_correlations('python'), 10 ** 3),
+    'quiver_correlations_vectorized': (setup_quiver_correlations, prepare_quiver_correlations('vectorized'),
+                                       10 ** 6),
+    'federal_sync': (setup_federal_sync, prepare_federal_sync, 10 ** 6),
+    'quiver_sync': (setup_quiver_sync, prepare_quiver_sync, 10 ** 6),
+    'anomalies': (setup_anomalies, prepare_anomalies, 10 ** 6),
+    'normalize_awards': (setup_normalize_awards, prepare_normalize_awards, 10 ** 6),
+    'institutional_scrape': (setup_institutional, prepare_institutional, 10 ** 6),
+    'price_enrichment': (setup_price_enrichment, prepare_price_enrichment, 10 ** 6),
+}
+
+
+def measure(prepare, data, repeat=3, memory=True):
+    """Wall times of `repeat` runs, then one more run under tracemalloc for peak memory.
+
+    The scrapers' own progress prints go to /dev/null while measuring. The
+    per-stage breakdown comes from the instrumentation of the last timed run.
+    """
+    timings = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            run = prepare(data)
+            gc.collect()
+            metrics.reset()
+            start = time.perf_counter()
+            output = run()
+            timings.append(time.perf_counter() - start)
+        stages = metrics.summary()['stages']
+
+        peak_mb = None
+        if memory:
+            run = prepare(data)
+            gc.collect()
+            tracemalloc.start()
+            run()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+    return timings, peak_mb, output, stages
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRAPERS_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(names, sizes, seed=0, repeat=3, memory=True):
+    import numpy as np
+    import pandas as pd
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'seed': seed,
+            'repeat': repeat
+        },
+        'results': []
+    }
+
+    for name in names:
+        setup, prepare, max_size = BENCHMARKS[name]
+        for size in sizes:
+            if size > max_size:
+                print(f"  - {name} @ {size:,}: skipped (capped at {max_size:,})", file=sys.stderr)
+                continue
+
+            data = setup(size, seed)
+            timings, peak_mb, output, stages = measure(prepare, data, repeat, memory)
+            del data
+
+            best = min(timings)
+            result = {
+                'benchmark': name,
+                'size': size,
+                'seconds': [round(t, 6) for t in timings],
+                'best': round(best, 6),
+                'median': round(statistics.median(timings), 6),
+                'rows_per_second': round(size / best) if best else None,
+                'peak_mb': round(peak_mb, 2) if peak_mb is not None else None,
+                'output_rows': output,
+                'stages': stages
+            }
+            report['results'].append(result)
+            memory_note = f", {result['peak_mb']} MB peak" if memory else ''
+            print(f"  ✓ {name} @ {size:,}: {best:.3f}s best{memory_note}, {output:,} rows out",
+                  file=sys.stderr)
+    return report
+
+
+def compare(report, baseline, threshold=0.2):
+    """(benchmark, size, baseline best, best, ratio) for every run more than threshold slower"""
+    previous = {(r['benchmark'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get((result['benchmark'], result['size']))
+        if not old or not old['best']:
+            continue
+        ratio = result['best'] / old['best']
+        if ratio > 1 + threshold:
+            regressions.append((result['benchmark'], result['size'], old['best'], result['best'], ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile the scrapers on synthetic data")
+    parser.add_argument('--only', help=f"Comma separated benchmarks (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--sizes', help="Comma separated row counts (default: 1000,10000,100000,1000000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--out', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Previous JSON report; exit 1 if anything got slower")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(',')] if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+    print("📏 Running benchmarks...", file=sys.stderr)
+    report = run_benchmarks(names, sizes, args.seed, args.repeat, not args.no_memory)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for name, size, old, new, ratio in regressions:
+            print(f"🚨 {name} @ {size:,}: {old:.3f}s → {new:.3f}s ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions", file=sys.stderr)
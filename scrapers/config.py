@@ -0,0 +1,71 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+# The Next.js app's env file, found from the package rather than the CWD
+DEFAULT_ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env.local')
+
+
+@dataclass(frozen=True)
+class Config:
+    """Credentials the scrapers need; nothing here is read until a client is built.
+
+    local_db points the scrapers at a local_store.LocalStore file instead of
+    Supabase; replication then carries the rows on to Supabase.
+    """
+    supabase_url: str = None
+    supabase_key: str = None
+    quiver_api_key: str = None
+    local_db: str = None
+
+    @classmethod
+    def from_env(cls, env_file=DEFAULT_ENV_FILE):
+        """Read the environment, after loading env_file if python-dotenv is installed"""
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            pass
+        else:
+            load_dotenv(env_file)
+        return cls(
+            supabase_url=os.getenv('NEXT_PUBLIC_SUPABASE_URL'),
+            supabase_key=os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY'),
+            quiver_api_key=os.getenv('QUIVER_API_KEY'),
+            local_db=os.getenv('SCRAPERS_LOCAL_DB')
+        )
+
+
+@lru_cache(maxsize=None)
+def get_config():
+    """Process-wide Config from the environment, loaded on first use"""
+    return Config.from_env()
+
+
+_clients = {}
+
+
+def get_supabase(config=None):
+    """Supabase client for config (default: get_config()), created on first use and reused"""
+    config = config or get_config()
+    key = (config.supabase_url, config.supabase_key)
+    if key not in _clients:
+        # Pulls in httpx, gotrue, postgrest...; only pay for it when a job touches the database
+        from supabase import create_client
+
+        if not config.supabase_url or not config.supabase_key:
+            raise RuntimeError("NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY must be set")
+        _clients[key] = create_client(config.supabase_url, config.supabase_key)
+    return _clients[key]
+
+
+def get_store(config=None):
+    """Where the scrapers read and write: the LocalStore when config.local_db is set, else Supabase"""
+    config = config or get_config()
+    if not config.local_db:
+        return get_supabase(config)
+    key = ('local', config.local_db)
+    if key not in _clients:
+        from .local_store import LocalStore
+
+        _clients[key] = LocalStore(config.local_db)
+    return _clients[key]
@@ -0,0 +1,193 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from .instrumentation import metrics
+from .records import from_ordinal
+
+# Window in days, as (contract_date - trade_date).days
+MIN_DAYS_DIFF = -30
+MAX_DAYS_DIFF = 60
+
+
+def parse_trade_date(value):
+    """Parse a trade/contract date the same way the original loop did"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class TradeIndex:
+    """BUY trades grouped by symbol with dates parsed and sorted once.
+
+    Naive and timezone-aware dates are kept in separate lists because they
+    can't be compared; the original nested loop silently skipped those pairs.
+    """
+
+    def __init__(self, trades):
+        self.trades = trades
+        self.parsed_dates = [None] * len(trades)
+        groups = {}
+
+        for position, trade in enumerate(trades):
+            if trade['transaction_type'] != 'BUY':
+                continue
+            try:
+                trade_date = parse_trade_date(trade['transaction_date'])
+            except Exception:
+                continue
+            self.parsed_dates[position] = trade_date
+            aware = trade_date.tzinfo is not None
+            groups.setdefault((trade['stock_symbol'], aware), []).append((trade_date, position))
+
+        self.dates = {}
+        self.positions = {}
+        for key, entries in groups.items():
+            entries.sort(key=lambda entry: entry[0])
+            self.dates[key] = [entry[0] for entry in entries]
+            self.positions[key] = [entry[1] for entry in entries]
+
+    def window(self, symbol, contract_date, min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF):
+        """Positions of trades whose (contract_date - trade_date).days is in range.
+
+        `.days` floors, so min_days <= days <= max_days is the same as
+        contract_date - (max_days + 1) < trade_date <= contract_date - min_days.
+        Positions come back in original trade order.
+        """
+        key = (symbol, contract_date.tzinfo is not None)
+        dates = self.dates.get(key)
+        if not dates:
+            return []
+
+        lo = bisect_right(dates, contract_date - timedelta(days=max_days + 1))
+        hi = bisect_right(dates, contract_date - timedelta(days=min_days))
+        if lo >= hi:
+            return []
+        return sorted(self.positions[key][lo:hi])
+
+
+def iter_correlations(contracts, index, resolver,
+                      min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF, include_ids=False):
+    """Yield correlation dicts for each contract against a prebuilt TradeIndex.
+
+    `contracts` can be any iterable, so a stream of contract pages can be
+    joined against one symbol partition of trades without holding both.
+    include_ids adds contract_id and the resolver's matched_alias, which
+    the materialized correlation table needs.
+    """
+    for contract in contracts:
+        match = resolver.resolve(contract['company_name'])
+        if not match:
+            continue
+        symbol, alias = match
+
+        try:
+            contract_date = datetime.fromisoformat(contract['award_date'])
+        except Exception:
+            continue
+
+        for position in index.window(symbol, contract_date, min_days, max_days):
+            trade = index.trades[position]
+            trade_date = index.parsed_dates[position]
+            try:
+                days_diff = (contract_date - trade_date).days
+                correlation = {
+                    'politician': trade['politician_name'],
+                    'stock': symbol,
+                    'company': contract['company_name'],
+                    'trade_date': trade['transaction_date'][:10],
+                    'contract_date': contract['award_date'],
+                    'days_before_award': days_diff,
+                    'contract_amount': contract['contract_amount'],
+                    'agency': contract['agency']
+                }
+                if include_ids:
+                    correlation['contract_id'] = contract['contract_id']
+                    correlation['matched_alias'] = alias
+                yield correlation
+            except Exception:
+                continue
+
+
+def correlate_contracts(contracts, trades, resolver,
+                        min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF, include_ids=False):
+    """Sort-merge version of the contract x trade loop.
+
+    Returns the same correlation dicts, in the same order, as the nested loop
+    in FederalContractsTracker.find_contract_trade_correlations used to.
+    `resolver` is a ticker_resolver.TickerResolver.
+    """
+    with metrics.stage('index') as stage:
+        index = TradeIndex(trades)
+        stage.rows = len(trades)
+    # Name matching happens inside the join here, per contract
+    with metrics.stage('join') as stage:
+        correlations = list(iter_correlations(contracts, index, resolver, min_days, max_days, include_ids))
+        stage.rows = len(correlations)
+    return correlations
+
+
+class OrdinalTradeIndex:
+    """TradeIndex over records.Trade, with day ordinals instead of datetimes"""
+
+    def __init__(self, trades):
+        self.trades = trades
+        groups = {}
+        for position, trade in enumerate(trades):
+            if trade.transaction_type == 'BUY' and trade.transaction_date is not None:
+                groups.setdefault(trade.stock_symbol, []).append((trade.transaction_date, position))
+
+        self.dates = {}
+        self.positions = {}
+        for symbol, entries in groups.items():
+            entries.sort()
+            self.dates[symbol] = [entry[0] for entry in entries]
+            self.positions[symbol] = [entry[1] for entry in entries]
+
+    def window(self, symbol, contract_day, min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF):
+        """Positions of trades with min_days <= contract_day - trade_day <= max_days, in trade order"""
+        dates = self.dates.get(symbol)
+        if not dates:
+            return []
+        lo = bisect_left(dates, contract_day - max_days)
+        hi = bisect_right(dates, contract_day - min_days)
+        if lo >= hi:
+            return []
+        return sorted(self.positions[symbol][lo:hi])
+
+
+def correlate_records(contracts, trades, resolver,
+                      min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF, include_ids=False):
+    """correlate_contracts over records.Contract/records.Trade.
+
+    Works in whole days, so for date-only columns (what the tables store)
+    it returns exactly what correlate_contracts does.
+    """
+    with metrics.stage('index') as stage:
+        index = OrdinalTradeIndex(trades)
+        stage.rows = len(trades)
+
+    correlations = []
+    with metrics.stage('join') as stage:
+        for contract in contracts:
+            match = resolver.resolve(contract.company_name)
+            if not match or contract.award_date is None:
+                continue
+            symbol, alias = match
+            contract_date = from_ordinal(contract.award_date)
+
+            for position in index.window(symbol, contract.award_date, min_days, max_days):
+                trade = trades[position]
+                correlation = {
+                    'politician': trade.politician_name,
+                    'stock': symbol,
+                    'company': contract.company_name,
+                    'trade_date': from_ordinal(trade.transaction_date),
+                    'contract_date': contract_date,
+                    'days_before_award': contract.award_date - trade.transaction_date,
+                    'contract_amount': contract.contract_amount,
+                    'agency': contract.agency
+                }
+                if include_ids:
+                    correlation['contract_id'] = contract.contract_id
+                    correlation['matched_alias'] = alias
+                correlations.append(correlation)
+        stage.rows = len(correlations)
+    return correlations
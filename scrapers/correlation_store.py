@@ -0,0 +1,144 @@
+import math
+from datetime import datetime, timezone
+
+from .batch_writer import MAX_ROWS, BatchUpserter
+
+TABLE = 'contract_trade_correlations'
+KEY_COLUMNS = ('politician', 'symbol', 'contract_id')
+
+
+def score_correlation(days_before_award, contract_amount, trade_count=1):
+    """Rank used by the dashboard.
+
+    Bigger contracts score higher (log scale), buying before the award
+    counts double, and repeat buys by the same member add 25% each.
+    """
+    size = math.log10(max(float(contract_amount or 0), 1.0))
+    timing = 2.0 if days_before_award > 0 else 1.0
+    return round(size * timing * (1 + 0.25 * (trade_count - 1)), 2)
+
+
+def _signal(days_before_award):
+    return 'SUSPICIOUS' if days_before_award > 0 else 'INTERESTING'
+
+
+def _dates(text):
+    return set(text.split(',')) if text else set()
+
+
+def aggregate(correlations):
+    """Collapse per-trade correlations into one row per (politician, symbol, contract_id)
+
+    A trade is identified within a row by its date (congressional_trades is
+    unique on politician, symbol and date), and the row keeps every date it
+    has counted in trade_dates.
+    """
+    rows = {}
+    for correlation in correlations:
+        key = (correlation['politician'], correlation['stock'], correlation['contract_id'])
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                'politician': correlation['politician'],
+                'symbol': correlation['stock'],
+                'contract_id': correlation['contract_id'],
+                'company': correlation['company'],
+                'agency': correlation['agency'],
+                'contract_amount': correlation['contract_amount'],
+                'contract_date': correlation['contract_date'],
+                'first_trade_date': correlation['trade_date'],
+                'last_trade_date': correlation['trade_date'],
+                'days_before_award': correlation['days_before_award'],
+                'trade_count': 1,
+                'trade_dates': correlation['trade_date'],
+                'matched_alias': correlation.get('matched_alias')
+            }
+        else:
+            _merge_into(row, correlation['trade_date'], correlation['trade_date'],
+                        correlation['days_before_award'], correlation['trade_date'])
+    return rows
+
+
+def _merge_into(row, first_trade_date, last_trade_date, days_before_award, trade_dates, trade_count=0):
+    """Fold another row's trades into row; merging the same trades twice changes nothing.
+
+    trade_count is a floor for rows stored before trade_dates existed,
+    whose dates past the first and last aren't known.
+    """
+    dates = _dates(row['trade_dates']) | _dates(trade_dates)
+    row['first_trade_date'] = min(row['first_trade_date'], first_trade_date)
+    row['last_trade_date'] = max(row['last_trade_date'], last_trade_date)
+    row['days_before_award'] = max(row['days_before_award'], days_before_award)
+    row['trade_dates'] = ','.join(sorted(dates))
+    row['trade_count'] = max(len(dates), trade_count)
+
+
+class CorrelationStore:
+    """Materialized contract/trade correlations for the dashboard.
+
+    Incremental refreshes only ever add trades to a (politician, symbol,
+    contract_id) row, so new rows are merged with what's stored before the
+    upsert instead of overwriting trade counts. The merge is a union over
+    trade_dates, so upserting the same correlations again (a refresh
+    retried after a failure) leaves the row as it was.
+    """
+
+    def __init__(self, client, table=TABLE, chunk_size=500):
+        self.client = client
+        self.table = table
+        self.chunk_size = chunk_size
+
+    def _existing(self, rows):
+        keys = sorted(tuple(row[column] for column in KEY_COLUMNS) for row in rows)
+        existing = {}
+        for start in range(0, len(keys), self.chunk_size):
+            existing.update(self._lookup(keys[start:start + self.chunk_size]))
+        return existing
+
+    def _lookup(self, keys):
+        """Stored rows for these keys.
+
+        As in BatchUpserter._existing_keys, a response of MAX_ROWS rows may
+        have been cut off by PostgREST, so the keys are split in half and
+        looked up again.
+        """
+        query = self.client.table(self.table).select('*')
+        for position, column in enumerate(KEY_COLUMNS):
+            query = query.in_(column, sorted({key[position] for key in keys}))
+        result = query.execute().data or []
+        if len(result) >= MAX_ROWS and len(keys) > 1:
+            middle = len(keys) // 2
+            return {**self._lookup(keys[:middle]), **self._lookup(keys[middle:])}
+        wanted = set(keys)
+        stored = ((tuple(row[column] for column in KEY_COLUMNS), row) for row in result)
+        return {key: row for key, row in stored if key in wanted}
+
+    def upsert(self, correlations):
+        rows = aggregate(correlations)
+        stats = {'correlations': len(correlations), 'rows': len(rows), 'inserted': 0, 'updated': 0}
+        if not rows:
+            return stats
+
+        existing = self._existing(list(rows.values()))
+        refreshed_at = datetime.now(timezone.utc).isoformat()
+
+        for key, row in rows.items():
+            stored = existing.get(key)
+            if stored:
+                # Rows from before trade_dates: at least their first and last trade are known
+                stored_dates = stored.get('trade_dates') or \
+                    ','.join({str(stored['first_trade_date']), str(stored['last_trade_date'])})
+                _merge_into(row, str(stored['first_trade_date']), str(stored['last_trade_date']),
+                            stored['days_before_award'], stored_dates, stored['trade_count'])
+                stats['updated'] += 1
+            else:
+                stats['inserted'] += 1
+
+            row['signal'] = _signal(row['days_before_award'])
+            row['score'] = score_correlation(row['days_before_award'], row['contract_amount'], row['trade_count'])
+            row['refreshed_at'] = refreshed_at
+
+        writer = BatchUpserter(self.client, self.table, ','.join(KEY_COLUMNS),
+                               chunk_size=self.chunk_size, count_existing=False)
+        writer.write(rows.values())
+        return stats
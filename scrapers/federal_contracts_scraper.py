@@ -1,95 +1,90 @@
-import os
-import requests
-import json
+import argparse
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from supabase import create_client
 
-load_dotenv('../.env.local')
-
-# Supabase setup
-supabase = create_client(
-    os.getenv('NEXT_PUBLIC_SUPABASE_URL'),
-    os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-)
+from .batch_writer import BatchUpserter
+from .config import get_store
+from .correlation_engine import correlate_contracts, correlate_records
+from .correlation_store import CorrelationStore
+from .instrumentation import metrics
+from .records import Contract, Trade
+from .response_cache import ResponseCache
+from .streaming_correlations import company_alias_filter, run_streaming
+from .sync_state import SyncState
+from .ticker_resolver import get_resolver
+from .usaspending_fetcher import USAspendingFetcher, normalize_award
 
 class FederalContractsTracker:
-    def __init__(self):
-        self.base_url = "https://api.usaspending.gov/api/v2"
+    def __init__(self, base_url="https://api.usaspending.gov/api/v2", max_workers=4, window_days=7,
+                 state=None, cache=None, client=None):
+        self.base_url = base_url
+        self.fetcher = USAspendingFetcher(base_url, max_workers=max_workers, window_days=window_days,
+                                          cache=cache)
+        # Optional SyncState; when set, runs only fetch/correlate what's new
+        self.state = state
+        # Company name -> ticker, compiled once from data/company_tickers.csv
+        self.resolver = get_resolver()
+        # Supabase client or LocalStore; built from the environment the first time it's needed
+        self._client = client
+        # End date of the last complete fetch, until sync_to_database has written it
+        self._fetched_through = None
+        # correlations:* marks of the last join, until refresh_correlation_table has stored it
+        self._pending_marks = {}
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_store()
+        return self._client
         
     def get_recent_contracts(self, days_back=30):
-        """Fetch recent large federal contracts - FIXED VERSION"""
+        """Fetch recent large federal contracts
+
+        API failures raise once the transport's retries are spent. The
+        watermark doesn't move here: sync_to_database advances it once the
+        contracts are written, so a failed write is fetched again next run.
+        """
         print("🏛️ Fetching federal contracts from USAspending.gov...")
         
-        # Use simpler endpoint that works
-        payload = {
-            "limit": 100,
-            "page": 1,
-            "filters": {
-                "award_type_codes": ["A", "B", "C", "D"],  # Contract types
-                "award_amounts": [
-                    {
-                        "lower_bound": 10000000  # $10M minimum
-                    }
-                ],
-                "time_period": [
-                    {
-                        "date_type": "action_date",
-                        "start_date": "2024-11-01", 
-                        "end_date": "2024-12-31"
-                    }
-                ]
-            }
-        }
+        end_date = datetime.now().date()
+        days_back = self._days_since_watermark(days_back, end_date)
+        with metrics.stage('fetch') as stage:
+            contracts = list(self.iter_recent_contracts(days_back, end_date))
+            stage.rows = len(contracts)
+        print(f"✅ Found {len(contracts)} contracts over $10M")
         
-        try:
-            # Use the awards endpoint instead
-            response = requests.post(
-                f"{self.base_url}/search/spending_by_award/",
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload)
-            )
-            
-            print(f"API Response Status: {response.status_code}")
+        self._fetched_through = end_date
+        return contracts
+    
+    def _days_since_watermark(self, days_back, end_date, overlap_days=3):
+        """Shrink the window to what's new since the last successful fetch.
+
+        A few days of overlap are kept because USAspending backfills recent
+        action dates; the upsert on contract_id absorbs the repeats.
+        """
+        last_fetched = self.state.get('usaspending') if self.state else None
+        if not last_fetched:
+            return days_back
+        
+        since = datetime.fromisoformat(last_fetched).date() - timedelta(days=overlap_days)
+        return max(0, min(days_back, (end_date - since).days))
+    
+    def iter_recent_contracts(self, days_back=30, end_date=None):
+        """Stream every contract over $10M awarded in the last days_back days, as records.Contract"""
+        count = 0
+        for item in self.fetcher.iter_recent_awards(days_back, end_date):
+            with metrics.stage('parse') as stage:
+                contract = normalize_award(item, count)
+                contract = Contract.from_row(contract) if contract else None
+                stage.rows = 1
             
-            if response.status_code == 200:
-                data = response.json()
-                contracts = []
-                
-                # Process results
-                for item in data.get('results', []):
-                    # Clean company name
-                    recipient = item.get('recipient_name', 'Unknown')
-                    if recipient and recipient != 'MULTIPLE RECIPIENTS':
-                        contract = {
-                            'company_name': recipient,
-                            'contract_amount': float(item.get('total_obligation', 0)),
-                            'agency': item.get('awarding_agency', 'Unknown'),
-                            'award_date': datetime.now().strftime('%Y-%m-%d'),  # Use today for now
-                            'description': item.get('description', 'Federal Contract'),
-                            'contract_id': item.get('generated_internal_id', f"CONTRACT-{len(contracts)}"),
-                            'state': item.get('recipient_state_code', '')
-                        }
-                        
-                        # Only add if it's a real company and significant amount
-                        if contract['contract_amount'] > 10000000:
-                            contracts.append(contract)
-                            print(f"  ✓ {recipient}: ${contract['contract_amount']:,.0f}")
-                
-                print(f"✅ Found {len(contracts)} contracts over $10M")
-                return contracts
-                
-            else:
-                print(f"API Response: {response.text[:200]}")
-                # Return mock data so we can continue
-                return self.get_mock_contracts()
-                
-        except Exception as e:
-            print(f"Error: {e}")
-            return self.get_mock_contracts()
+            # Only add if it's a real company and significant amount
+            if contract and contract.contract_amount > 10000000:
+                count += 1
+                metrics.log_row('contract', f"  ✓ {contract.company_name}: ${contract.contract_amount:,.0f}")
+                yield contract
     
     def get_mock_contracts(self):
-        """Backup mock data to keep building"""
+        """Fixed sample contracts for working offline (--mock)"""
         print("📦 Using mock contract data for testing...")
         
         mock_contracts = [
@@ -140,128 +135,219 @@ class FederalContractsTracker:
             }
         ]
         
-        return mock_contracts
+        return [Contract.from_row(row) for row in mock_contracts]
     
-    def find_contract_trade_correlations(self):
-        """Find congress members who traded before contract awards!"""
+    def find_contract_trade_correlations(self, engine='python', include_ids=False):
+        """Find congress members who traded before contract awards!
+
+        engine='vectorized' runs the NumPy/pandas range join instead of the
+        sort-merge loop; both return identical results. engine='records'
+        converts rows to records.Contract/Trade once and joins on day
+        ordinals, which matches both for the tables' date-only columns.
+        engine='sql' runs the join inside a LocalStore client, so no rows
+        are shipped to Python at all.
+        """
         print("\n🎯 FINDING INSIDER PATTERNS...")
+        if engine == 'sql':
+            return self._sql_correlations(include_ids)
         
         # Get recent contracts from database
-        contracts_result = supabase.table('federal_contracts').select('*').execute()
+        contracts_result = self.client.table('federal_contracts').select('*').execute()
         contracts = contracts_result.data
         
         # Get congressional trades
-        trades_result = supabase.table('congressional_trades').select('*').execute()
+        trades_result = self.client.table('congressional_trades').select('*').execute()
         trades = trades_result.data
         
-        # Enhanced company to symbol mapping
-        company_to_symbol = {
-            'microsoft': 'MSFT',
-            'amazon': 'AMZN',
-            'aws': 'AMZN',
-            'palantir': 'PLTR',
-            'nvidia': 'NVDA',
-            'lockheed': 'LMT',
-            'boeing': 'BA',
-            'raytheon': 'RTX',
-            'northrop': 'NOC',
-            'general dynamics': 'GD',
-            'spacex': 'SPACE',
-            'tesla': 'TSLA',
-            'apple': 'AAPL',
-            'google': 'GOOGL',
-            'meta': 'META'
-        }
+        correlations = self._correlate(contracts, trades, engine, include_ids)
+        self._hold_correlation_marks(contracts, trades)
+        return correlations
+    
+    def find_new_correlations(self, engine='python', include_ids=False):
+        """Correlate only rows added since the last run, and only for the symbols they touch.
+
+        New contracts are joined against every trade in their symbols, and
+        new trades against every older contract in theirs, so each pair is
+        produced exactly once. Needs a SyncState; falls back to a full run
+        the first time. The marks only move once refresh_correlation_table
+        has stored the result.
+        """
+        last_contract_id = self.state.get('correlations:federal_contracts') if self.state else None
+        last_trade_id = self.state.get('correlations:congressional_trades') if self.state else None
+        if last_contract_id is None or last_trade_id is None:
+            return self.find_contract_trade_correlations(engine, include_ids)
         
-        correlations = []
+        print("\n🎯 FINDING NEW INSIDER PATTERNS...")
+        if engine == 'sql':
+            return self._sql_correlations(include_ids, last_contract_id, last_trade_id)
         
-        for contract in contracts:
-            company = contract['company_name'].lower()
-            
-            # Find matching stock symbol
-            symbol = None
-            for company_key, stock_symbol in company_to_symbol.items():
-                if company_key in company:
-                    symbol = stock_symbol
-                    break
-            
-            if symbol:
-                # Check if any congress member traded this stock
-                for trade in trades:
-                    if trade['stock_symbol'] == symbol and trade['transaction_type'] == 'BUY':
-                        # Check dates
-                        try:
-                            trade_date = datetime.fromisoformat(trade['transaction_date'].replace('Z', '+00:00'))
-                            contract_date = datetime.fromisoformat(contract['award_date'])
-                            
-                            # If trade was 1-60 days before contract
-                            days_diff = (contract_date - trade_date).days
-                            if -30 <= days_diff <= 60:  # Also catch trades shortly after
-                                correlations.append({
-                                    'politician': trade['politician_name'],
-                                    'stock': symbol,
-                                    'company': contract['company_name'],
-                                    'trade_date': trade['transaction_date'][:10],
-                                    'contract_date': contract['award_date'],
-                                    'days_before_award': days_diff,
-                                    'contract_amount': contract['contract_amount'],
-                                    'agency': contract['agency']
-                                })
-                                
-                                if days_diff > 0:
-                                    print(f"🚨 SUSPICIOUS: {trade['politician_name']} bought {symbol} "
-                                          f"{days_diff} days BEFORE ${contract['contract_amount']:,.0f} contract!")
-                                else:
-                                    print(f"📊 INTERESTING: {trade['politician_name']} bought {symbol} "
-                                          f"{abs(days_diff)} days AFTER ${contract['contract_amount']:,.0f} contract")
-                        except Exception as e:
-                            continue
+        new_contracts = self.client.table('federal_contracts').select('*') \
+            .gt('id', last_contract_id).execute().data
+        new_trades = self.client.table('congressional_trades').select('*') \
+            .gt('id', last_trade_id).execute().data
+        
+        if not new_contracts and not new_trades:
+            print("No new contracts or trades since last run")
+            return []
+        
+        symbols = {self.resolver.symbol(c['company_name']) for c in new_contracts}
+        symbols |= {t['stock_symbol'] for t in new_trades if t['transaction_type'] == 'BUY'}
+        symbols.discard(None)
+        if not symbols:
+            self._hold_correlation_marks(new_contracts, new_trades)
+            return []
+        
+        symbol_trades = self.client.table('congressional_trades').select('*') \
+            .in_('stock_symbol', sorted(symbols)).execute().data
+        
+        company_keys = self.resolver.aliases_for(symbols)
+        old_contracts = []
+        if new_trades and company_keys:
+            query = self.client.table('federal_contracts').select('*').lte('id', last_contract_id)
+            old_contracts = company_alias_filter(company_keys)(query).execute().data
+        
+        correlations = self._correlate(new_contracts, symbol_trades, engine, include_ids)
+        correlations += self._correlate(old_contracts, new_trades, engine, include_ids)
+        
+        self._hold_correlation_marks(new_contracts, new_trades)
+        return correlations
+    
+    def stream_correlations(self, sink, symbols=None, page_size=1000):
+        """Bounded-memory alternative to find_contract_trade_correlations.
+
+        Pages through both tables one symbol partition at a time and hands
+        each correlation to sink (StdoutSink, JsonlSink, CorrelationTableSink...)
+        instead of building the whole list.
+        """
+        print("\n🎯 STREAMING INSIDER PATTERNS...")
+        count = run_streaming(self.client, sink, self.resolver, symbols, page_size)
+        print(f"✅ Streamed {count} correlations")
+        return count
+    
+    def refresh_correlation_table(self, engine=None):
+        """Persist correlations for new rows into contract_trade_correlations.
+
+        Runs the incremental join, so only contracts/trades synced since the
+        last refresh (and the symbols they touch) are looked at; the
+        dashboard reads the resulting small, pre-scored table. The join runs
+        in SQL when the client is a LocalStore, in Python otherwise. The
+        correlations:* marks advance only after the upsert succeeds; a
+        failed one is redone next run, which the store's merge absorbs.
+        """
+        if engine is None:
+            engine = 'sql' if hasattr(self.client, 'correlate') else 'python'
+        self._pending_marks = {}
+        correlations = self.find_new_correlations(engine, include_ids=True)
+        stats = CorrelationStore(self.client).upsert(correlations)
+        if self.state:
+            for source, value in self._pending_marks.items():
+                self.state.advance(source, value)
+        self._pending_marks = {}
+        print(f"✅ Correlation table refreshed: {stats['inserted']} new, {stats['updated']} updated")
+        return stats
+    
+    def _correlate(self, contracts, trades, engine='python', include_ids=False):
+        if engine == 'vectorized':
+            from .vectorized_engine import contract_trade_correlations
+            correlations = contract_trade_correlations(contracts, trades, self.resolver, include_ids=include_ids)
+        elif engine == 'records':
+            correlations = correlate_records([Contract.from_row(c) for c in contracts],
+                                             [Trade.from_row(t) for t in trades],
+                                             self.resolver, include_ids=include_ids)
+        else:
+            correlations = correlate_contracts(contracts, trades, self.resolver, include_ids=include_ids)
+        return self._log_correlations(correlations)
+    
+    def _sql_correlations(self, include_ids=False, after_contract_id=None, after_trade_id=None):
+        if not hasattr(self.client, 'correlate'):
+            raise ValueError("engine='sql' needs a local_store.LocalStore client")
+        
+        # Read the marks first so rows landing mid-join are left for the next run
+        max_contract_id = self.client.max_id('federal_contracts')
+        max_trade_id = self.client.max_id('congressional_trades')
+        correlations = self.client.correlate(self.resolver, include_ids=include_ids,
+                                             after_contract_id=after_contract_id, after_trade_id=after_trade_id,
+                                             max_contract_id=max_contract_id, max_trade_id=max_trade_id)
+        self._pending_marks = {'correlations:federal_contracts': max_contract_id,
+                               'correlations:congressional_trades': max_trade_id}
+        return self._log_correlations(correlations)
+    
+    def _log_correlations(self, correlations):
+        for correlation in correlations:
+            days_diff = correlation['days_before_award']
+            if days_diff > 0:
+                metrics.count('correlations', signal='SUSPICIOUS')
+                metrics.log_row('correlation', f"🚨 SUSPICIOUS: {correlation['politician']} bought {correlation['stock']} "
+                                f"{days_diff} days BEFORE ${correlation['contract_amount']:,.0f} contract!")
+            else:
+                metrics.count('correlations', signal='INTERESTING')
+                metrics.log_row('correlation', f"📊 INTERESTING: {correlation['politician']} bought {correlation['stock']} "
+                                f"{abs(days_diff)} days AFTER ${correlation['contract_amount']:,.0f} contract")
         
         return correlations
     
-    def sync_to_database(self, contracts):
-        """Save contracts to Supabase"""
+    def _hold_correlation_marks(self, contracts, trades):
+        self._pending_marks = {
+            'correlations:federal_contracts': max((c['id'] for c in contracts), default=0),
+            'correlations:congressional_trades': max((t['id'] for t in trades), default=0)
+        }
+    
+    def sync_to_database(self, contracts, chunk_size=500):
+        """Save records.Contract rows to Supabase
+
+        Write errors propagate. Only once everything is written does the
+        usaspending watermark move to the end of the fetch that produced
+        the contracts.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
         if contracts:
-            try:
-                for contract in contracts:
-                    # Check if contract already exists
-                    existing = supabase.table('federal_contracts').select('*').eq('contract_id', contract['contract_id']).execute()
-                    
-                    if not existing.data:
-                        # Insert new contract
-                        supabase.table('federal_contracts').insert(contract).execute()
-                        print(f"  + Added: {contract['company_name'][:30]} - ${contract['contract_amount']:,.0f}")
-                
-                print(f"✅ Contracts synced to database")
-            except Exception as e:
-                print(f"Database error: {e}")
+            # Existing contracts are left untouched, new ones go in one upsert per chunk
+            writer = BatchUpserter(self.client, 'federal_contracts', 'contract_id',
+                                   chunk_size=chunk_size, ignore_duplicates=True)
+            stats = writer.write(contract.to_row() for contract in contracts)
+            
+            print(f"✅ Contracts synced to database: {stats['inserted']} added, "
+                  f"{stats['skipped']} skipped")
+        
+        if self.state and self._fetched_through:
+            self.state.advance('usaspending', self._fetched_through.isoformat())
+        self._fetched_through = None
+        return stats
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync large federal contracts and correlate them with trades")
+    parser.add_argument('--days-back', type=int, default=30)
+    parser.add_argument('--mock', action='store_true', help="Use the built-in sample contracts instead of the API")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("FEDERAL CONTRACTS TRACKER")
     print("=" * 50)
     
-    tracker = FederalContractsTracker()
+    # Watermarks make repeated runs fetch and correlate only the delta
+    tracker = FederalContractsTracker(state=SyncState(), cache=ResponseCache())
     
-    # Get contracts (will use mock if API fails)
-    contracts = tracker.get_recent_contracts(days_back=30)
+    if args.mock:
+        contracts = tracker.get_mock_contracts()
+    else:
+        contracts = tracker.get_recent_contracts(days_back=args.days_back)
     
     # Show what we found
     if contracts:
         print(f"\n📊 Top Contracts:")
         for contract in contracts[:5]:
-            print(f"  - {contract['company_name']}: ${contract['contract_amount']:,.0f}")
+            print(f"  - {contract.company_name}: ${contract.contract_amount:,.0f}")
     
-    # Save to database
-    if contracts:
-        tracker.sync_to_database(contracts)
+    # Save to database (an empty fetch still moves the watermark)
+    tracker.sync_to_database(contracts)
     
     # Find correlations
     print("\n" + "=" * 50)
-    correlations = tracker.find_contract_trade_correlations()
+    stats = tracker.refresh_correlation_table()
     
-    if correlations:
-        print(f"\n🎯 Found {len(correlations)} PATTERNS!")
+    if stats['correlations']:
+        print(f"\n🎯 Found {stats['correlations']} PATTERNS!")
     
     print("\n" + "=" * 50)
-    print("Analysis complete!")
\ No newline at end of file
+    print("Analysis complete!")
+    metrics.report()
\ No newline at end of file
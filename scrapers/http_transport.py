@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .instrumentation import metrics
+
+DEFAULT_HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'http')
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CONDITIONAL_HEADERS = {'if-none-match', 'if-modified-since'}
+
+# Requests per second allowed per host by default; hosts not listed are unthrottled
+DEFAULT_HOST_RATES = {
+    'api.quiverquant.com': 5,
+    'api.usaspending.gov': 10,
+}
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average and bursts of up to `burst`, across threads"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HttpCache:
+    """Last good body of each GET with its ETag/Last-Modified, one JSON file per request.
+
+    Only responses carrying a validator are kept; they are replayed when the
+    server answers a conditional request with 304 Not Modified.
+    """
+
+    def __init__(self, root=DEFAULT_HTTP_CACHE_DIR):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, etag, last_modified, body):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'etag': etag, 'last_modified': last_modified, 'body': body}, f)
+        os.replace(tmp_path, path)
+
+
+class Transport:
+    """Shared HTTP layer for every outbound API call.
+
+    - one pooled keep-alive session, with a timeout on every request
+    - retries on connection errors, timeouts, 429 and 5xx with jittered
+      exponential backoff, honouring Retry-After
+    - a token bucket per host (`rates` maps host -> requests per second)
+    - identical requests already in flight are sent once and every caller
+      gets the same result; GETs always, other methods when coalesce=True
+    - GETs are revalidated with If-None-Match/If-Modified-Since against the
+      HttpCache, so an unchanged resource costs a 304 and no body
+
+    Failures raise (requests.HTTPError, ConnectionError, Timeout) once the
+    retries are spent; nothing is swallowed.
+    """
+
+    def __init__(self, rates=None, timeout=30, max_retries=5, backoff=1.0, pool_size=16,
+                 http_cache=None, session=None):
+        self.rates = DEFAULT_HOST_RATES if rates is None else rates
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.http_cache = http_cache
+        self.session = session or self._make_session(pool_size)
+        self._buckets = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.rates.get(host)
+                self._buckets[host] = TokenBucket(rate) if rate else None
+            return self._buckets[host]
+
+    @staticmethod
+    def _key(method, url, params, body, headers):
+        encoded = json.dumps([method, url, params, body, headers], sort_keys=True, default=str).encode()
+        return hashlib.sha1(encoded).hexdigest()
+
+    def get_json(self, url, params=None, headers=None, source=None, timeout=None):
+        return self.request_json('GET', url, params=params, headers=headers, source=source, timeout=timeout)
+
+    def post_json(self, url, body, headers=None, source=None, timeout=None, coalesce=False):
+        """POST a JSON body; coalesce=True for read-only endpoints such as searches"""
+        return self.request_json('POST', url, body=body, headers=headers, source=source, timeout=timeout,
+                                 coalesce=coalesce)
+
+    def request_json(self, method, url, params=None, body=None, headers=None, source=None, timeout=None,
+                     coalesce=None):
+        """Send one request (with retries) and return the decoded JSON body"""
+        source = source or urlsplit(url).hostname
+        key = self._key(method, url, params, body, headers)
+        if coalesce is None:
+            coalesce = method == 'GET'
+        if not coalesce:
+            return self._send(method, url, params, body, headers, source, timeout, key)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            metrics.count('http_coalesced', source=source)
+            return future.result()
+
+        try:
+            future.set_result(self._send(method, url, params, body, headers, source, timeout, key))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    def _send(self, method, url, params, body, headers, source, timeout, key):
+        headers = dict(headers or {})
+        cached = self.http_cache.get(key) if self.http_cache is not None and method == 'GET' else None
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        bucket = self._bucket(urlsplit(url).hostname)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.count('http_retries', source=source)
+            if bucket:
+                waited = bucket.acquire()
+                if waited:
+                    metrics.observe('http_throttle_seconds', waited, source=source)
+
+            try:
+                with metrics.timed('http_request_seconds', source=source):
+                    response = self.session.request(method, url, params=params, json=body, headers=headers,
+                                                    timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.count('http_requests', source=source, status='error')
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            metrics.count('http_requests', source=source, status=response.status_code)
+            if response.status_code == 304:
+                if cached:
+                    return cached['body']
+                # Validators we hold no body for, e.g. the caller's own: ask again for the body
+                unconditional = {name: value for name, value in headers.items()
+                                 if name.lower() not in CONDITIONAL_HEADERS}
+                if unconditional != headers:
+                    return self._send(method, url, params, body, unconditional, source, timeout, key)
+                raise requests.HTTPError(f"304 Not Modified with no cached body for {url}", response=response)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                retry_after = response.headers.get('Retry-After')
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit() else self._delay(attempt))
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+            etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+            if self.http_cache is not None and method == 'GET' and (etag or last_modified):
+                self.http_cache.put(key, etag, last_modified, data)
+            return data
+
+    def _delay(self, attempt):
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide Transport with the default host rates and an on-disk HttpCache.
+
+    One per process, so forked backfill workers never share a parent's sockets.
+    """
+    pid = os.getpid()
+    with _shared_lock:
+        if pid not in _shared:
+            _shared[pid] = Transport(http_cache=HttpCache())
+        return _shared[pid]
@@ -1,57 +1,143 @@
-import os
-import yfinance as yf
-from datetime import datetime
-from dotenv import load_dotenv
-from supabase import create_client, Client
-
-# Load environment variables
-load_dotenv('../.env.local')
-
-# Supabase setup
-url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-supabase: Client = create_client(url, key)
-
-def scrape_institutional_holdings():
-    """Scrape major institutional holdings"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import get_store
+from .instrumentation import metrics
+from .records import Holding, from_ordinal, to_ordinal
+from .response_cache import ResponseCache
+from .sync_state import SyncState
+
+DEFAULT_SYMBOLS = ['NVDA', 'AAPL', 'MSFT', 'GOOGL', 'META', 'TSLA', 'AMZN']
+
+def load_symbols(path):
+    """One ticker per line; blank lines and # comments are ignored"""
+    with open(path) as f:
+        lines = (line.split('#')[0].strip().upper() for line in f)
+        return [line for line in lines if line]
+
+def _fetch_top_holders(symbol, top_n, ticker_factory=None):
+    """(holder records, company long name) straight from Yahoo"""
+    if ticker_factory is None:
+        # yfinance drags in pandas and friends; only load it for a live fetch
+        import yfinance as yf
+        ticker_factory = yf.Ticker
+    ticker = ticker_factory(symbol)
+    inst_holders = ticker.institutional_holders
+
+    if inst_holders is None or inst_holders.empty:
+        return [], None
+
+    top = inst_holders.head(top_n)[['Holder', 'Shares', 'Value', 'Date Reported']]
+    return top.to_dict('records'), {'longName': (ticker.info or {}).get('longName', '')}
+
+def stored_holders(client, symbol, filing_date):
+    """Investors already stored for symbol on one filing date"""
+    with metrics.timed('db_request_seconds', table='institutional_trades', op='select'):
+        result = client.table('institutional_trades').select('investor_name') \
+            .eq('stock_symbol', symbol).eq('filing_date', filing_date).execute()
+    return {row['investor_name'] for row in result.data or []}
+
+def fetch_symbol_holdings(symbol, top_n=3, last_filed=None, ticker_factory=None, cache=None, stored=()):
+    """Top institutional holders of one symbol as records.Holding.
+
+    `info` and `institutional_holders` are each fetched exactly once, or
+    not at all when a fresh copy is in the ResponseCache. Rows filed before
+    last_filed are skipped; rows filed on it are skipped only for the
+    investors in `stored`, so a holder filed the same day as the mark
+    still comes through.
+    """
+    if cache is None:
+        records, meta = _fetch_top_holders(symbol, top_n, ticker_factory)
+    else:
+        records, meta = cache.fetch('yahoo_holders', {'symbol': symbol, 'top_n': top_n},
+                                    lambda: _fetch_top_holders(symbol, top_n, ticker_factory))
+
+    company_name = (meta or {}).get('longName', '')
+    last_filed = to_ordinal(last_filed)
+    holdings = []
+    for record in records:
+        filing_date = to_ordinal(record['Date Reported'])
+        if last_filed and (filing_date < last_filed or
+                           (filing_date == last_filed and record['Holder'] in stored)):
+            continue
+
+        holdings.append(Holding(
+            investor_name=record['Holder'],
+            stock_symbol=symbol,
+            company_name=company_name,
+            shares_amount=int(record['Shares']),
+            value_amount=float(record['Value']),
+            filing_date=filing_date
+        ))
+    return holdings
+
+def scrape_institutional_holdings(state=None, symbols=None, max_workers=8, top_n=3,
+                                  ticker_factory=None, chunk_size=500, cache=None, client=None):
+    """Scrape major institutional holdings
+
+    Symbols are fetched in parallel on a bounded thread pool; results keep
+    the order of `symbols`. With a SyncState only 13F rows filed on or
+    after each symbol's last seen filing date, and not already stored, are
+    inserted. Rows go to `client`, or the shared store (Supabase or
+    LocalStore) configured in the environment.
+    """
     print("Starting institutional investor scraper...")
-    
-    hot_stocks = ['NVDA', 'AAPL', 'MSFT', 'GOOGL', 'META', 'TSLA', 'AMZN']
-    all_holdings = []
-    
-    for symbol in hot_stocks:
-        print(f"Checking {symbol}...")
+
+    symbols = symbols or DEFAULT_SYMBOLS
+    if state and any(state.get(f'institutional:{symbol}') for symbol in symbols):
+        client = client or get_store()
+
+    def fetch(symbol):
+        last_filed = state.get(f'institutional:{symbol}') if state else None
         try:
-            ticker = yf.Ticker(symbol)
-            inst_holders = ticker.institutional_holders
-            
-            if inst_holders is not None and not inst_holders.empty:
-                for index, row in inst_holders.head(3).iterrows():
-                    holding = {
-                        'investor_name': row['Holder'],
-                        'investor_type': 'INSTITUTIONAL',
-                        'stock_symbol': symbol,
-                        'company_name': ticker.info.get('longName', ''),
-                        'transaction_type': 'HOLD',
-                        'shares_amount': int(row['Shares']),
-                        'value_amount': float(row['Value']),
-                        'filing_date': row['Date Reported'].strftime('%Y-%m-%d'),
-                        'source': '13F'
-                    }
-                    all_holdings.append(holding)
-                    print(f"  - {row['Holder']}: {row['Shares']:,} shares")
+            # Holders filed on the mark date may be new; the ones already stored aren't
+            stored = stored_holders(client, symbol, last_filed) if last_filed else set()
+            with metrics.stage('fetch') as stage:
+                holdings = fetch_symbol_holdings(symbol, top_n, last_filed, ticker_factory, cache, stored)
+                stage.rows = len(holdings)
+            return holdings
         except Exception as e:
             print(f"Error with {symbol}: {e}")
-            continue
-    
+            return []
+
+    all_holdings = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for symbol, holdings in zip(symbols, executor.map(fetch, symbols)):
+            metrics.log_row('symbol', f"Checked {symbol}: {len(holdings)} holders")
+            all_holdings.extend(holdings)
+
     if all_holdings:
-        result = supabase.table('institutional_trades').insert(all_holdings).execute()
+        client = client or get_store()
+        for start in range(0, len(all_holdings), chunk_size):
+            chunk = [holding.to_row() for holding in all_holdings[start:start + chunk_size]]
+            with metrics.stage('write') as stage, \
+                    metrics.timed('db_request_seconds', table='institutional_trades', op='insert'):
+                client.table('institutional_trades').insert(chunk).execute()
+                stage.rows = len(chunk)
         print(f"\nInserted {len(all_holdings)} institutional holdings")
+
+        if state:
+            for holding in all_holdings:
+                state.advance(f"institutional:{holding.stock_symbol}", from_ordinal(holding.filing_date))
     return all_holdings
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape 13F institutional holders from Yahoo Finance")
+    parser.add_argument('--symbols', help="Comma separated tickers (default: a few hot stocks)")
+    parser.add_argument('--symbols-file', help="File with one ticker per line, e.g. the S&P 1500")
+    parser.add_argument('--workers', type=int, default=8, help="Parallel yfinance fetches")
+    args = parser.parse_args()
+
+    symbols = None
+    if args.symbols_file:
+        symbols = load_symbols(args.symbols_file)
+    elif args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+
     print("=" * 50)
     print("INSTITUTIONAL TRADES SCRAPER")
     print("=" * 50)
-    scrape_institutional_holdings()
-    print("\nScraping complete!")
\ No newline at end of file
+    scrape_institutional_holdings(state=SyncState(), symbols=symbols, max_workers=args.workers,
+                                  cache=ResponseCache())
+    print("\nScraping complete!")
+    metrics.report()
@@ -0,0 +1,220 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+
+def _series(name, labels):
+    """Prometheus series name, e.g. http_requests{host="api.usaspending.gov",status="200"}"""
+    if not labels:
+        return name
+    pairs = ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{pairs}}}"
+
+
+class _StageTimer:
+    def __init__(self):
+        self.rows = 0
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Per-run stage timers, counters and latency histograms.
+
+    Stages may nest (fetch includes parse), so their times don't add up to
+    the run time. Row-level progress lines go through log_row, which prints
+    one row in every `row_log_every` and nothing when it is 0, the default.
+    """
+
+    def __init__(self, row_log_every=0, buckets=LATENCY_BUCKETS):
+        self.row_log_every = row_log_every
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self._stages = {}
+            self._counters = {}
+            self._histograms = {}
+            self._row_counts = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; set .rows on the yielded timer to get rows per second"""
+        timer = _StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            self.add_stage(name, time.perf_counter() - start, timer.rows)
+
+    def add_stage(self, name, seconds, rows=0):
+        with self._lock:
+            stage = self._stages.setdefault(name, [0.0, 0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+            stage[2] += rows
+
+    @staticmethod
+    def _key(name, labels):
+        # Label values are strings in the output anyway; mixing 200 and 'error' mustn't break sorting
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timed(self, name, **labels):
+        """Observe how long a block takes in the `name` histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def log_row(self, kind, message):
+        """Print a row-level progress line, sampled per kind"""
+        if not self.row_log_every:
+            return
+        with self._lock:
+            seen = self._row_counts[kind] = self._row_counts.get(kind, 0) + 1
+        if (seen - 1) % self.row_log_every == 0:
+            print(message)
+
+    def summary(self):
+        with self._lock:
+            stages = {
+                name: {
+                    'seconds': round(seconds, 6),
+                    'calls': calls,
+                    'rows': rows,
+                    'rows_per_second': round(rows / seconds, 1) if rows and seconds else None
+                }
+                for name, (seconds, calls, rows) in self._stages.items()
+            }
+            counters = {_series(name, dict(labels)): value
+                        for (name, labels), value in sorted(self._counters.items())}
+            histograms = {
+                _series(name, dict(labels)): {
+                    'count': h.count,
+                    'sum': round(h.sum, 6),
+                    'p50': round(h.quantile(0.5), 6),
+                    'p95': round(h.quantile(0.95), 6),
+                    'p99': round(h.quantile(0.99), 6),
+                    'max': round(h.max, 6)
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            }
+        return {
+            'started_at': self.started_at.isoformat(),
+            'elapsed_seconds': round(time.perf_counter() - self._started, 6),
+            'stages': stages,
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    def to_prometheus(self, prefix='scrapers'):
+        """Prometheus text exposition format (for the node_exporter textfile collector)"""
+        lines = []
+        with self._lock:
+            for metric, index in (('stage_seconds_total', 0), ('stage_calls_total', 1), ('stage_rows_total', 2)):
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, values in sorted(self._stages.items()):
+                    lines.append(f"{_series(f'{prefix}_{metric}', {'stage': name})} {values[index]}")
+
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (counter, labels), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f"{_series(f'{prefix}_{name}_total', dict(labels))} {value}")
+
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (histogram_name, labels), h in sorted(self._histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    labels = dict(labels)
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{_series(f'{prefix}_{name}_bucket', {**labels, 'le': le})} {cumulative}")
+                    lines.append(f"{_series(f'{prefix}_{name}_sum', labels)} {h.sum}")
+                    lines.append(f"{_series(f'{prefix}_{name}_count', labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the run's metrics; .prom/.txt paths get Prometheus text, anything else JSON"""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.summary(), indent=2) + '\n'
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def report(self, path=None, stream=None):
+        """End-of-run summary: one line per stage, plus the metrics file when a path is set.
+
+        The path defaults to $SCRAPERS_METRICS_OUT.
+        """
+        stream = stream or sys.stderr
+        summary = self.summary()
+        for name, stage in summary['stages'].items():
+            rate = f", {stage['rows_per_second']:,.0f} rows/s" if stage['rows_per_second'] else ''
+            print(f"⏱️ {name}: {stage['seconds']:.3f}s over {stage['calls']} calls{rate}", file=stream)
+
+        path = path or os.getenv('SCRAPERS_METRICS_OUT')
+        if path:
+            self.write(path)
+            print(f"📈 Metrics written to {path}", file=stream)
+        return summary
+
+
+# Shared by every scraper in the process; $SCRAPERS_ROW_LOG_EVERY=N prints every Nth row
+metrics = Metrics(row_log_every=int(os.getenv('SCRAPERS_ROW_LOG_EVERY', '0') or 0))
@@ -0,0 +1,394 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from .correlation_engine import MAX_DAYS_DIFF, MIN_DAYS_DIFF
+from .instrumentation import metrics
+
+DEFAULT_LOCAL_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.local.db')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql', 'local_store.sql')
+
+# table -> (conflict columns for the upsert on Supabase, column the replication watermark is on)
+REPLICATED_TABLES = {
+    'federal_contracts': ('contract_id', 'id'),
+    'congressional_trades': ('politician_name,stock_symbol,transaction_date', 'id'),
+    'institutional_trades': (None, 'id'),
+    'contract_trade_correlations': ('politician,symbol,contract_id', 'write_seq'),
+}
+# Stamped by LocalStore on every write to a table that has it, and never replicated
+WRITE_SEQ = 'write_seq'
+
+_OR_CLAUSE = re.compile(r'(\w+)\.(eq|ilike)\.(?:"((?:[^"\\]|\\.)*)"|([^,]*))')
+
+
+class LocalResult:
+    def __init__(self, data):
+        self.data = data
+
+
+def _column(name):
+    """Quote a column name taken from a query builder call"""
+    if not re.fullmatch(r'\w+', name):
+        raise ValueError(f"Bad column name: {name!r}")
+    return f'"{name}"'
+
+
+def _has_offset(column):
+    """SQL test for an ISO timestamp carrying a UTC offset ('Z' or +HH:MM), i.e. an aware datetime"""
+    return f"({column} like '%Z' or substr({column}, -6) glob '[+-][0-9][0-9]:[0-9][0-9]')"
+
+
+class LocalQuery:
+    """The subset of the PostgREST query builder the scrapers use, compiled to SQLite"""
+
+    def __init__(self, store, table):
+        self.store = store
+        self.table = _column(table)
+        self._columns = '*'
+        self._where = []
+        self._params = []
+        self._order = None
+        self._limit = None
+        self._write = None
+
+    def select(self, columns='*'):
+        self._columns = columns
+        return self
+
+    def _filter(self, sql, *params):
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(f"{_column(column)} = ?", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            return self._filter("0")
+        return self._filter(f"{_column(column)} in ({','.join('?' * len(values))})", *values)
+
+    def gt(self, column, value):
+        return self._filter(f"{_column(column)} > ?", value)
+
+    def lte(self, column, value):
+        return self._filter(f"{_column(column)} <= ?", value)
+
+    def or_(self, clauses):
+        """PostgREST or= syntax, eq and ilike only: 'company_name.ilike."*boeing*",state.eq.VA'"""
+        parts, params = [], []
+        for column, op, quoted, bare in _OR_CLAUSE.findall(clauses):
+            value = quoted if quoted else bare
+            if op == 'eq':
+                parts.append(f"{_column(column)} = ?")
+                params.append(value)
+            else:
+                # SQLite's LIKE is already case-insensitive for ASCII
+                parts.append(f"{_column(column)} like ? escape '\\'")
+                escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                params.append(escaped.replace('*', '%'))
+        if not parts:
+            raise ValueError(f"Unsupported or_ filter: {clauses!r}")
+        return self._filter(f"({' or '.join(parts)})", *params)
+
+    def order(self, column, desc=False):
+        self._order = f"{_column(column)}{' desc' if desc else ''}"
+        return self
+
+    def limit(self, count):
+        self._limit = int(count)
+        return self
+
+    def insert(self, rows):
+        self._write = ('insert', rows, None, False)
+        return self
+
+    def upsert(self, rows, on_conflict='', ignore_duplicates=False):
+        self._write = ('upsert', rows, on_conflict, ignore_duplicates)
+        return self
+
+    def execute(self):
+        if self._write:
+            return LocalResult(self.store._write(self.table, *self._write))
+
+        columns = '*' if self._columns.strip() == '*' else \
+            ','.join(_column(column.strip()) for column in self._columns.split(','))
+        sql = f"select {columns} from {self.table}"
+        if self._where:
+            sql += f" where {' and '.join(self._where)}"
+        if self._order:
+            sql += f" order by {self._order}"
+        if self._limit is not None:
+            sql += f" limit {self._limit}"
+        return LocalResult(self.store.query(sql, self._params))
+
+
+class LocalStore:
+    """Embedded SQLite copy of the scraper tables, usable wherever a Supabase client is.
+
+    table(...) speaks the same select/eq/in_/gt/lte/or_/order/limit/insert/
+    upsert subset as the Supabase client, so BatchUpserter, CorrelationStore,
+    the streaming join and the scrapers work unchanged. On top of that,
+    correlate() runs the contract x trade join as one indexed SQL query
+    instead of shipping both tables to Python, and replicate() pushes new
+    rows on to Supabase. One connection is shared by every thread behind a
+    lock; WAL keeps readers in other processes out of the writer's way.
+    """
+
+    def __init__(self, path=DEFAULT_LOCAL_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute("pragma synchronous=normal")
+            with open(SCHEMA_PATH) as f:
+                self._conn.executescript(f.read())
+            self._migrate()
+        self._columns = {}
+
+    def _migrate(self):
+        """Add columns introduced after a store file was created; SQLite has no 'add column if not exists'"""
+        columns = {row[1] for row in self._conn.execute("pragma table_info(contract_trade_correlations)")}
+        if 'trade_dates' not in columns:
+            self._conn.execute("alter table contract_trade_correlations add column trade_dates text")
+        if WRITE_SEQ not in columns:
+            self._conn.execute(f"alter table contract_trade_correlations add column {WRITE_SEQ} integer")
+        # Here rather than in the schema file, which runs before the column exists on old files
+        self._conn.execute(f"create index if not exists contract_trade_correlations_{WRITE_SEQ}_idx "
+                           f"on contract_trade_correlations ({WRITE_SEQ})")
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def query(self, sql, params=()):
+        with self._lock, metrics.timed('db_request_seconds', table='local', op='select'):
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def _table_columns(self, table):
+        if table not in self._columns:
+            with self._lock:
+                self._columns[table] = {row[1] for row in self._conn.execute(f"pragma table_info({table})")}
+        return self._columns[table]
+
+    def _write(self, table, kind, rows, on_conflict, ignore_duplicates):
+        rows = rows if isinstance(rows, list) else [rows]
+        if not rows:
+            return rows
+        # Columns the table doesn't have are dropped, as PostgREST would reject them
+        known = self._table_columns(table)
+        columns = [column for column in rows[0] if column in known and column != WRITE_SEQ]
+        # Every write to a table with write_seq stamps its rows with one number higher than any
+        # before it, taken inside the write's transaction; replication pages on it
+        stamped = WRITE_SEQ in known
+        if stamped:
+            columns.append(WRITE_SEQ)
+        sql = f"insert into {table} ({','.join(_column(c) for c in columns)}) " \
+              f"values ({','.join('?' * len(columns))})"
+
+        if kind == 'upsert':
+            conflict = [column.strip() for column in on_conflict.split(',')]
+            sql += f" on conflict ({','.join(_column(c) for c in conflict)})"
+            updates = [column for column in columns if column not in conflict and column != 'id']
+            if ignore_duplicates or not updates:
+                sql += " do nothing"
+            else:
+                sql += " do update set " + ','.join(f"{_column(c)} = excluded.{_column(c)}" for c in updates)
+
+        with self._lock, self._conn, metrics.timed('db_request_seconds', table='local', op=kind):
+            if stamped:
+                seq = self._conn.execute(f"select coalesce(max({WRITE_SEQ}), 0) + 1 from {table}").fetchone()[0]
+                values = ([row.get(column) for column in columns[:-1]] + [seq] for row in rows)
+            else:
+                values = ([row.get(column) for column in columns] for row in rows)
+            self._conn.executemany(sql, values)
+        return rows
+
+    def resolve_symbols(self, resolver):
+        """Resolve the company name of every contract not seen before into contract_symbols.
+
+        Name matching needs the Python resolver, so it runs once per contract
+        and is kept; a changed alias table resolves everything again.
+        """
+        fingerprint = hashlib.sha1(json.dumps(resolver.aliases, sort_keys=True).encode()).hexdigest()
+        with self._lock, self._conn:
+            stored = self._conn.execute("select value from store_meta where key = 'resolver'").fetchone()
+            if not stored or stored[0] != fingerprint:
+                self._conn.execute("delete from contract_symbols")
+                self._conn.execute("insert or replace into store_meta (key, value) values ('resolver', ?)",
+                                   (fingerprint,))
+            pending = self._conn.execute(
+                "select c.contract_id, c.company_name from federal_contracts c "
+                "left join contract_symbols s on s.contract_id = c.contract_id "
+                "where s.contract_id is null").fetchall()
+
+            resolved = []
+            for contract_id, company_name in pending:
+                match = resolver.resolve(company_name)
+                resolved.append((contract_id, *(match or (None, None))))
+            self._conn.executemany("insert into contract_symbols (contract_id, symbol, alias) values (?, ?, ?)",
+                                   resolved)
+        return len(resolved)
+
+    def correlate(self, resolver, min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF, include_ids=False,
+                  after_contract_id=None, after_trade_id=None, max_contract_id=None, max_trade_id=None):
+        """Contract x trade correlations computed in SQL; same dicts and order as correlate_contracts.
+
+        Timestamped dates are handled as in Python: days_before_award is the
+        floor of the full difference, and naive/offset pairs don't match.
+
+        With both after_* ids set, only pairs involving a contract or a trade
+        newer than those are returned (each pair once), which is what the
+        incremental refresh needs. max_* ids leave out rows written after the
+        caller read its watermarks.
+        """
+        with metrics.stage('resolve') as stage:
+            stage.rows = self.resolve_symbols(resolver)
+
+        extra = ", c.contract_id as contract_id, s.alias as matched_alias" if include_ids else ""
+        # (contract_date - trade_date).days as Python computes it: the full
+        # timestamps subtracted (in whole milliseconds, so no float error
+        # creeps in) and floored to days
+        diff_ms = "cast(round((julianday(c.award_date) - julianday(t.transaction_date)) * 86400000) as integer)"
+        days = f"(({diff_ms}) - ((({diff_ms}) % 86400000) + 86400000) % 86400000) / 86400000"
+        select = f"""
+            select t.politician_name as politician, s.symbol as stock, c.company_name as company,
+                   substr(t.transaction_date, 1, 10) as trade_date, c.award_date as contract_date,
+                   {days} as days_before_award,
+                   c.contract_amount as contract_amount, c.agency as agency{extra}, c.id as _cid, t.id as _tid
+            from federal_contracts c
+            join contract_symbols s on s.contract_id = c.contract_id and s.symbol is not null
+            join congressional_trades t on t.stock_symbol = s.symbol
+                and t.transaction_date >= date(substr(c.award_date, 1, 10), ?)
+                and t.transaction_date < date(substr(c.award_date, 1, 10), ?)
+            where t.transaction_type = 'BUY'
+                and case when length(t.transaction_date) = 10 and length(c.award_date) = 10
+                    then t.transaction_date >= date(c.award_date, ?) and t.transaction_date < date(c.award_date, ?)
+                    else {_has_offset('t.transaction_date')} = {_has_offset('c.award_date')}
+                        and {days} between ? and ?
+                end"""
+        # The join range on the date part only narrows the index scan: it's
+        # a day wider on each side than the window, as UTC offsets can move
+        # a timestamp across midnight. Two plain dates are then checked as
+        # dates ([award - max_days, award - min_days]), anything with a time
+        # on the exact day count. Python can't compare naive and
+        # offset-aware datetimes and skips those pairs, so they're skipped here.
+        params = [f"-{max_days + 2} days", f"{2 - min_days:+d} days",
+                  f"-{max_days} days", f"{1 - min_days:+d} days", min_days, max_days]
+        if max_contract_id is not None:
+            select += " and c.id <= ?"
+            params.append(max_contract_id)
+        if max_trade_id is not None:
+            select += " and t.id <= ?"
+            params.append(max_trade_id)
+
+        if after_contract_id is not None and after_trade_id is not None:
+            sql = f"{select} and c.id > ? union all {select} and c.id <= ? and t.id > ? order by _cid, _tid"
+            params = params + [after_contract_id] + params + [after_contract_id, after_trade_id]
+        else:
+            sql = f"{select} order by _cid, _tid"
+
+        with metrics.stage('join') as stage:
+            rows = self.query(sql, params)
+            for row in rows:
+                del row['_cid'], row['_tid']
+            stage.rows = len(rows)
+        return rows
+
+    def max_id(self, table):
+        rows = self.query(f"select max(id) as id from {_column(table)}")
+        return rows[0]['id'] or 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def replicate(store, client, state, tables=None, page_size=1000):
+    """Push rows added to the local store since the last run on to Supabase.
+
+    Each table has its own watermark in `state` ('replicate:<table>'):
+    the row id for append-mostly tables, write_seq for the correlation
+    table whose rows are rewritten in place. write_seq grows with every
+    committed write, so a refresh still writing its chunks can't be
+    overtaken (refreshed_at, shared by a whole refresh, could). Local ids
+    and write_seq aren't sent, the remote table assigns its own ids;
+    conflicts resolve on the same keys the scrapers upsert on.
+    """
+    from .batch_writer import BatchUpserter
+    from .streaming_correlations import iter_table
+
+    stats = {}
+    for table in tables or REPLICATED_TABLES:
+        on_conflict, mark_column = REPLICATED_TABLES[table]
+        mark = state.get(f'replicate:{table}')
+        if mark_column == WRITE_SEQ and isinstance(mark, str):
+            # A refreshed_at mark from before write_seq: send the table once more
+            state.reset(f'replicate:{table}')
+            mark = None
+        filters = [lambda q, m=mark, c=mark_column: q.gt(c, m)] if mark is not None else []
+        if mark_column == WRITE_SEQ:
+            # Pages go by id, so a row rewritten behind the cursor would be passed over while
+            # its write's other rows still move the mark; capping the pass at the sequence
+            # it started from leaves every later write, rewrites included, for the next run
+            upper = store.query(f"select max({WRITE_SEQ}) as seq from {table}")[0]['seq']
+            if upper is not None:
+                filters.append(lambda q, u=upper: q.lte(WRITE_SEQ, u))
+
+        rows = iter_table(store, table, '*', filters=filters, page_size=page_size)
+        latest = mark
+        count = 0
+        with metrics.stage(f"replicate:{table}") as stage:
+            if on_conflict:
+                writer = BatchUpserter(client, table, on_conflict, chunk_size=page_size, count_existing=False)
+            batch = []
+            for row in rows:
+                value = row[mark_column]
+                # iter_table pages on the row it yielded last, so send a copy without local columns
+                row = {column: v for column, v in row.items() if column not in ('id', WRITE_SEQ)}
+                latest = value if latest is None else max(latest, value)
+                count += 1
+                if on_conflict:
+                    writer.add(row)
+                else:
+                    batch.append(row)
+                    if len(batch) >= page_size:
+                        client.table(table).insert(batch).execute()
+                        batch = []
+            if on_conflict:
+                writer.flush()
+            elif batch:
+                client.table(table).insert(batch).execute()
+            stage.rows = count
+
+        if count:
+            state.advance(f'replicate:{table}', latest)
+        stats[table] = count
+        print(f"  ✓ {table}: {count} rows replicated")
+    return stats
+
+
+if __name__ == "__main__":
+    from .config import get_supabase
+    from .sync_state import SyncState
+
+    parser = argparse.ArgumentParser(description="Replicate the local SQLite store to Supabase")
+    parser.add_argument('--db', default=DEFAULT_LOCAL_DB, help="Local store path")
+    parser.add_argument('--tables', help=f"Comma separated (default: {', '.join(REPLICATED_TABLES)})")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("LOCAL STORE REPLICATION")
+    print("=" * 50)
+
+    tables = [t.strip() for t in args.tables.split(',')] if args.tables else None
+    replicate(LocalStore(args.db), get_supabase(), SyncState(), tables)
+    print("\nReplication complete!")
+    metrics.report()
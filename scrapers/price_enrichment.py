@@ -0,0 +1,251 @@
+import argparse
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import metrics
+from .response_cache import ResponseCache
+
+# Calendar days after the trade at which returns are measured
+HORIZONS = (5, 30, 90)
+PRICE_SOURCE = 'yahoo_prices'
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_ordinals(values):
+    """ISO date strings as date.toordinal() values in one vectorized parse; -1 where unparseable"""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object).str[:10], format='%Y-%m-%d', errors='coerce')
+    days = parsed.to_numpy(dtype='datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+    return np.where(parsed.isna().to_numpy(), -1, days)
+
+
+class PriceTable:
+    """Daily closes for many symbols on one shared calendar, as NumPy arrays.
+
+    days holds the sorted calendar as date.toordinal() values and closes is
+    (len(days), len(symbols)). A symbol's gaps between its first and last
+    close are forward-filled (holidays, halts); before and after them it is
+    NaN, so a trade outside a symbol's history gets no return rather than a
+    stale one.
+    """
+
+    def __init__(self, days, symbols, closes):
+        self.days = np.asarray(days, dtype=np.int64)
+        self.symbols = pd.Index(symbols)
+        self.closes = np.asarray(closes, dtype=np.float64).reshape(len(self.days), len(self.symbols))
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Wide frame: a date index and one close column per symbol"""
+        if frame.empty:
+            return cls([], list(frame.columns), np.empty((0, len(frame.columns))))
+        frame = frame.sort_index().ffill(limit_area='inside')
+        days = pd.DatetimeIndex(frame.index).values.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+        return cls(days, [str(c) for c in frame.columns], frame.to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_long(cls, frame):
+        """Long frame with symbol, date and close columns"""
+        if frame.empty:
+            return cls([], [], np.empty((0, 0)))
+        wide = frame.assign(date=pd.to_datetime(frame['date'].astype(str).str[:10])).pivot_table(
+            index='date', columns='symbol', values='close', aggfunc='last')
+        return cls.from_frame(wide)
+
+    @classmethod
+    def from_records(cls, series):
+        """{symbol: [{'date': 'YYYY-MM-DD', 'close': float}, ...]}, the shape PriceLoader caches"""
+        rows = [(symbol, record['date'], record['close']) for symbol, records in series.items() for record in records]
+        return cls.from_long(pd.DataFrame(rows, columns=['symbol', 'date', 'close']))
+
+    @classmethod
+    def from_csv(cls, path):
+        """A symbol,date,close CSV, e.g. a fixture for runs without network access"""
+        return cls.from_long(pd.read_csv(path, dtype={'symbol': str, 'date': str}))
+
+    def to_csv(self, path):
+        day_index = pd.to_datetime(self.days - _EPOCH_ORDINAL, unit='D')
+        frame = pd.DataFrame(self.closes, index=day_index.rename('date'), columns=self.symbols.rename('symbol'))
+        frame.stack().rename('close').reset_index()[['symbol', 'date', 'close']].to_csv(
+            path, index=False, date_format='%Y-%m-%d')
+
+    def forward_returns(self, symbols, trade_days, horizons=HORIZONS):
+        """(len(symbols), len(horizons)) array of close-to-close returns, NaN where unknown.
+
+        Entry is the close on the first trading day on or after the trade
+        day, exit the close on the first trading day on or after trade day
+        + horizon. Everything is index arithmetic over the arrays: no loop
+        per trade.
+        """
+        columns = self.symbols.get_indexer(pd.Index(symbols, dtype=object))
+        trade_days = np.asarray(trade_days, dtype=np.int64)
+        horizons = np.asarray(horizons, dtype=np.int64)
+        returns = np.full((len(columns), len(horizons)), np.nan)
+        if not len(self.days) or not len(columns):
+            return returns
+
+        entry = np.searchsorted(self.days, trade_days, side='left')
+        exit_ = np.searchsorted(self.days, trade_days[:, None] + horizons[None, :], side='left')
+        # trade_days of -1 mark unparseable dates
+        known = (columns >= 0) & (trade_days >= 0) & (entry < len(self.days))
+        valid = known[:, None] & (exit_ < len(self.days))
+
+        rows, cols = np.nonzero(valid)
+        entry_close = self.closes[entry[rows], columns[rows]]
+        exit_close = self.closes[exit_[rows, cols], columns[rows]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[rows, cols] = np.where(entry_close > 0, exit_close / entry_close - 1, np.nan)
+        return returns
+
+
+def download_closes(symbols, start, end):
+    """Adjusted daily closes for every symbol in one yf.download call, as a wide frame.
+
+    end is exclusive, as in yfinance.
+    """
+    import yfinance as yf
+
+    frame = yf.download(list(symbols), start=start.isoformat(), end=end.isoformat(), auto_adjust=True,
+                        progress=False, threads=True)
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=list(symbols))
+    closes = frame['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(symbols[0])
+    return closes
+
+
+class PriceLoader:
+    """Fetches closes through one batched download and keeps each symbol in the ResponseCache.
+
+    A symbol's cached series is reused while it covers the requested range;
+    the range is only trusted up to the day it was fetched, so recent
+    windows refresh once a day and history never does. Every symbol that
+    isn't covered goes into the same download. downloader(symbols, start,
+    end) returns a wide frame like download_closes; pass one to run from a
+    fixture.
+    """
+
+    def __init__(self, cache=None, downloader=download_closes):
+        self.cache = cache or ResponseCache(ttl=None)
+        self.downloader = downloader
+
+    def load(self, symbols, start, end):
+        """PriceTable for symbols over [start, end)"""
+        symbols = sorted({s for s in symbols if s})
+        today = date.today()
+        needed_end = min(end, today)
+
+        series, missing = {}, []
+        for symbol in symbols:
+            cached = self.cache.get(PRICE_SOURCE, {'symbol': symbol})
+            meta = cached[1] if cached else None
+            if meta and meta['start'] <= start.isoformat() and meta['end'] >= needed_end.isoformat():
+                metrics.count('cache_hits', source=PRICE_SOURCE)
+                series[symbol] = cached[0]
+            else:
+                missing.append(symbol)
+
+        if missing:
+            metrics.count('cache_misses', value=len(missing), source=PRICE_SOURCE)
+            print(f"📈 Downloading prices for {len(missing)} symbols ({start} to {end})...")
+            with metrics.stage('price_download') as stage:
+                frame = self.downloader(missing, start, end)
+                stage.rows = int(frame.notna().to_numpy().sum())
+            meta = {'start': start.isoformat(), 'end': needed_end.isoformat()}
+            # yfinance reports failures as missing data; when nothing came back
+            # at all it's the connection, not the symbols, so cache nothing
+            succeeded = bool(stage.rows)
+            for symbol in missing:
+                column = frame[symbol].dropna() if symbol in frame.columns else pd.Series(dtype=float)
+                records = [{'date': day.strftime('%Y-%m-%d'), 'close': float(close)}
+                           for day, close in column.items()]
+                if succeeded:
+                    # Symbols Yahoo doesn't know are cached empty, so they aren't retried every run
+                    self.cache.put(PRICE_SOURCE, {'symbol': symbol}, records, meta)
+                series[symbol] = records
+
+        return PriceTable.from_records(series)
+
+
+def enrich_correlations(correlations, prices=None, loader=None, horizons=HORIZONS):
+    """Add return_<h>d (fractional forward return, None when unknown) to each correlation, in place.
+
+    Works on the output of FederalContractsTracker.find_contract_trade_correlations
+    and QuiverClient.find_correlations, keyed by 'stock' and 'trade_date'.
+    Without a PriceTable the prices every correlation needs are loaded in
+    one go through loader (default: a PriceLoader). Returns correlations.
+    """
+    if not correlations:
+        return correlations
+
+    with metrics.stage('price_enrichment') as stage:
+        symbols = [c.get('stock') for c in correlations]
+        trade_days = day_ordinals([c.get('trade_date') for c in correlations])
+
+        if prices is None:
+            known = trade_days[trade_days >= 0]
+            if not len(known):
+                known = np.array([date.today().toordinal()])
+            start = date.fromordinal(int(known.min()))
+            # A little slack past the longest horizon for weekends and holidays
+            end = date.fromordinal(int(known.max()) + max(horizons) + 7)
+            prices = (loader or PriceLoader()).load(symbols, start, end)
+
+        returns = prices.forward_returns(symbols, trade_days, horizons)
+        rounded = np.round(returns, 6)
+        keys = [f"return_{h}d" for h in horizons]
+        for correlation, row, missing in zip(correlations, rounded.tolist(), np.isnan(returns).tolist()):
+            for key, value, unknown in zip(keys, row, missing):
+                correlation[key] = None if unknown else value
+        stage.rows = len(correlations)
+    return correlations
+
+
+def _format_return(value):
+    return f"{value:+.1%}" if value is not None else "n/a"
+
+
+if __name__ == "__main__":
+    from .streaming_correlations import JsonlSink
+
+    parser = argparse.ArgumentParser(description="Attach forward price returns to contract/trade correlations")
+    parser.add_argument('--source', choices=['federal', 'quiver'], default='federal')
+    parser.add_argument('--engine', default='python', help="Correlation engine to run (see find_*_correlations)")
+    parser.add_argument('--prices', help="symbol,date,close CSV to use instead of downloading from Yahoo")
+    parser.add_argument('--out', help="Write the enriched correlations to this JSONL file")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("PRICE IMPACT OF CORRELATED TRADES")
+    print("=" * 50)
+
+    if args.source == 'quiver':
+        from .quiver_client import QuiverClient
+
+        correlations = QuiverClient().find_correlations(engine=args.engine)
+    else:
+        from .federal_contracts_scraper import FederalContractsTracker
+
+        correlations = FederalContractsTracker().find_contract_trade_correlations(engine=args.engine)
+
+    prices = PriceTable.from_csv(args.prices) if args.prices else None
+    enrich_correlations(correlations, prices=prices)
+
+    for correlation in correlations[:20]:
+        returns = ', '.join(f"{h}d {_format_return(correlation[f'return_{h}d'])}" for h in HORIZONS)
+        print(f"  {correlation['politician']} / {correlation['stock']} on {correlation['trade_date']}: {returns}")
+    if args.out:
+        sink = JsonlSink(args.out)
+        try:
+            for correlation in correlations:
+                sink.write(correlation)
+        finally:
+            sink.close()
+    print(f"✅ Enriched {len(correlations)} correlations")
+    metrics.report()
@@ -1,52 +1,129 @@
-import os
 import json
-import requests
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from supabase import create_client
 
-load_dotenv('../.env.local')
+from .batch_writer import BatchUpserter
+from .config import get_config, get_store
+from .http_transport import get_transport
+from .instrumentation import metrics
+from .records import Trade
+from .response_cache import ResponseCache
+from .sync_state import SyncState
+from .ticker_resolver import get_resolver
 
 class QuiverClient:
-    def __init__(self, api_key=None):
-        self.api_key = api_key or os.getenv('QUIVER_API_KEY')
-        self.base_url = "https://api.quiverquant.com/beta"
-        self.supabase = create_client(
-            os.getenv('NEXT_PUBLIC_SUPABASE_URL'),
-            os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-        )
+    def __init__(self, api_key=None, state=None, cache=None, base_url="https://api.quiverquant.com/beta",
+                 page_size=None, transport=None, client=None, config=None):
+        self.config = config or get_config()
+        self.api_key = api_key or self.config.quiver_api_key
+        # Optional SyncState; when set, only trades reported since the last sync are written
+        self.state = state
+        # Optional ResponseCache; fresh responses are read from disk instead of the API
+        self.cache = cache
+        self.base_url = base_url.rstrip('/')
+        # Endpoints are paged with ?page=&page_size= when page_size is set
+        self.page_size = page_size
+        # Shared pooled session, per-host rate limit, retries and ETag revalidation
+        self.transport = transport or get_transport()
+        self.resolver = get_resolver()
+        
+        # Responses are memoized for the life of the client (one pipeline run)
+        self._responses = {}
+        self._responses_lock = threading.Lock()
+        # Supabase client; only built once a sync actually writes
+        self._supabase = client
         
         # Use mock data if no API key
         self.use_mock = not bool(self.api_key)
         if self.use_mock:
             print("⚠️ Using MOCK data - add QUIVER_API_KEY to .env.local for real data")
     
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = get_store(self.config)
+        return self._supabase
+    
     def get_congress_trades(self):
         """Get recent congressional trades"""
         if self.use_mock:
-            return self._mock_congress_trades()
+            return self._memoized('congress/trades', self._mock_congress_trades)
         
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        response = requests.get(f"{self.base_url}/congress/trades", headers=headers)
-        return response.json()
+        return self._memoized('congress/trades', lambda: self._get('congress/trades'))
     
     def get_government_contracts(self):
         """Get recent government contracts"""
         if self.use_mock:
-            return self._mock_contracts()
+            return self._memoized('government/contracts', self._mock_contracts)
             
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        response = requests.get(f"{self.base_url}/government/contracts", headers=headers)
-        return response.json()
+        return self._memoized('government/contracts', lambda: self._get('government/contracts'))
     
     def get_lobbying_data(self):
         """Get lobbying expenditures"""
         if self.use_mock:
-            return self._mock_lobbying()
+            return self._memoized('lobbying', self._mock_lobbying)
             
+        return self._memoized('lobbying', lambda: self._get('lobbying'))
+    
+    def fetch_all(self):
+        """Fetch congress trades, contracts and lobbying concurrently"""
+        with metrics.stage('fetch') as stage, ThreadPoolExecutor(max_workers=3) as executor:
+            congress = executor.submit(self.get_congress_trades)
+            contracts = executor.submit(self.get_government_contracts)
+            lobbying = executor.submit(self.get_lobbying_data)
+            results = congress.result(), contracts.result(), lobbying.result()
+            stage.rows = sum(len(result) for result in results)
+            return results
+    
+    def reset_run_cache(self):
+        """Forget memoized responses so the next call hits the API again"""
+        with self._responses_lock:
+            self._responses = {}
+    
+    def _memoized(self, endpoint, load):
+        """Load each endpoint once per run; concurrent callers wait on the same fetch"""
+        with self._responses_lock:
+            future = self._responses.get(endpoint)
+            owner = future is None
+            if owner:
+                future = self._responses[endpoint] = Future()
+        
+        if owner:
+            try:
+                future.set_result(load())
+            except Exception as e:
+                with self._responses_lock:
+                    self._responses.pop(endpoint, None)
+                future.set_exception(e)
+        return future.result()
+    
+    def _get(self, endpoint):
+        def fetch():
+            return self._get_pages(endpoint), None
+        
+        if self.cache is None:
+            return fetch()[0]
+        return self.cache.fetch('quiver', {'url': f"{self.base_url}/{endpoint}",
+                                           'page_size': self.page_size}, fetch)[0]
+    
+    def _get_pages(self, endpoint):
+        url = f"{self.base_url}/{endpoint}"
+        if not self.page_size:
+            return self._request(url)
+        
+        rows = []
+        page = 1
+        while True:
+            batch = self._request(url, {'page': page, 'page_size': self.page_size})
+            rows.extend(batch)
+            if len(batch) < self.page_size:
+                return rows
+            page += 1
+    
+    def _request(self, url, params=None):
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        response = requests.get(f"{self.base_url}/lobbying", headers=headers)
-        return response.json()
+        return self.transport.get_json(url, params=params, headers=headers, source='quiver')
     
     def _mock_congress_trades(self):
         """Mock data that matches QuiverQuant structure"""
@@ -107,11 +184,17 @@ class QuiverClient:
             }
         ]
     
-    def find_correlations(self):
-        """AI-powered correlation finder"""
-        congress = self.get_congress_trades()
-        contracts = self.get_government_contracts()
-        lobbying = self.get_lobbying_data()
+    def find_correlations(self, engine='python'):
+        """AI-powered correlation finder
+
+        engine='vectorized' uses the shared NumPy/pandas backend so the two
+        implementations can be checked against each other.
+        """
+        congress, contracts, lobbying = self.fetch_all()
+        
+        if engine == 'vectorized':
+            from .vectorized_engine import quiver_correlations
+            return quiver_correlations(congress, contracts, self.resolver)
         
         correlations = []
         
@@ -128,6 +211,7 @@ class QuiverClient:
                             'alert_type': 'CONGRESS_CONTRACT_CORRELATION',
                             'politician': trade['Representative'],
                             'stock': trade['Ticker'],
+                            'trade_date': trade['Date'][:10],
                             'contract_value': contract['Amount'],
                             'days_before_award': (contract_date - trade_date).days,
                             'confidence': 'HIGH'
@@ -137,55 +221,73 @@ class QuiverClient:
     
     def _companies_match(self, ticker, company_name):
         """Match ticker to company name"""
-        ticker_map = {
-            'MSFT': 'Microsoft',
-            'NVDA': 'NVIDIA',
-            'PLTR': 'Palantir',
-            'META': 'Meta',
-            'GOOGL': 'Google',
-            'AAPL': 'Apple'
-        }
-        
-        if ticker in ticker_map:
-            return ticker_map[ticker].lower() in company_name.lower()
-        return False
+        return ticker in self.resolver.tickers_in(company_name)
     
-    def sync_to_database(self):
-        """Sync all data to Supabase"""
+    def _reported_on(self, trade):
+        """Disclosure date, or None when QuiverQuant doesn't give one"""
+        reported = trade.get('ReportDate')
+        return reported[:10] if reported else None
+    
+    def sync_to_database(self, chunk_size=500, detector=None):
+        """Sync all data to Supabase
+
+        With an AnomalyDetector the synced trades are also run through it
+        and its alerts come back under 'anomalies'.
+        """
         print("Syncing QuiverQuant data to database...")
         
         # Sync congress trades
         trades = self.get_congress_trades()
-        for trade in trades:
-            formatted_trade = {
-                'politician_name': trade['Representative'],
-                'politician_party': trade.get('Party', 'Unknown'),
-                'politician_state': trade.get('State', 'Unknown'),
-                'stock_symbol': trade['Ticker'],
-                'transaction_type': 'BUY' if 'Purchase' in trade['Transaction'] else 'SELL',
-                'amount_range': trade['Amount'],
-                'transaction_date': trade['Date']
-            }
-            
+        
+        # Trades are disclosed weeks after they happen, so the watermark is on
+        # the report date, never the trade date. Rows without a report date
+        # can't be placed against it and are always sent, as are rows on the
+        # mark itself; the upsert dedupes them.
+        last_reported = self.state.get('quiver:congress_trades') if self.state else None
+        if last_reported:
+            trades = [t for t in trades if (self._reported_on(t) or last_reported) >= last_reported]
+        
+        writer = BatchUpserter(
+            self.supabase,
+            'congressional_trades',
+            'politician_name,stock_symbol,transaction_date',
+            chunk_size=chunk_size
+        )
+        records = [Trade.from_quiver(trade) for trade in trades]
+        for record in records:
             # Upsert to avoid duplicates
-            self.supabase.table('congressional_trades').upsert(
-                formatted_trade, 
-                on_conflict='politician_name,stock_symbol,transaction_date'
-            ).execute()
+            writer.add(record.to_row())
+        writer.flush()
         
-        print(f"✅ Synced {len(trades)} congressional trades")
+        if self.state:
+            reported = [r for r in map(self._reported_on, trades) if r]
+            self.state.advance('quiver:congress_trades', max(reported, default=None))
+        
+        print(f"✅ Synced {len(trades)} congressional trades "
+              f"({writer.stats['inserted']} new, {writer.stats['updated']} updated, "
+              f"{writer.stats['skipped']} skipped)")
+        
+        anomalies = []
+        if detector is not None:
+            from .anomaly_detector import describe
+
+            anomalies = detector.ingest_all(records)
+            for alert in anomalies:
+                print(describe(alert))
         
         # Find and save correlations
         correlations = self.find_correlations()
         if correlations:
             print(f"🎯 Found {len(correlations)} correlations!")
             for correlation in correlations:
-                print(f"  - {correlation['politician']} bought {correlation['stock']} "
-                      f"{correlation['days_before_award']} days before ${correlation['contract_value']:,} contract")
+                metrics.log_row('correlation', f"  - {correlation['politician']} bought {correlation['stock']} "
+                                f"{correlation['days_before_award']} days before ${correlation['contract_value']:,} contract")
         
         return {
             'trades_synced': len(trades),
-            'correlations_found': len(correlations)
+            'write_stats': writer.stats,
+            'correlations_found': len(correlations),
+            'anomalies': anomalies
         }
 
 if __name__ == "__main__":
@@ -193,7 +295,7 @@ if __name__ == "__main__":
     print("QUIVERQUANT DATA PIPELINE")
     print("=" * 50)
     
-    client = QuiverClient()  # Will use mock data without API key
+    client = QuiverClient(state=SyncState(), cache=ResponseCache())  # Will use mock data without API key
     
     # Test each endpoint
     print("\n📊 Congressional Trades:")
@@ -212,4 +314,5 @@ if __name__ == "__main__":
     print("\n✅ Syncing to database...")
     result = client.sync_to_database()
     
-    print("\nPipeline complete!")
\ No newline at end of file
+    print("\nPipeline complete!")
+    metrics.report()
\ No newline at end of file
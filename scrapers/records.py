@@ -0,0 +1,211 @@
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+# A number starts with a digit and runs to its last digit; a K/M/B scale only counts
+# right after it and not as the start of a word ('$50,000 Bonds')
+_AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)(?!\d)([KMB](?![A-Za-z])|)', re.IGNORECASE)
+_SCALE = {'': 1, 'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def to_ordinal(value):
+    """Calendar day of an ISO date/datetime string (or date) as date.toordinal(); None if unparseable.
+
+    Only the date part is read, so '2024-12-15T16:00:00Z' is day 2024-12-15.
+    """
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def from_ordinal(ordinal):
+    return date.fromordinal(ordinal).isoformat() if ordinal is not None else None
+
+
+@lru_cache(maxsize=1024)
+def parse_amount_range(text):
+    """(low, high) dollars for a disclosure range like '$1M - $5M' or '$1,001 - $15,000'.
+
+    Open-ended ranges ('Over $50M', '$50,000,001 +') have high None; a
+    single amount is its own range. Unparseable text gives (None, None).
+    """
+    if not text:
+        return None, None
+    text = str(text)
+    amounts = [float(number.replace(',', '')) * _SCALE[suffix.upper()]
+               for number, suffix in _AMOUNT.findall(text)]
+    if not amounts:
+        return None, None
+    if len(amounts) >= 2:
+        return amounts[0], amounts[1]
+    if '+' in text or text.strip().lower().startswith('over'):
+        return amounts[0], None
+    return amounts[0], amounts[0]
+
+
+@dataclass(slots=True)
+class Contract:
+    """One federal_contracts row; award_date is a day ordinal"""
+    contract_id: str
+    company_name: str
+    contract_amount: float
+    agency: str
+    award_date: int
+    description: str = ''
+    state: str = ''
+    id: int = None
+
+    def __post_init__(self):
+        # Recipients win many awards, so names repeat as much as agencies do
+        self.company_name = _intern(self.company_name)
+        self.agency = _intern(self.agency)
+        self.state = _intern(self.state)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            contract_id=row['contract_id'],
+            company_name=row['company_name'],
+            contract_amount=float(row.get('contract_amount') or 0),
+            agency=row.get('agency'),
+            award_date=to_ordinal(row.get('award_date')),
+            description=row.get('description') or '',
+            state=row.get('state') or '',
+            id=row.get('id')
+        )
+
+    def to_row(self):
+        """federal_contracts payload (without the database id)"""
+        return {
+            'company_name': self.company_name,
+            'contract_amount': self.contract_amount,
+            'agency': self.agency,
+            'award_date': from_ordinal(self.award_date),
+            'description': self.description,
+            'contract_id': self.contract_id,
+            'state': self.state
+        }
+
+
+@dataclass(slots=True)
+class Trade:
+    """One congressional_trades row; transaction_date is a day ordinal, amounts in dollars"""
+    politician_name: str
+    stock_symbol: str
+    transaction_type: str
+    transaction_date: int
+    amount_range: str = None
+    amount_low: float = None
+    amount_high: float = None
+    politician_party: str = 'Unknown'
+    politician_state: str = 'Unknown'
+    id: int = None
+
+    def __post_init__(self):
+        # A few hundred members, tickers and ranges repeat across every row
+        self.politician_name = _intern(self.politician_name)
+        self.stock_symbol = _intern(self.stock_symbol)
+        self.transaction_type = _intern(self.transaction_type)
+        self.amount_range = _intern(self.amount_range)
+        self.politician_party = _intern(self.politician_party)
+        self.politician_state = _intern(self.politician_state)
+
+    @classmethod
+    def from_row(cls, row):
+        amount_range = row.get('amount_range')
+        low, high = parse_amount_range(amount_range)
+        return cls(
+            politician_name=row['politician_name'],
+            stock_symbol=row['stock_symbol'],
+            transaction_type=row['transaction_type'],
+            transaction_date=to_ordinal(row.get('transaction_date')),
+            amount_range=amount_range,
+            amount_low=low,
+            amount_high=high,
+            politician_party=row.get('politician_party') or 'Unknown',
+            politician_state=row.get('politician_state') or 'Unknown',
+            id=row.get('id')
+        )
+
+    @classmethod
+    def from_quiver(cls, item):
+        """From a QuiverQuant congress/trades item"""
+        return cls.from_row({
+            'politician_name': item['Representative'],
+            'politician_party': item.get('Party', 'Unknown'),
+            'politician_state': item.get('State', 'Unknown'),
+            'stock_symbol': item['Ticker'],
+            'transaction_type': 'BUY' if 'Purchase' in item['Transaction'] else 'SELL',
+            'amount_range': item['Amount'],
+            'transaction_date': item['Date']
+        })
+
+    def to_row(self):
+        """congressional_trades payload (without the database id)"""
+        return {
+            'politician_name': self.politician_name,
+            'politician_party': self.politician_party,
+            'politician_state': self.politician_state,
+            'stock_symbol': self.stock_symbol,
+            'transaction_type': self.transaction_type,
+            'amount_range': self.amount_range,
+            'transaction_date': from_ordinal(self.transaction_date)
+        }
+
+
+@dataclass(slots=True)
+class Holding:
+    """One institutional_trades row; filing_date is a day ordinal"""
+    investor_name: str
+    stock_symbol: str
+    company_name: str
+    shares_amount: int
+    value_amount: float
+    filing_date: int
+    investor_type: str = 'INSTITUTIONAL'
+    transaction_type: str = 'HOLD'
+    source: str = '13F'
+
+    def __post_init__(self):
+        self.investor_name = _intern(self.investor_name)
+        self.stock_symbol = _intern(self.stock_symbol)
+        self.company_name = _intern(self.company_name)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            investor_name=row['investor_name'],
+            stock_symbol=row['stock_symbol'],
+            company_name=row.get('company_name') or '',
+            shares_amount=int(row['shares_amount']),
+            value_amount=float(row['value_amount']),
+            filing_date=to_ordinal(row.get('filing_date')),
+            investor_type=row.get('investor_type') or 'INSTITUTIONAL',
+            transaction_type=row.get('transaction_type') or 'HOLD',
+            source=row.get('source') or '13F'
+        )
+
+    def to_row(self):
+        """institutional_trades payload"""
+        return {
+            'investor_name': self.investor_name,
+            'investor_type': self.investor_type,
+            'stock_symbol': self.stock_symbol,
+            'company_name': self.company_name,
+            'transaction_type': self.transaction_type,
+            'shares_amount': self.shares_amount,
+            'value_amount': self.value_amount,
+            'filing_date': from_ordinal(self.filing_date),
+            'source': self.source
+        }
@@ -0,0 +1,122 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from datetime import date
+
+from .instrumentation import metrics
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+_META_KEY = b'smart_money_meta'
+_JSON_COLUMN = '_json'
+
+
+_SCALARS = (str, int, float, bool)
+
+
+def _columnar(records):
+    """Whether Arrow columns give these records back unchanged.
+
+    from_pylist takes its columns from the first record, widens ints mixed
+    with floats to floats and merges nested dicts into one padded struct,
+    so only flat records with the same keys and one scalar type per column
+    are stored as columns.
+    """
+    if not records:
+        return True
+    keys = records[0].keys()
+    types = {}
+    for record in records:
+        if record.keys() != keys:
+            return False
+        for column, value in record.items():
+            if value is None:
+                continue
+            kind = type(value)
+            if kind not in _SCALARS or types.setdefault(column, kind) is not kind:
+                return False
+    return True
+
+
+class ResponseCache:
+    """On-disk Parquet cache of raw API responses.
+
+    Each response is one file at <root>/source=<source>/date=<fetch date>/<key>.parquet,
+    where key hashes the request parameters. Anything that isn't a list of
+    records (page metadata, company names...) rides along in the file's
+    schema metadata. Files are read memory-mapped. ttl is in seconds;
+    ttl=None never expires, which is what offline reruns and backtests want.
+    pyarrow is only imported once a file is actually read or written.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, ttl=6 * 3600):
+        self.root = root
+        self.ttl = ttl
+
+    @staticmethod
+    def key(params):
+        encoded = json.dumps(params, sort_keys=True, default=str).encode()
+        return hashlib.sha1(encoded).hexdigest()
+
+    def _path(self, source, key, fetched_on):
+        return os.path.join(self.root, f"source={source}", f"date={fetched_on}", f"{key}.parquet")
+
+    def _latest(self, source, key):
+        paths = glob.glob(os.path.join(self.root, f"source={source}", "date=*", f"{key}.parquet"))
+        return max(paths, key=os.path.getmtime) if paths else None
+
+    def get(self, source, params):
+        """(records, meta) if a fresh copy is cached, else None"""
+        path = self._latest(source, self.key(params))
+        if not path:
+            return None
+        if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+            return None
+
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, memory_map=True)
+        meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b'null'))
+        if table.column_names == [_JSON_COLUMN]:
+            records = [json.loads(value) for value in table.column(_JSON_COLUMN).to_pylist()]
+        else:
+            records = table.to_pylist()
+        return records, meta
+
+    def put(self, source, params, records, meta=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = None
+        if _columnar(records):
+            try:
+                table = pa.Table.from_pylist(records)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                pass
+        if table is None:
+            # Anything Arrow would reshape goes in as one JSON document per record
+            table = pa.table({_JSON_COLUMN: [json.dumps(record, default=str) for record in records]})
+        table = table.replace_schema_metadata({_META_KEY: json.dumps(meta, default=str)})
+
+        path = self._path(source, self.key(params), date.today().isoformat())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def fetch(self, source, params, fetcher):
+        """Return the cached (records, meta) or call fetcher() and cache what it returns"""
+        cached = self.get(source, params)
+        if cached is not None:
+            metrics.count('cache_hits', source=source)
+            return cached
+
+        metrics.count('cache_misses', source=source)
+        records, meta = fetcher()
+        self.put(source, params, records, meta)
+        return records, meta
+
+    def dataset(self, source):
+        """Every cached response for a source as one Arrow dataset, partitioned by fetch date"""
+        import pyarrow.dataset as ds
+        return ds.dataset(os.path.join(self.root, f"source={source}"), format='parquet', partitioning='hive')
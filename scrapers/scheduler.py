@@ -0,0 +1,220 @@
+import argparse
+import heapq
+import os
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrumentation import metrics
+
+
+class Job:
+    """One scheduled source.
+
+    `run` is a zero-argument callable returning True when it changed
+    upstream data. A job with `triggers` only runs once one of those jobs
+    has reported a change since its own last successful run.
+    """
+
+    def __init__(self, name, interval, run, jitter=0.1, concurrency=1, triggers=(), initial_delay=0.0):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.jitter = jitter
+        self.triggers = tuple(triggers)
+        self.initial_delay = initial_delay
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.concurrency = concurrency
+        # Trigger generations this job has already acted on
+        self.seen = {}
+
+
+class Scheduler:
+    """Runs jobs on their own intervals from one resident process.
+
+    Each due time gets +/- jitter * interval of random spread so sources
+    don't fire in lockstep. A job that is still running when it comes due
+    again is skipped for that round once its concurrency slots are full.
+    Every successful run that changed data bumps the job's generation,
+    which is what triggered jobs (the correlation refresh) wait for.
+    """
+
+    def __init__(self, jobs, max_workers=None, rng=None, clock=time.monotonic):
+        self.jobs = {job.name: job for job in jobs}
+        self.max_workers = max_workers or sum(job.concurrency for job in jobs)
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.generations = {job.name: 0 for job in jobs}
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def _next_due(self, job, now):
+        spread = job.interval * job.jitter
+        return now + job.interval + self.rng.uniform(-spread, spread)
+
+    def _pending_changes(self, job):
+        with self._lock:
+            return {name: self.generations[name] for name in job.triggers
+                    if self.generations[name] > job.seen.get(name, 0)}
+
+    def run_job(self, job):
+        """Run one job now if it has work and free its slot; returns whether it changed data"""
+        try:
+            return self._run(job)
+        finally:
+            job.slots.release()
+            path = os.getenv('SCRAPERS_METRICS_OUT')
+            if path:
+                metrics.write(path)
+
+    def _run(self, job):
+        changes = self._pending_changes(job)
+        if job.triggers and not changes:
+            metrics.count('job_runs', job=job.name, outcome='unchanged')
+            return False
+        try:
+            with metrics.stage(f"job:{job.name}"):
+                changed = bool(job.run())
+        except Exception as e:
+            metrics.count('job_runs', job=job.name, outcome='failed')
+            print(f"❌ {job.name} failed: {e}")
+            # The changes are still unhandled, so the next round retries them
+            return False
+
+        # Only what was pending when the run started: changes that landed meanwhile trigger the next one
+        job.seen.update(changes)
+        metrics.count('job_runs', job=job.name, outcome='changed' if changed else 'ok')
+        if changed:
+            with self._lock:
+                self.generations[job.name] += 1
+        return changed
+
+    def _submit(self, executor, job):
+        if not job.slots.acquire(blocking=False):
+            metrics.count('job_runs', job=job.name, outcome='skipped')
+            print(f"⏭️ {job.name} still running, skipping this round")
+            return None
+        return executor.submit(self.run_job, job)
+
+    def run_once(self):
+        """Run every job once, in order, so triggered jobs see this round's changes"""
+        for job in self.jobs.values():
+            job.slots.acquire()
+            self.run_job(job)
+
+    def run_forever(self):
+        now = self.clock()
+        queue = [(now + job.initial_delay, index, job) for index, job in enumerate(self.jobs.values())]
+        heapq.heapify(queue)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self.stop_event.is_set():
+                due, index, job = queue[0]
+                wait = due - self.clock()
+                if wait > 0:
+                    self.stop_event.wait(wait)
+                    continue
+
+                # Scheduled from now, so a stall doesn't turn into a burst of catch-up runs
+                heapq.heapreplace(queue, (self._next_due(job, max(due, self.clock())), index, job))
+                self._submit(executor, job)
+        print("👋 Scheduler stopped")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+def build_jobs(args):
+    """Jobs sharing one warm set of clients, sessions and caches"""
+    from .anomaly_detector import AnomalyDetector
+    from .config import get_config, get_store, get_supabase
+    from .federal_contracts_scraper import FederalContractsTracker
+    from .institutional_scraper import DEFAULT_SYMBOLS, load_symbols, scrape_institutional_holdings
+    from .quiver_client import QuiverClient
+    from .response_cache import ResponseCache
+    from .sync_state import SyncState
+
+    state = SyncState()
+    cache = ResponseCache()
+    tracker = FederalContractsTracker(max_workers=args.usaspending_workers, state=state, cache=cache)
+    quiver = QuiverClient(state=state, cache=cache)
+    # Rolling windows live in memory between rounds and on disk between restarts
+    detector = AnomalyDetector.load()
+    symbols = load_symbols(args.symbols_file) if args.symbols_file else DEFAULT_SYMBOLS
+
+    def sync_contracts():
+        # A failed write raises, so the run counts as failed and the watermark stays put
+        stats = tracker.sync_to_database(tracker.get_recent_contracts(days_back=args.days_back))
+        return bool(stats['inserted'])
+
+    def sync_quiver():
+        # The client memoizes responses per run; a new round must hit the API again
+        quiver.reset_run_cache()
+        result = quiver.sync_to_database(detector=detector)
+        detector.save()
+        return bool(result['write_stats']['inserted'])
+
+    def sync_institutional():
+        return bool(scrape_institutional_holdings(state=state, symbols=symbols, cache=cache,
+                                                  max_workers=args.institutional_workers))
+
+    def refresh_correlations():
+        return bool(tracker.refresh_correlation_table()['rows'])
+
+    jobs = [
+        Job('usaspending', args.usaspending_interval, sync_contracts, args.jitter),
+        Job('quiver', args.quiver_interval, sync_quiver, args.jitter),
+        Job('institutional', args.institutional_interval, sync_institutional, args.jitter),
+        # Checked often, but only does anything after a source brought in new rows
+        Job('correlations', args.correlation_interval, refresh_correlations, args.jitter,
+            triggers=('usaspending', 'quiver'), initial_delay=args.correlation_interval),
+    ]
+
+    if get_config().local_db:
+        from .local_store import replicate
+
+        store = get_store()
+
+        def replicate_to_supabase():
+            return bool(sum(replicate(store, get_supabase(), state).values()))
+
+        # The scrapers write to the local store; Supabase gets whatever changed
+        jobs.append(Job('replicate', args.replicate_interval, replicate_to_supabase, args.jitter,
+                        triggers=('usaspending', 'quiver', 'institutional', 'correlations'),
+                        initial_delay=args.replicate_interval))
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every scraper from one long-lived process")
+    parser.add_argument('--usaspending-interval', type=float, default=3600, help="Seconds between contract syncs")
+    parser.add_argument('--quiver-interval', type=float, default=900, help="Seconds between QuiverQuant syncs")
+    parser.add_argument('--institutional-interval', type=float, default=86400,
+                        help="Seconds between 13F scrapes")
+    parser.add_argument('--correlation-interval', type=float, default=300,
+                        help="Seconds between checks for new data to correlate")
+    parser.add_argument('--replicate-interval', type=float, default=300,
+                        help="Seconds between pushes to Supabase when SCRAPERS_LOCAL_DB is set")
+    parser.add_argument('--usaspending-workers', type=int, default=4, help="Parallel USAspending windows")
+    parser.add_argument('--institutional-workers', type=int, default=8, help="Parallel yfinance fetches")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Random spread as a fraction of the interval")
+    parser.add_argument('--days-back', type=int, default=30)
+    parser.add_argument('--symbols-file', help="Tickers for the 13F scrape, one per line")
+    parser.add_argument('--once', action='store_true', help="Run each job once and exit")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("SMART MONEY SCHEDULER")
+    print("=" * 50)
+
+    scheduler = Scheduler(build_jobs(args))
+    if args.once:
+        scheduler.run_once()
+        metrics.report()
+    else:
+        signal.signal(signal.SIGTERM, scheduler.stop)
+        signal.signal(signal.SIGINT, scheduler.stop)
+        scheduler.run_forever()
+        metrics.report()
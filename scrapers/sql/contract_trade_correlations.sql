@@ -0,0 +1,32 @@
+-- Materialized contract/trade correlations, refreshed by
+-- FederalContractsTracker.refresh_correlation_table() and read by the dashboard.
+create table if not exists contract_trade_correlations (
+    id bigint generated by default as identity primary key,
+    politician text not null,
+    symbol text not null,
+    contract_id text not null,
+    company text,
+    agency text,
+    contract_amount numeric,
+    contract_date date,
+    first_trade_date date,
+    last_trade_date date,
+    days_before_award integer,
+    trade_count integer not null default 1,
+    -- Comma separated dates of the trades counted, so re-merging them is a no-op
+    trade_dates text,
+    matched_alias text,
+    signal text,
+    score numeric,
+    refreshed_at timestamptz not null default now(),
+    unique (politician, symbol, contract_id)
+);
+
+-- Tables created before trade_dates existed
+alter table contract_trade_correlations add column if not exists trade_dates text;
+
+create index if not exists contract_trade_correlations_score_idx
+    on contract_trade_correlations (score desc);
+
+create index if not exists contract_trade_correlations_contract_idx
+    on contract_trade_correlations (contract_id);
@@ -0,0 +1,86 @@
+-- SQLite schema for local_store.LocalStore, mirroring the Supabase tables the
+-- scrapers write. Dates are ISO 'YYYY-MM-DD' text, so they compare and
+-- range-scan as strings.
+create table if not exists federal_contracts (
+    id integer primary key autoincrement,
+    company_name text,
+    contract_amount real,
+    agency text,
+    award_date text,
+    description text,
+    contract_id text not null unique,
+    state text
+);
+
+create table if not exists congressional_trades (
+    id integer primary key autoincrement,
+    politician_name text not null,
+    politician_party text,
+    politician_state text,
+    stock_symbol text not null,
+    transaction_type text,
+    amount_range text,
+    transaction_date text not null,
+    unique (politician_name, stock_symbol, transaction_date)
+);
+
+create index if not exists congressional_trades_symbol_date_idx
+    on congressional_trades (stock_symbol, transaction_date);
+
+create table if not exists institutional_trades (
+    id integer primary key autoincrement,
+    investor_name text,
+    investor_type text,
+    stock_symbol text,
+    company_name text,
+    transaction_type text,
+    shares_amount integer,
+    value_amount real,
+    filing_date text,
+    source text
+);
+
+create index if not exists institutional_trades_symbol_date_idx
+    on institutional_trades (stock_symbol, filing_date);
+
+create table if not exists contract_trade_correlations (
+    id integer primary key autoincrement,
+    politician text not null,
+    symbol text not null,
+    contract_id text not null,
+    company text,
+    agency text,
+    contract_amount real,
+    contract_date text,
+    first_trade_date text,
+    last_trade_date text,
+    days_before_award integer,
+    trade_count integer not null default 1,
+    trade_dates text,
+    matched_alias text,
+    signal text,
+    score real,
+    refreshed_at text,
+    -- Bumped by LocalStore on every write; the replication watermark (local only)
+    write_seq integer,
+    unique (politician, symbol, contract_id)
+);
+
+create index if not exists contract_trade_correlations_score_idx
+    on contract_trade_correlations (score desc);
+
+-- Ticker each contract's company resolves to (null when none), filled in
+-- by LocalStore.resolve_symbols so the join can run in SQL
+create table if not exists contract_symbols (
+    contract_id text primary key,
+    symbol text,
+    alias text
+);
+
+create index if not exists contract_symbols_symbol_idx
+    on contract_symbols (symbol);
+
+create table if not exists store_meta (
+    key text primary key,
+    value text
+);
@@ -0,0 +1,192 @@
+import argparse
+import json
+import sys
+
+from .correlation_engine import TradeIndex, iter_correlations
+from .correlation_store import TABLE as CORRELATION_TABLE, CorrelationStore
+from .instrumentation import metrics
+from .ticker_resolver import get_resolver
+
+# Only the columns the join reads
+CONTRACT_COLUMNS = 'id,contract_id,company_name,award_date,contract_amount,agency'
+TRADE_COLUMNS = 'id,politician_name,stock_symbol,transaction_type,transaction_date'
+
+
+def iter_table(client, table, columns, filters=(), key='id', page_size=1000):
+    """Keyset-paginate a table: WHERE key > last ORDER BY key LIMIT page_size.
+
+    `filters` are callables applied to the query builder, e.g.
+    lambda q: q.eq('stock_symbol', 'NVDA').
+    """
+    last = None
+    while True:
+        query = client.table(table).select(columns)
+        for apply_filter in filters:
+            query = apply_filter(query)
+        if last is not None:
+            query = query.gt(key, last)
+        rows = query.order(key).limit(page_size).execute().data or []
+
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = rows[-1][key]
+
+
+def company_alias_filter(aliases):
+    """PostgREST or= filter matching any alias inside company_name"""
+    clauses = ','.join(f'company_name.ilike."*{alias}*"' for alias in aliases)
+    return lambda query: query.or_(clauses)
+
+
+def iter_symbol_partitions(client, resolver=None, symbols=None, page_size=1000, include_ids=False):
+    """Yield (symbol, correlations generator) one symbol partition at a time.
+
+    Only that symbol's BUY trades are held in memory; contracts that could
+    match it are streamed page by page past the trade index.
+    """
+    resolver = resolver or get_resolver()
+    symbols = symbols or sorted({ticker for _, ticker, _ in resolver.aliases})
+
+    for symbol in symbols:
+        trades = list(iter_table(
+            client, 'congressional_trades', TRADE_COLUMNS,
+            filters=[lambda q, s=symbol: q.eq('stock_symbol', s), lambda q: q.eq('transaction_type', 'BUY')],
+            page_size=page_size
+        ))
+        if not trades:
+            continue
+
+        contracts = iter_table(
+            client, 'federal_contracts', CONTRACT_COLUMNS,
+            filters=[company_alias_filter(resolver.aliases_for([symbol]))],
+            page_size=page_size
+        )
+        # The ilike prefilter is looser than the resolver, keep only contracts that resolve here
+        contracts = (c for c in contracts if resolver.symbol(c['company_name']) == symbol)
+
+        yield symbol, iter_correlations(contracts, TradeIndex(trades), resolver, include_ids=include_ids)
+
+
+def iter_streaming_correlations(client, resolver=None, symbols=None, page_size=1000, include_ids=False):
+    for _, correlations in iter_symbol_partitions(client, resolver, symbols, page_size, include_ids):
+        yield from correlations
+
+
+class StdoutSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, default=str) + '\n')
+
+    def close(self):
+        self.stream.flush()
+
+
+class JsonlSink(StdoutSink):
+    def __init__(self, path):
+        super().__init__(open(path, 'w'))
+
+    def close(self):
+        self.stream.close()
+
+
+class BatchInsertSink:
+    """Inserts records into a table in chunks"""
+
+    def __init__(self, client, table, chunk_size=500, transform=None):
+        self.client = client
+        self.table = table
+        self.chunk_size = chunk_size
+        self.transform = transform
+        self._rows = []
+        self.written = 0
+
+    def write(self, record):
+        self._rows.append(self.transform(record) if self.transform else record)
+        if len(self._rows) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self.client.table(self.table).insert(self._rows).execute()
+            self.written += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        self._flush()
+
+
+class CorrelationTableSink:
+    """Merges correlations into the materialized contract_trade_correlations table in chunks.
+
+    Goes through CorrelationStore, so rows are keyed, scored and merged with
+    what's stored exactly as refresh_correlation_table writes them.
+    """
+
+    # The table is keyed on contract_id
+    include_ids = True
+
+    def __init__(self, client, table=CORRELATION_TABLE, chunk_size=500):
+        self.store = CorrelationStore(client, table, chunk_size)
+        self.chunk_size = chunk_size
+        self._correlations = []
+        self.written = 0
+
+    def write(self, record):
+        self._correlations.append(record)
+        if len(self._correlations) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._correlations:
+            self.store.upsert(self._correlations)
+            self.written += len(self._correlations)
+            self._correlations = []
+
+    def close(self):
+        self._flush()
+
+
+def run_streaming(client, sink, resolver=None, symbols=None, page_size=1000):
+    """Stream every correlation into sink; returns how many were written
+
+    Sinks with include_ids set get contract_id and matched_alias on each record.
+    """
+    include_ids = getattr(sink, 'include_ids', False)
+    count = 0
+    try:
+        with metrics.stage('stream') as stage:
+            for record in iter_streaming_correlations(client, resolver, symbols, page_size, include_ids):
+                sink.write(record)
+                count += 1
+            stage.rows = count
+    finally:
+        sink.close()
+    return count
+
+
+if __name__ == "__main__":
+    from .config import get_store
+
+    parser = argparse.ArgumentParser(description="Stream contract/trade correlations symbol by symbol")
+    parser.add_argument('--sink', choices=['stdout', 'jsonl', 'table'], default='stdout')
+    parser.add_argument('--out', help="Output path for --sink jsonl, correlation table name for --sink table")
+    parser.add_argument('--symbols', help="Comma separated tickers (default: every ticker the resolver knows)")
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    client = get_store()
+
+    if args.sink == 'jsonl':
+        sink = JsonlSink(args.out or 'correlations.jsonl')
+    elif args.sink == 'table':
+        sink = CorrelationTableSink(client, args.out or CORRELATION_TABLE)
+    else:
+        sink = StdoutSink()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',')] if args.symbols else None
+    count = run_streaming(client, sink, symbols=symbols, page_size=args.page_size)
+    print(f"✅ Streamed {count} correlations", file=sys.stderr)
+    metrics.report()
@@ -0,0 +1,52 @@
+import json
+import os
+import threading
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sync_state.json')
+
+
+class SyncState:
+    """Per-source high-water marks persisted to a small local JSON file.
+
+    Keys are free-form source names ('usaspending', 'quiver:congress_trades',
+    'institutional:NVDA', ...). Values are anything comparable and JSON
+    serializable: ISO date strings or integer row ids. A mark only moves
+    forward, so replaying an old batch can't rewind it.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._marks = json.load(f)
+
+    def get(self, source, default=None):
+        return self._marks.get(source, default)
+
+    def advance(self, source, value):
+        """Move the mark forward to value and persist it"""
+        if value is None:
+            return self.get(source)
+
+        with self._lock:
+            current = self._marks.get(source)
+            if current is None or value > current:
+                self._marks[source] = value
+                self._save()
+            return self._marks[source]
+
+    def reset(self, source=None):
+        with self._lock:
+            if source is None:
+                self._marks = {}
+            else:
+                self._marks.pop(source, None)
+            self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._marks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,112 @@
+import json
+from datetime import date, timedelta
+
+from scrapers.anomaly_detector import AnomalyDetector
+from scrapers.benchmarks import generators
+from scrapers.instrumentation import metrics
+from scrapers.records import Trade
+
+START = date(2024, 1, 1)
+SMALL, MEDIUM, LARGE = '$1,001 - $15,000', '$15,001 - $50,000', '$1M - $5M'
+
+
+def _trade(member, symbol, day, kind='BUY', amount=SMALL):
+    return Trade.from_row({'politician_name': member, 'stock_symbol': symbol, 'transaction_type': kind,
+                           'transaction_date': (START + timedelta(days=day)).isoformat(), 'amount_range': amount})
+
+
+def _types(alerts):
+    return [alert['type'] for alert in alerts]
+
+
+def test_a_cluster_is_raised_as_each_new_member_joins():
+    detector = AnomalyDetector(cluster_days=5, cluster_members=3)
+
+    alerts = [detector.ingest(t) for t in [
+        _trade('A', 'NVDA', 0), _trade('B', 'NVDA', 1), _trade('C', 'NVDA', 1, kind='SELL'),
+        _trade('A', 'NVDA', 2), _trade('C', 'NVDA', 3), _trade('D', 'NVDA', 4), _trade('E', 'AAPL', 4)]]
+
+    assert [len(a) for a in alerts] == [0, 0, 0, 0, 1, 1, 0]
+    assert alerts[4][0]['members'] == ['A', 'B', 'C']
+    assert alerts[5][0]['members'] == ['A', 'B', 'C', 'D']
+    assert alerts[5][0]['date'] == '2024-01-05'
+
+
+def test_members_who_left_the_window_no_longer_count():
+    inside = AnomalyDetector(cluster_days=5).ingest_all(
+        [_trade('A', 'NVDA', 0), _trade('B', 'NVDA', 1), _trade('C', 'NVDA', 4)])
+    # Day 5 is five days on from A's day 0, so A has dropped out by then
+    outside = AnomalyDetector(cluster_days=5).ingest_all(
+        [_trade('A', 'NVDA', 0), _trade('B', 'NVDA', 1), _trade('C', 'NVDA', 5)])
+
+    assert _types(inside) == ['cluster']
+    assert outside == []
+
+
+def test_resent_trades_are_ignored():
+    detector = AnomalyDetector(cluster_members=2)
+    trades = [_trade('A', 'NVDA', 0), _trade('B', 'NVDA', 1)]
+    metrics.reset()
+
+    first = detector.ingest_all(trades)
+    again = detector.ingest_all(trades)
+
+    assert _types(first) == ['cluster']
+    assert again == []
+    assert metrics.summary()['counters']['anomaly_trades{outcome="duplicate"}'] == 2
+
+
+def _baseline(member='A', trades=5):
+    # Small trades spread over the baseline period
+    return [_trade(member, f'S{n}', 30 * n) for n in range(trades)]
+
+
+def test_a_volume_spike_needs_both_the_rate_and_the_trade_size():
+    big, ordinary = AnomalyDetector(), AnomalyDetector()
+
+    big_alerts = big.ingest_all(_baseline() + [_trade('A', 'LMT', 170, amount=LARGE)])
+    # Twenty times the baseline rate, but no bigger than five of their usual trades
+    ordinary_alerts = ordinary.ingest_all(_baseline() + [_trade('A', 'LMT', 170, amount=MEDIUM)])
+
+    assert _types(big_alerts) == ['volume_spike']
+    assert big_alerts[0]['amount'] == 3_000_000
+    assert big_alerts[0]['ratio'] >= 5
+    assert ordinary_alerts == []
+
+
+def test_a_volume_spike_is_raised_once_and_needs_a_baseline():
+    detector = AnomalyDetector()
+    detector.ingest_all(_baseline() + [_trade('A', 'LMT', 170, amount=LARGE)])
+
+    assert detector.ingest(_trade('A', 'BA', 171, amount=LARGE)) == []
+    assert AnomalyDetector().ingest_all(_baseline(trades=4) + [_trade('A', 'LMT', 170, amount=LARGE)]) == []
+
+
+def test_a_trade_older_than_the_baseline_is_dropped():
+    detector = AnomalyDetector(baseline_days=180)
+    detector.ingest(_trade('A', 'NVDA', 200))
+
+    assert detector.ingest(_trade('B', 'NVDA', 20)) == []
+    assert 'B' not in detector.to_state()['politicians']
+
+
+def test_saved_state_picks_up_where_it_left_off(tmp_path):
+    trades = sorted((Trade.from_row(row) for row in generators.make_congress_trades(3000, 0)),
+                    key=lambda t: t.transaction_date)
+    settings = dict(cluster_members=2, spike_ratio=3)
+    middle = len(trades) // 2
+
+    expected = AnomalyDetector(**settings).ingest_all(trades)
+
+    first = AnomalyDetector(**settings)
+    alerts = first.ingest_all(trades[:middle])
+    path = str(tmp_path / 'detector.json')
+    first.save(path)
+    resumed = AnomalyDetector.load(path, **settings)
+    alerts += resumed.ingest_all(trades[middle:])
+
+    assert {alert['type'] for alert in expected} == {'cluster', 'volume_spike'}
+    assert alerts == expected
+    with open(path) as f:
+        saved = json.load(f)
+    assert json.loads(json.dumps(AnomalyDetector(**settings).load_state(saved).to_state())) == saved
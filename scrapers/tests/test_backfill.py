@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from scrapers.backfill import iter_merged, run_backfill, shard_path
+
+START, END = date(2024, 1, 1), date(2024, 3, 31)
+
+
+def _award(award_id, day, amount=5e7):
+    award = {'Recipient Name': f'Company {award_id}', 'Award Amount': amount, 'Awarding Agency': 'NASA',
+             'Start Date': day}
+    if award_id:
+        award['generated_internal_id'] = award_id
+    return award
+
+
+class FakeFetcher:
+    """Serves fixed awards by start date; shards starting on a day in `fail` raise once"""
+
+    def __init__(self, awards, fail=()):
+        self.awards = awards
+        self.fail = set(fail)
+        self.calls = []
+
+    def __call__(self, start_date, end_date):
+        self.calls.append(start_date)
+        if start_date in self.fail:
+            self.fail.discard(start_date)
+            raise ConnectionError("USAspending unavailable")
+        return [a for a in self.awards if start_date.isoformat() <= a['Start Date'] <= end_date.isoformat()]
+
+
+def _backfill(fetcher, checkpoint_dir):
+    return run_backfill(START, END, fetcher=fetcher, shard_days=30, max_workers=2,
+                        checkpoint_dir=str(checkpoint_dir), executor_class=ThreadPoolExecutor)
+
+
+AWARDS = [
+    _award('C3', '2024-01-20'), _award('C1', '2024-01-05'), _award('C2', '2024-02-10'),
+    _award('C4', '2024-03-15'), _award('SMALL', '2024-03-16', amount=1e6),
+    # Awards without an id, at the same position in two shards
+    _award(None, '2024-02-01'), _award(None, '2024-03-02'),
+]
+
+
+def test_shards_merge_in_date_order(tmp_path):
+    shards = _backfill(FakeFetcher(AWARDS), tmp_path)
+
+    merged = list(iter_merged(shards, str(tmp_path)))
+
+    assert len(shards) == 4
+    assert [c['award_date'] for c in merged] == ['2024-01-05', '2024-01-20', '2024-02-01', '2024-02-10',
+                                                 '2024-03-02', '2024-03-15']
+    assert len({c['contract_id'] for c in merged}) == 6
+
+
+def test_the_same_award_in_two_shards_is_kept_once(tmp_path):
+    shards = _backfill(FakeFetcher([_award('C1', '2024-01-05'), _award('C1', '2024-02-10')]), tmp_path)
+
+    merged = list(iter_merged(shards, str(tmp_path)))
+
+    assert [(c['contract_id'], c['award_date']) for c in merged] == [('C1', '2024-01-05')]
+
+
+def test_a_rerun_only_fetches_the_shards_that_failed(tmp_path):
+    failing = date(2024, 1, 31)
+    fetcher = FakeFetcher(AWARDS, fail=[failing])
+
+    with pytest.raises(RuntimeError):
+        _backfill(fetcher, tmp_path)
+    assert not os.path.exists(shard_path(str(tmp_path), (failing, date(2024, 2, 29))))
+
+    fetcher.calls = []
+    shards = _backfill(fetcher, tmp_path)
+
+    assert fetcher.calls == [failing]
+    assert len(list(iter_merged(shards, str(tmp_path)))) == 6
@@ -0,0 +1,70 @@
+from scrapers.batch_writer import MAX_ROWS, BatchUpserter
+from scrapers.benchmarks import generators
+from scrapers.benchmarks.fake_supabase import FakeQuery, FakeResult, FakeSupabase
+
+TRADE_KEY = 'politician_name,stock_symbol,transaction_date'
+
+
+class CappedQuery(FakeQuery):
+    def execute(self):
+        result = super().execute()
+        return result if self._write else FakeResult(result.data[:MAX_ROWS])
+
+
+class CappedSupabase(FakeSupabase):
+    """Answers selects with at most MAX_ROWS rows, like PostgREST's max-rows"""
+
+    def table(self, name):
+        return CappedQuery(self, name)
+
+
+def _unique_trades(n, seed=0):
+    trades = {}
+    for trade in generators.make_congress_trades(n, seed):
+        trade.pop('id')
+        trades[(trade['politician_name'], trade['stock_symbol'], trade['transaction_date'])] = trade
+    return list(trades.values())
+
+
+def _new_and_changed(stored, n_new, n_changed):
+    new = [dict(t, politician_name=f"New {t['politician_name']}") for t in stored[:n_new]]
+    changed = [dict(t, amount_range='$1M - $5M') for t in stored[-n_changed:]]
+    return new + changed
+
+
+def test_counts_inserts_and_updates_on_a_composite_key():
+    stored = _unique_trades(20_000)
+    client = FakeSupabase({'congressional_trades': stored})
+
+    stats = BatchUpserter(client, 'congressional_trades', TRADE_KEY).write(_new_and_changed(stored, 400, 100))
+
+    assert stats == {'inserted': 400, 'updated': 100, 'skipped': 0}
+    assert len(client.tables['congressional_trades']) == len(stored) + 400
+
+
+def test_counts_stay_right_when_lookups_are_capped():
+    stored = _unique_trades(100_000)
+    client = CappedSupabase({'congressional_trades': stored})
+    writer = BatchUpserter(client, 'congressional_trades', TRADE_KEY)
+
+    stats = writer.write(_new_and_changed(stored, 1000, 300))
+
+    assert stats == {'inserted': 1000, 'updated': 300, 'skipped': 0}
+
+
+def test_ignore_duplicates_only_sends_new_rows():
+    client = FakeSupabase({'federal_contracts': [{'contract_id': 'A', 'contract_amount': 1}]})
+    writer = BatchUpserter(client, 'federal_contracts', 'contract_id', ignore_duplicates=True)
+
+    stats = writer.write([{'contract_id': 'A', 'contract_amount': 2}, {'contract_id': 'B', 'contract_amount': 3}])
+
+    assert stats == {'inserted': 1, 'updated': 0, 'skipped': 1}
+    assert [row['contract_amount'] for row in client.tables['federal_contracts']] == [1, 3]
+
+
+def test_rows_missing_a_key_column_are_skipped():
+    writer = BatchUpserter(FakeSupabase(), 'congressional_trades', TRADE_KEY)
+
+    stats = writer.write([{'politician_name': 'A', 'stock_symbol': None, 'transaction_date': '2024-01-01'}])
+
+    assert stats == {'inserted': 0, 'updated': 0, 'skipped': 1}
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from scrapers.benchmarks import generators
+from scrapers.benchmarks.fake_supabase import FakeSupabase
+from scrapers.benchmarks.run_benchmarks import _quiver_client
+from scrapers.correlation_engine import MAX_DAYS_DIFF, MIN_DAYS_DIFF, correlate_contracts
+from scrapers.federal_contracts_scraper import FederalContractsTracker
+from scrapers.local_store import LocalStore
+from scrapers.ticker_resolver import get_resolver
+
+
+def _nested_loop(contracts, trades, resolver):
+    """Every contract against every trade, the way find_contract_trade_correlations first did it"""
+    correlations = []
+    for contract in contracts:
+        match = resolver.resolve(contract['company_name'])
+        if not match:
+            continue
+        contract_date = datetime.fromisoformat(contract['award_date'])
+        for trade in trades:
+            if trade['stock_symbol'] != match[0] or trade['transaction_type'] != 'BUY':
+                continue
+            days_diff = (contract_date - datetime.fromisoformat(trade['transaction_date'])).days
+            if MIN_DAYS_DIFF <= days_diff <= MAX_DAYS_DIFF:
+                correlations.append({
+                    'politician': trade['politician_name'], 'stock': match[0], 'company': contract['company_name'],
+                    'trade_date': trade['transaction_date'][:10], 'contract_date': contract['award_date'],
+                    'days_before_award': days_diff, 'contract_amount': contract['contract_amount'],
+                    'agency': contract['agency']
+                })
+    return correlations
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_sort_merge_matches_the_nested_loop(seed):
+    contracts, trades = generators.make_contracts(2000, seed), generators.make_congress_trades(2000, seed)
+
+    correlations = correlate_contracts(contracts, trades, get_resolver())
+
+    assert correlations
+    assert correlations == _nested_loop(contracts, trades, get_resolver())
+
+
+def test_window_edges_match_the_nested_loop():
+    contracts = [{'company_name': 'Lockheed Martin', 'award_date': '2024-03-01', 'contract_amount': 5e7,
+                  'agency': 'NASA'}]
+    # -31/-30 and 60/61 days before the award, plus a sale inside the window
+    trades = [{'politician_name': f'Member {day}', 'stock_symbol': 'LMT', 'transaction_type': kind,
+               'transaction_date': day} for day, kind in [('2024-04-01', 'BUY'), ('2024-03-31', 'BUY'),
+                                                          ('2024-01-01', 'BUY'), ('2023-12-31', 'BUY'),
+                                                          ('2024-02-01', 'SELL')]]
+
+    correlations = correlate_contracts(contracts, trades, get_resolver())
+
+    assert [c['days_before_award'] for c in correlations] == [-30, 60]
+    assert correlations == _nested_loop(contracts, trades, get_resolver())
+
+
+@pytest.fixture(scope='module')
+def tables():
+    trades = {}
+    for trade in generators.make_congress_trades(5000, 2):
+        trade.pop('id')
+        trades[(trade['politician_name'], trade['stock_symbol'], trade['transaction_date'])] = trade
+    return {'federal_contracts': generators.make_contracts(5000, 2), 'congressional_trades': list(trades.values())}
+
+
+def _client(tables, engine):
+    if engine != 'sql':
+        return FakeSupabase({name: [dict(row) for row in rows] for name, rows in tables.items()})
+    store = LocalStore(':memory:')
+    for name, rows in tables.items():
+        store.table(name).insert(rows).execute()
+    return store
+
+
+@pytest.mark.parametrize('include_ids', [False, True])
+@pytest.mark.parametrize('engine', ['vectorized', 'records', 'sql'])
+def test_engines_match_the_sort_merge_join_on_date_only_data(tables, engine, include_ids):
+    expected = FederalContractsTracker(client=_client(tables, 'python')).find_contract_trade_correlations(
+        include_ids=include_ids)
+
+    correlations = FederalContractsTracker(client=_client(tables, engine)).find_contract_trade_correlations(
+        engine=engine, include_ids=include_ids)
+
+    assert expected
+    assert correlations == expected
+
+
+def test_quiver_engines_match():
+    congress, contracts = generators.make_quiver_trades(1000, 5), generators.make_quiver_contracts(1000, 5)
+
+    python = _quiver_client(congress, contracts).find_correlations()
+    vectorized = _quiver_client(congress, contracts).find_correlations(engine='vectorized')
+
+    assert python
+    assert vectorized == python
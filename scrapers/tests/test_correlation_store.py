@@ -0,0 +1,124 @@
+import pytest
+
+from scrapers import federal_contracts_scraper
+from scrapers.benchmarks.fake_supabase import FakeSupabase
+from scrapers.tests.test_batch_writer import CappedSupabase
+from scrapers.correlation_store import CorrelationStore
+from scrapers.federal_contracts_scraper import FederalContractsTracker
+from scrapers.local_store import LocalStore
+from scrapers.sync_state import SyncState
+
+
+def _correlation(trade_date, days_before_award):
+    return {
+        'politician': 'Member 1', 'stock': 'LMT', 'contract_id': 'C1', 'company': 'Lockheed Martin',
+        'agency': 'NASA', 'contract_amount': 50_000_000, 'contract_date': '2024-03-01',
+        'trade_date': trade_date, 'days_before_award': days_before_award, 'matched_alias': 'lockheed martin'
+    }
+
+
+@pytest.fixture(params=['fake', 'local'])
+def client(request):
+    if request.param == 'fake':
+        yield FakeSupabase()
+        return
+    store = LocalStore(':memory:')
+    yield store
+    store.close()
+
+
+def _stored(client):
+    rows = client.table('contract_trade_correlations').select('*').execute().data
+    assert len(rows) == 1
+    return rows[0]
+
+
+def test_upserting_the_same_correlations_twice_changes_nothing(client):
+    store = CorrelationStore(client)
+    correlations = [_correlation('2024-02-01', 29), _correlation('2024-02-10', 20)]
+
+    store.upsert(correlations)
+    first = _stored(client)
+    stats = store.upsert(correlations)
+    second = _stored(client)
+
+    assert stats['updated'] == 1
+    for column in ('trade_count', 'first_trade_date', 'last_trade_date', 'days_before_award', 'score'):
+        assert second[column] == first[column]
+    assert second['trade_count'] == 2
+
+
+def test_overlapping_refreshes_count_each_trade_once(client):
+    store = CorrelationStore(client)
+    store.upsert([_correlation('2024-02-01', 29), _correlation('2024-02-10', 20)])
+    store.upsert([_correlation('2024-02-10', 20), _correlation('2024-02-20', 10)])
+
+    row = _stored(client)
+    assert row['trade_count'] == 3
+    assert row['trade_dates'] == '2024-02-01,2024-02-10,2024-02-20'
+    assert (str(row['first_trade_date']), str(row['last_trade_date'])) == ('2024-02-01', '2024-02-20')
+    assert row['days_before_award'] == 29
+
+
+def test_rows_stored_before_trade_dates_keep_their_count():
+    client = FakeSupabase({'contract_trade_correlations': [dict(
+        politician='Member 1', symbol='LMT', contract_id='C1', first_trade_date='2024-02-01',
+        last_trade_date='2024-02-10', days_before_award=29, trade_count=3, contract_amount=50_000_000)]})
+
+    CorrelationStore(client).upsert([_correlation('2024-02-10', 20)])
+
+    assert _stored(client)['trade_count'] == 3
+
+
+def test_merges_stay_right_when_lookups_are_capped():
+    client = CappedSupabase()
+    store = CorrelationStore(client, chunk_size=2000)
+    members = [f'Member {n}' for n in range(15)]
+    # 1500 rows, more than one capped response holds
+    first = [dict(_correlation('2024-02-01', 29), politician=member, contract_id=f'C{n}')
+             for n in range(100) for member in members]
+
+    store.upsert(first)
+    stats = store.upsert([dict(c, trade_date='2024-02-10', days_before_award=20) for c in first])
+
+    rows = client.tables['contract_trade_correlations']
+    assert stats['updated'] == 1500
+    assert len(rows) == 1500
+    assert {row['trade_count'] for row in rows} == {2}
+
+
+def _trade(transaction_date):
+    return {'politician_name': 'Member 1', 'stock_symbol': 'LMT', 'transaction_type': 'BUY',
+            'transaction_date': transaction_date}
+
+
+def _tracker(tmp_path):
+    # The incremental join's ilike prefilter needs or_, which the LocalStore has
+    client = LocalStore(':memory:')
+    client.table('federal_contracts').insert([{'contract_id': 'C1', 'company_name': 'Lockheed Martin',
+                                               'contract_amount': 5e7, 'agency': 'NASA',
+                                               'award_date': '2024-03-01'}]).execute()
+    client.table('congressional_trades').insert([_trade('2024-02-01')]).execute()
+    state = SyncState(str(tmp_path / 'state.json'))
+    return FederalContractsTracker(client=client, state=state), client, state
+
+
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+def test_failed_refresh_leaves_the_marks_for_a_retry(tmp_path, monkeypatch, engine):
+    tracker, client, state = _tracker(tmp_path)
+    tracker.refresh_correlation_table(engine=engine)
+    client.table('congressional_trades').insert([_trade('2024-02-15')]).execute()
+
+    def failing_upsert(self, correlations):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(federal_contracts_scraper.CorrelationStore, 'upsert', failing_upsert)
+    with pytest.raises(RuntimeError):
+        tracker.refresh_correlation_table(engine=engine)
+    assert state.get('correlations:congressional_trades') == 1
+
+    monkeypatch.undo()
+    stats = tracker.refresh_correlation_table(engine=engine)
+    assert stats['correlations'] == 1
+    assert state.get('correlations:congressional_trades') == 2
+    assert _stored(client)['trade_count'] == 2
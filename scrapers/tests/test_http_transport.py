@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from scrapers import http_transport
+from scrapers.http_transport import HttpCache, TokenBucket, Transport
+from scrapers.instrumentation import metrics
+
+URL = 'https://api.example.com/v1/items'
+
+
+def _response(status, payload=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode() if payload is not None else b''
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeSession:
+    """Answers every request with respond(headers) and records the headers it was sent"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.sent = []
+
+    def request(self, method, url, params=None, json=None, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        return self.respond(headers or {})
+
+
+def _transport(session, **kwargs):
+    return Transport(rates={}, backoff=0, session=session, **kwargs)
+
+
+def test_identical_requests_in_flight_are_sent_once():
+    release = threading.Event()
+
+    def respond(headers):
+        release.wait(5)
+        return _response(200, {'items': [1, 2]})
+
+    session = FakeSession(respond)
+    transport = _transport(session)
+    metrics.reset()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(transport.get_json(URL))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while metrics.summary()['counters'].get('http_coalesced{source="api.example.com"}', 0) < 4:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(session.sent) == 1
+    assert results == [{'items': [1, 2]}] * 5
+
+
+def test_posts_are_only_coalesced_when_asked():
+    session = FakeSession(lambda headers: _response(200, {'ok': True}))
+    transport = _transport(session)
+
+    transport.post_json(URL, {'page': 1})
+    transport.post_json(URL, {'page': 1})
+
+    assert len(session.sent) == 2
+
+
+def test_an_unchanged_resource_is_replayed_from_the_etag_cache(tmp_path):
+    def respond(headers):
+        if headers.get('If-None-Match') == '"v1"':
+            return _response(304)
+        return _response(200, {'items': [1]}, {'ETag': '"v1"'})
+
+    session = FakeSession(respond)
+    transport = _transport(session, http_cache=HttpCache(str(tmp_path)))
+
+    first = transport.get_json(URL, params={'page': 1})
+    second = transport.get_json(URL, params={'page': 1})
+
+    assert first == second == {'items': [1]}
+    assert session.sent == [{}, {'If-None-Match': '"v1"'}]
+
+
+def test_a_304_without_a_cached_body_asks_again_for_the_body():
+    def respond(headers):
+        return _response(304) if 'If-None-Match' in headers else _response(200, {'items': [1]})
+
+    session = FakeSession(respond)
+
+    assert _transport(session).get_json(URL, headers={'If-None-Match': '"v1"'}) == {'items': [1]}
+    assert session.sent == [{'If-None-Match': '"v1"'}, {}]
+
+
+def test_a_bare_304_with_nothing_to_replay_raises():
+    session = FakeSession(lambda headers: _response(304))
+
+    with pytest.raises(requests.HTTPError):
+        _transport(session).get_json(URL)
+    assert len(session.sent) == 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http_transport, 'time', clock)
+    bucket = TokenBucket(rate=2, burst=2)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.5, 0.5, 0.5])
+    assert clock.now == pytest.approx(1.5)
+
+
+def test_only_listed_hosts_are_throttled(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http_transport, 'time', clock)
+    session = FakeSession(lambda headers: _response(200, {}))
+    transport = Transport(rates={'api.example.com': 1}, backoff=0, session=session)
+
+    for _ in range(3):
+        transport.post_json(URL, {})
+    throttled = clock.now
+    for _ in range(3):
+        transport.post_json('https://other.example.com/v1/items', {})
+
+    assert throttled == pytest.approx(2.0)
+    assert clock.now == throttled
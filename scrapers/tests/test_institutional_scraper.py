@@ -0,0 +1,89 @@
+import sys
+import threading
+import types
+
+import pandas as pd
+import pytest
+
+from scrapers.benchmarks.fake_supabase import FakeSupabase
+from scrapers.institutional_scraper import scrape_institutional_holdings
+from scrapers.sync_state import SyncState
+
+
+def _holders(*rows):
+    return pd.DataFrame([{'Holder': holder, 'Shares': 1000, 'Value': 1e6, 'Date Reported': pd.Timestamp(day)}
+                         for holder, day in rows])
+
+
+class StubYahoo:
+    """Stands in for the yfinance module: Ticker(symbol) serves `holders[symbol]`.
+
+    With a barrier, reading institutional_holders waits until that many
+    fetches are in flight at once.
+    """
+
+    def __init__(self, holders, barrier=None):
+        self.holders = holders
+        self.barrier = barrier
+        self.fetched = []
+        stub = self
+
+        class Ticker:
+            def __init__(self, symbol):
+                self.symbol = symbol
+                self.info = {'longName': f"{symbol} Corp"}
+
+            @property
+            def institutional_holders(self):
+                stub.fetched.append(self.symbol)
+                if stub.barrier:
+                    stub.barrier.wait()
+                return stub.holders[self.symbol]
+
+        self.Ticker = Ticker
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    def install(holders, barrier=None):
+        stub = StubYahoo(holders, barrier)
+        monkeypatch.setitem(sys.modules, 'yfinance', types.SimpleNamespace(Ticker=stub.Ticker))
+        return stub
+    return install
+
+
+def _stored(client):
+    return sorted((row['stock_symbol'], row['investor_name'], row['filing_date'])
+                  for row in client.tables['institutional_trades'])
+
+
+def test_symbols_are_fetched_in_parallel_and_keep_their_order(yahoo):
+    symbols = ['NVDA', 'AAPL', 'MSFT']
+    # Each fetch waits for the other two, so this only finishes if all three run at once
+    stub = yahoo({symbol: _holders((f'{symbol} Fund', '2024-09-30')) for symbol in symbols},
+                 barrier=threading.Barrier(3, timeout=5))
+
+    holdings = scrape_institutional_holdings(symbols=symbols, max_workers=3, client=FakeSupabase())
+
+    assert sorted(stub.fetched) == sorted(symbols)
+    assert [h.investor_name for h in holdings] == ['NVDA Fund', 'AAPL Fund', 'MSFT Fund']
+    assert holdings[0].company_name == 'NVDA Corp'
+
+
+def test_the_watermark_skips_stored_rows_but_not_new_holders_on_the_same_date(yahoo, tmp_path):
+    state = SyncState(str(tmp_path / 'state.json'))
+    client = FakeSupabase()
+    stub = yahoo({'NVDA': _holders(('Vanguard', '2024-06-30'), ('BlackRock', '2024-09-30'))})
+    scrape_institutional_holdings(state=state, symbols=['NVDA'], client=client)
+    assert state.get('institutional:NVDA') == '2024-09-30'
+
+    # Yahoo now also lists a holder filed on the mark date, and one from before it
+    stub.holders['NVDA'] = _holders(('Vanguard', '2024-06-30'), ('BlackRock', '2024-09-30'),
+                                    ('State Street', '2024-09-30'), ('Fidelity', '2024-03-31'))
+    holdings = scrape_institutional_holdings(state=state, symbols=['NVDA'], client=client)
+
+    assert [h.investor_name for h in holdings] == ['State Street']
+    assert _stored(client) == [('NVDA', 'BlackRock', '2024-09-30'), ('NVDA', 'State Street', '2024-09-30'),
+                               ('NVDA', 'Vanguard', '2024-06-30')]
+
+    assert scrape_institutional_holdings(state=state, symbols=['NVDA'], client=client) == []
@@ -0,0 +1,23 @@
+import io
+import json
+
+from scrapers.instrumentation import Metrics
+
+
+def test_int_and_str_values_of_one_label_sort_together(tmp_path):
+    metrics = Metrics()
+    # As the transport counts them: the status code, or 'error' when no response came back
+    metrics.count('http_requests', source='usaspending', status=200)
+    metrics.count('http_requests', source='usaspending', status='error')
+    metrics.count('http_requests', source='usaspending', status=200)
+    metrics.observe('http_request_seconds', 0.2, status=503)
+    metrics.observe('http_request_seconds', 0.1, status='error')
+
+    counters = metrics.summary()['counters']
+    prometheus = metrics.to_prometheus()
+    metrics.report(path=str(tmp_path / 'metrics.json'), stream=io.StringIO())
+
+    assert counters == {'http_requests{source="usaspending",status="200"}': 2,
+                        'http_requests{source="usaspending",status="error"}': 1}
+    assert 'scrapers_http_request_seconds_count{status="error"} 1' in prometheus
+    assert json.loads((tmp_path / 'metrics.json').read_text())['counters'] == counters
@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+from scrapers.benchmarks import generators
+from scrapers.benchmarks.fake_supabase import FakeSupabase
+from scrapers.correlation_engine import correlate_contracts
+from scrapers.local_store import WRITE_SEQ, LocalStore, replicate
+from scrapers.sync_state import SyncState
+from scrapers.ticker_resolver import get_resolver
+
+
+def _with_times(rows, column, rng, share):
+    """Give about `share` of the rows a time of day, some with a UTC offset"""
+    for row in rows:
+        draw = rng.random()
+        if draw < share * 0.7:
+            row[column] += f"T{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        elif draw < share * 0.85:
+            row[column] += f"T{rng.randrange(24):02d}:00:00Z"
+        elif draw < share:
+            row[column] += f"T{rng.randrange(24):02d}:30:00+05:30"
+    return rows
+
+
+def _store(size, seed, time_share=0.0):
+    rng = random.Random(seed)
+    trades = {}
+    for trade in generators.make_congress_trades(size, seed):
+        trade.pop('id')
+        trades[(trade['politician_name'], trade['stock_symbol'], trade['transaction_date'])] = trade
+    store = LocalStore(':memory:')
+    store.table('federal_contracts').insert(
+        _with_times(generators.make_contracts(size, seed), 'award_date', rng, time_share / 2)).execute()
+    store.table('congressional_trades').insert(
+        _with_times(list(trades.values()), 'transaction_date', rng, time_share)).execute()
+    return store
+
+
+def _python(store, include_ids=False):
+    contracts = store.table('federal_contracts').select('*').execute().data
+    trades = store.table('congressional_trades').select('*').execute().data
+    return correlate_contracts(contracts, trades, get_resolver(), include_ids=include_ids)
+
+
+@pytest.mark.parametrize('time_share', [0.0, 0.3])
+def test_sql_join_matches_python(time_share):
+    store = _store(5000, 3, time_share)
+
+    sql = store.correlate(get_resolver(), include_ids=True)
+
+    assert sql
+    assert sql == _python(store, include_ids=True)
+
+
+def test_incremental_sql_join_adds_up_to_the_full_join():
+    store = _store(3000, 4, 0.3)
+    resolver = get_resolver()
+    contract_mark, trade_mark = 2000, 2000
+
+    before = store.correlate(resolver, max_contract_id=contract_mark, max_trade_id=trade_mark)
+    after = store.correlate(resolver, after_contract_id=contract_mark, after_trade_id=trade_mark)
+
+    key = lambda c: tuple(sorted(c.items()))
+    assert sorted(before + after, key=key) == sorted(_python(store), key=key)
+
+
+CORRELATION_KEY = 'politician,symbol,contract_id'
+
+
+def _correlations(contract_ids, trade_count=1):
+    return [{'politician': 'Member 1', 'symbol': 'LMT', 'contract_id': contract_id, 'trade_count': trade_count,
+             'refreshed_at': '2024-03-01T00:00:00+00:00'} for contract_id in contract_ids]
+
+
+def _remote(client):
+    rows = client.tables['contract_trade_correlations']
+    assert all(WRITE_SEQ not in row for row in rows)
+    return sorted((row['contract_id'], row['trade_count']) for row in rows)
+
+
+def test_replication_keeps_up_with_a_refresh_written_in_chunks(tmp_path):
+    store, client = LocalStore(':memory:'), FakeSupabase()
+    state = SyncState(str(tmp_path / 'state.json'))
+    table = store.table('contract_trade_correlations')
+
+    # Both chunks of one refresh share a refreshed_at; replication runs between them
+    table.upsert(_correlations(['C1', 'C2']), on_conflict=CORRELATION_KEY).execute()
+    replicate(store, client, state, tables=['contract_trade_correlations'])
+    table.upsert(_correlations(['C3', 'C4']), on_conflict=CORRELATION_KEY).execute()
+    replicate(store, client, state, tables=['contract_trade_correlations'])
+
+    assert _remote(client) == [('C1', 1), ('C2', 1), ('C3', 1), ('C4', 1)]
+
+
+class RewritingSupabase(FakeSupabase):
+    """Rewrites the local table the first time replication sends it a chunk"""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def table(self, name):
+        if self.store:
+            store, self.store = self.store, None
+            # One write: a row replication has already paged past and one it hasn't reached
+            store.table(name).upsert(_correlations(['C1', 'C5'], trade_count=2), on_conflict=CORRELATION_KEY).execute()
+        return super().table(name)
+
+
+def test_rows_rewritten_during_replication_go_out_next_run(tmp_path):
+    store = LocalStore(':memory:')
+    client = RewritingSupabase(store)
+    state = SyncState(str(tmp_path / 'state.json'))
+    store.table('contract_trade_correlations').upsert(_correlations(['C1', 'C2', 'C3', 'C4']),
+                                                      on_conflict=CORRELATION_KEY).execute()
+
+    replicate(store, client, state, tables=['contract_trade_correlations'], page_size=2)
+    replicate(store, client, state, tables=['contract_trade_correlations'], page_size=2)
+
+    assert _remote(client) == [('C1', 2), ('C2', 1), ('C3', 1), ('C4', 1), ('C5', 2)]
+
+
+def test_a_refreshed_at_watermark_is_replaced(tmp_path):
+    store, client = LocalStore(':memory:'), FakeSupabase()
+    state = SyncState(str(tmp_path / 'state.json'))
+    state.advance('replicate:contract_trade_correlations', '2024-03-01T00:00:00+00:00')
+    store.table('contract_trade_correlations').upsert(_correlations(['C1']), on_conflict=CORRELATION_KEY).execute()
+
+    replicate(store, client, state, tables=['contract_trade_correlations'])
+
+    assert _remote(client) == [('C1', 1)]
+    assert state.get('replicate:contract_trade_correlations') == 1
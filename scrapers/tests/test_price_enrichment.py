@@ -0,0 +1,101 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scrapers.instrumentation import metrics
+from scrapers.price_enrichment import PRICE_SOURCE, PriceLoader, PriceTable, day_ordinals, enrich_correlations
+from scrapers.response_cache import ResponseCache
+
+# AAA trades every weekday from 2024-01-02 to 01-19 but the 15th (a holiday), closing 100, 101, ...;
+# BBB has no closes on the 9th and 10th and none after the 12th
+PRICES = os.path.join(os.path.dirname(__file__), 'data', 'prices.csv')
+
+
+@pytest.fixture
+def prices():
+    return PriceTable.from_csv(PRICES)
+
+
+def _returns(prices, symbol, trade_date, horizon):
+    return prices.forward_returns([symbol], day_ordinals([trade_date]), [horizon])[0, 0]
+
+
+def test_a_weekend_trade_enters_on_the_next_trading_day(prices):
+    # Saturday the 6th: in at Monday's 104, out on Thursday the 11th at 107
+    assert _returns(prices, 'AAA', '2024-01-06', 5) == pytest.approx(107 / 104 - 1)
+    assert _returns(prices, 'AAA', '2024-01-08T15:30:00Z', 3) == pytest.approx(107 / 104 - 1)
+
+
+def test_an_exit_on_a_holiday_takes_the_next_close(prices):
+    assert _returns(prices, 'AAA', '2024-01-12', 3) == pytest.approx(109 / 108 - 1)
+
+
+def test_gaps_inside_a_symbols_history_are_forward_filled(prices):
+    assert _returns(prices, 'BBB', '2024-01-05', 5) == pytest.approx(40 / 50 - 1)
+
+
+@pytest.mark.parametrize('symbol,trade_date,horizon', [
+    ('BBB', '2024-01-11', 5),    # past BBB's last close, though AAA goes on
+    ('AAA', '2024-01-18', 5),    # past the end of the table
+    ('AAA', '2023-12-01', 90),   # exit past the end, entry before the start
+    ('ZZZ', '2024-01-05', 5),    # not in the table
+    ('AAA', 'n/a', 5),
+    ('AAA', None, 5),
+])
+def test_unknown_returns_are_nan(prices, symbol, trade_date, horizon):
+    assert np.isnan(_returns(prices, symbol, trade_date, horizon))
+
+
+def test_csv_round_trip(prices, tmp_path):
+    path = str(tmp_path / 'prices.csv')
+    prices.to_csv(path)
+    loaded = PriceTable.from_csv(path)
+
+    assert loaded.days.tolist() == prices.days.tolist()
+    assert list(loaded.symbols) == list(prices.symbols)
+    np.testing.assert_array_equal(loaded.closes, prices.closes)
+
+
+def test_enrich_sets_none_where_the_return_is_unknown(prices):
+    correlations = [{'stock': 'AAA', 'trade_date': '2024-01-06'}, {'stock': 'ZZZ', 'trade_date': '2024-01-06'}]
+
+    enrich_correlations(correlations, prices=prices, horizons=(5,))
+
+    assert correlations[0]['return_5d'] == round(107 / 104 - 1, 6)
+    assert correlations[1]['return_5d'] is None
+
+
+class FixtureDownloader:
+    """Answers downloads from the fixture CSV, like download_closes would, and records the symbols asked for"""
+
+    def __init__(self):
+        frame = pd.read_csv(PRICES, dtype={'symbol': str, 'date': str})
+        self.frame = frame.assign(date=pd.to_datetime(frame['date'])).pivot(index='date', columns='symbol',
+                                                                            values='close')
+        self.calls = []
+
+    def __call__(self, symbols, start, end):
+        self.calls.append(list(symbols))
+        return self.frame.reindex(columns=list(symbols))
+
+
+def test_loader_serves_covered_symbols_from_the_cache(tmp_path):
+    downloader = FixtureDownloader()
+    loader = PriceLoader(ResponseCache(str(tmp_path), ttl=None), downloader=downloader)
+    start, end = date(2024, 1, 2), date(2024, 1, 20)
+    metrics.reset()
+
+    first = loader.load(['AAA', 'BBB'], start, end)
+    second = loader.load(['BBB', 'AAA'], start, end)
+
+    assert downloader.calls == [['AAA', 'BBB']]
+    assert metrics.summary()['counters'][f'cache_hits{{source="{PRICE_SOURCE}"}}'] == 2
+    np.testing.assert_array_equal(second.closes, first.closes)
+    assert _returns(second, 'BBB', '2024-01-05', 5) == pytest.approx(40 / 50 - 1)
+
+    # A wider range than was cached goes back to the downloader
+    loader.load(['AAA'], date(2023, 12, 1), end)
+    assert downloader.calls[-1] == ['AAA']
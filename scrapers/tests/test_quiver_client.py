@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from scrapers.benchmarks.fake_supabase import FakeSupabase
+from scrapers.config import Config
+from scrapers.http_transport import Transport
+from scrapers.quiver_client import QuiverClient
+from scrapers.response_cache import ResponseCache
+from scrapers.sync_state import SyncState
+
+
+def _mock_payloads():
+    """The client's own _mock_* data, with the report dates the live API adds"""
+    mock = QuiverClient(config=Config(), client=FakeSupabase())
+    trades = mock._mock_congress_trades()
+    for trade, reported in zip(trades, ['2025-01-10', '2025-01-08']):
+        trade['ReportDate'] = reported
+    return {'congress/trades': trades, 'government/contracts': mock._mock_contracts(),
+            'lobbying': mock._mock_lobbying()}
+
+
+class StubQuiver:
+    """Serves QuiverQuant endpoints from payloads on a local port, paged when asked to"""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {name: int(values[0]) for name, values in parse_qs(url.query).items()}
+                endpoint = url.path.split('/beta/', 1)[1]
+                stub.requests.append((endpoint, query.get('page'), self.headers['Authorization']))
+                rows = stub.payloads[endpoint]
+                if 'page' in query:
+                    size = query['page_size']
+                    rows = rows[(query['page'] - 1) * size:query['page'] * size]
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(json.dumps(rows).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/beta"
+
+
+@pytest.fixture
+def stub():
+    stub = StubQuiver(_mock_payloads())
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+def _client(stub, **kwargs):
+    kwargs.setdefault('client', FakeSupabase())
+    return QuiverClient(api_key='test-key', base_url=stub.url, transport=Transport(rates={}, backoff=0),
+                        config=Config(), **kwargs)
+
+
+def test_pages_are_walked_and_each_endpoint_fetched_once_per_run(stub):
+    client = _client(stub, page_size=1)
+
+    client.fetch_all()
+    congress, contracts, lobbying = client.fetch_all()
+
+    assert congress == stub.payloads['congress/trades']
+    assert contracts == stub.payloads['government/contracts']
+    # Two one-row pages and the short page that ends each endpoint
+    assert sorted((endpoint, page) for endpoint, page, _ in stub.requests) == [
+        (endpoint, page) for endpoint in ('congress/trades', 'government/contracts', 'lobbying')
+        for page in (1, 2, 3)]
+    assert {auth for _, _, auth in stub.requests} == {'Bearer test-key'}
+
+
+def test_a_second_sync_only_writes_trades_reported_since_the_first(stub, tmp_path):
+    state = SyncState(str(tmp_path / 'state.json'))
+    database = FakeSupabase()
+
+    first = _client(stub, state=state, client=database).sync_to_database()
+    stub.payloads['congress/trades'].append({
+        'Representative': 'Nancy Pelosi', 'Transaction': 'Purchase', 'Ticker': 'MSFT', 'Amount': '$1M - $5M',
+        'Date': '2024-11-20', 'ReportDate': '2025-01-15', 'Party': 'Democrat', 'State': 'CA'})
+    second = _client(stub, state=state, client=database).sync_to_database()
+
+    assert first['trades_synced'] == 2
+    # The new trade, and the one reported on the mark itself
+    assert second['trades_synced'] == 2
+    assert second['write_stats'] == {'inserted': 1, 'updated': 1, 'skipped': 0}
+    assert state.get('quiver:congress_trades') == '2025-01-15'
+    assert len(database.tables['congressional_trades']) == 3
+
+
+def test_cached_responses_are_replayed_without_the_api(stub, tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=None)
+    live = _client(stub, cache=cache).fetch_all()
+    sent = len(stub.requests)
+
+    replayed = _client(stub, cache=cache).fetch_all()
+
+    assert sent == 3
+    assert len(stub.requests) == sent
+    assert replayed == live
@@ -0,0 +1,31 @@
+import pytest
+
+from scrapers.records import Trade, parse_amount_range
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('$1,001 - $15,000', (1001.0, 15000.0)),
+    ('$1M - $5M', (1e6, 5e6)),
+    ('$1.5k - $2M', (1500.0, 2e6)),
+    ('Over $50M', (5e7, None)),
+    ('$50,000,001 +', (50000001.0, None)),
+    ('$250,000', (250000.0, 250000.0)),
+    ('$15,001 - $50,000 Bonds', (15001.0, 50000.0)),
+    ('$15,001 - $50,000 M', (15001.0, 50000.0)),
+    ('Spouse, joint', (None, None)),
+    (',', (None, None)),
+    ('Undisclosed', (None, None)),
+    ('', (None, None)),
+    (None, (None, None)),
+    (15001.0, (15001.0, 15001.0)),
+])
+def test_parse_amount_range(text, expected):
+    assert parse_amount_range(text) == expected
+
+
+def test_a_quiver_trade_with_an_unparseable_amount_keeps_the_text():
+    trade = Trade.from_quiver({'Representative': 'Member 1', 'Ticker': 'LMT', 'Transaction': 'Purchase',
+                               'Amount': 'Spouse, joint', 'Date': '2024-02-01'})
+
+    assert (trade.amount_low, trade.amount_high) == (None, None)
+    assert trade.to_row()['amount_range'] == 'Spouse, joint'
@@ -0,0 +1,75 @@
+from scrapers.response_cache import ResponseCache
+
+
+def test_round_trip_keeps_records_and_meta(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    records = [{'Ticker': 'NVDA', 'Amount': 100}, {'Ticker': 'LMT', 'Amount': 200}]
+    cache.put('quiver', {'url': 'x'}, records, {'page': 1})
+
+    assert cache.get('quiver', {'url': 'x'}) == (records, {'page': 1})
+
+
+def test_round_trip_keeps_keys_missing_from_the_first_record(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    records = [
+        {'Representative': 'A', 'Date': '2024-01-01'},
+        {'Representative': 'B', 'Date': '2024-01-02', 'ReportDate': '2024-02-01'},
+    ]
+    cache.put('quiver', {'url': 'x'}, records)
+
+    assert cache.get('quiver', {'url': 'x'}) == (records, None)
+
+
+def test_round_trip_with_mixed_types(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    records = [{'Date': '2024-Q3'}, {'Date': 20240101}]
+    cache.put('quiver', {'url': 'x'}, records)
+
+    assert cache.get('quiver', {'url': 'x'})[0] == records
+
+
+def test_fetch_only_calls_the_fetcher_on_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        return [{'a': 1}], None
+
+    assert cache.fetch('src', {'k': 1}, fetcher) == ([{'a': 1}], None)
+    assert cache.fetch('src', {'k': 1}, fetcher) == ([{'a': 1}], None)
+    assert len(calls) == 1
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=-1)
+    cache.put('src', {'k': 1}, [{'a': 1}])
+
+    assert cache.get('src', {'k': 1}) is None
+
+
+def test_ints_and_floats_in_one_column_keep_their_types(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    records = [{'a': 1}, {'a': 2.5}, {'a': None}]
+    cache.put('quiver', {'url': 'x'}, records)
+
+    cached = cache.get('quiver', {'url': 'x'})[0]
+    assert cached == records
+    assert type(cached[0]['a']) is int
+
+
+def test_nested_records_come_back_as_they_were(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    records = [{'id': 1, 'meta': {'x': 1}}, {'id': 2, 'meta': {'y': 'b'}}]
+    cache.put('quiver', {'url': 'x'}, records)
+
+    assert cache.get('quiver', {'url': 'x'})[0] == records
+
+
+def test_flat_uniform_records_are_stored_as_columns(tmp_path):
+    import pyarrow.parquet as pq
+
+    cache = ResponseCache(str(tmp_path))
+    cache.put('quiver', {'url': 'x'}, [{'Ticker': 'NVDA', 'Amount': 100}, {'Ticker': 'LMT', 'Amount': None}])
+
+    assert pq.read_table(cache._latest('quiver', cache.key({'url': 'x'}))).column_names == ['Ticker', 'Amount']
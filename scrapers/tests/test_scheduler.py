@@ -0,0 +1,79 @@
+from argparse import Namespace
+from datetime import date
+
+import pytest
+
+from scrapers import federal_contracts_scraper, sync_state
+from scrapers.config import Config
+from scrapers.instrumentation import metrics
+from scrapers.scheduler import Job, Scheduler, build_jobs
+
+
+class FailingClient:
+    def table(self, name):
+        raise RuntimeError("database unavailable")
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    state = sync_state.SyncState(str(tmp_path / 'state.json'))
+    monkeypatch.setattr(sync_state, 'SyncState', lambda: state)
+    return state
+
+
+def _args():
+    return Namespace(usaspending_interval=1, quiver_interval=1, institutional_interval=1, correlation_interval=1,
+                     replicate_interval=1, usaspending_workers=1, institutional_workers=1, jitter=0,
+                     days_back=30, symbols_file=None)
+
+
+def test_failed_contract_write_fails_the_job_and_keeps_the_watermark(state, monkeypatch):
+    def fetch(tracker, days_back=30):
+        tracker._fetched_through = date(2024, 12, 31)
+        return tracker.get_mock_contracts()
+
+    monkeypatch.setattr('scrapers.config.get_config', lambda: Config())
+    monkeypatch.setattr(federal_contracts_scraper, 'get_store', lambda: FailingClient())
+    monkeypatch.setattr(federal_contracts_scraper.FederalContractsTracker, 'get_recent_contracts', fetch)
+    metrics.reset()
+
+    job = next(job for job in build_jobs(_args()) if job.name == 'usaspending')
+    job.slots.acquire()
+    changed = Scheduler([job]).run_job(job)
+
+    assert changed is False
+    assert metrics.summary()['counters'] == {'job_runs{job="usaspending",outcome="failed"}': 1}
+    assert state.get('usaspending') is None
+
+
+def test_triggered_job_waits_for_a_change():
+    runs = []
+    source = Job('source', 1, lambda: True)
+    follower = Job('follower', 1, lambda: runs.append(1), triggers=('source',))
+    scheduler = Scheduler([follower, source])
+
+    scheduler.run_once()
+    assert runs == []
+    scheduler.run_once()
+    assert runs == [1]
+
+
+def test_a_failed_triggered_run_is_retried_next_round():
+    attempts = []
+
+    def refresh():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return False
+
+    changes = iter([True, False, False])
+    source = Job('source', 1, lambda: next(changes))
+    follower = Job('follower', 1, refresh, triggers=('source',))
+    scheduler = Scheduler([source, follower])
+
+    scheduler.run_once()
+    scheduler.run_once()
+    scheduler.run_once()
+
+    assert len(attempts) == 2
@@ -0,0 +1,39 @@
+from scrapers.benchmarks import generators
+from scrapers.federal_contracts_scraper import FederalContractsTracker
+from scrapers.local_store import LocalStore
+from scrapers.streaming_correlations import CorrelationTableSink, JsonlSink, run_streaming
+
+TABLE_COLUMNS = ('politician', 'symbol', 'contract_id', 'first_trade_date', 'last_trade_date',
+                 'days_before_award', 'trade_count', 'score')
+
+
+def _store(size=2000, seed=0):
+    store = LocalStore(':memory:')
+    store.table('federal_contracts').insert(generators.make_contracts(size, seed)).execute()
+    store.table('congressional_trades').upsert(generators.make_congress_trades(size, seed),
+                                               on_conflict='politician_name,stock_symbol,transaction_date').execute()
+    return store
+
+
+def _table(store):
+    rows = store.table('contract_trade_correlations').select(','.join(TABLE_COLUMNS)).execute().data
+    return sorted(tuple(row[column] for column in TABLE_COLUMNS) for row in rows)
+
+
+def test_table_sink_writes_the_rows_refresh_writes():
+    streamed, refreshed = _store(), _store()
+
+    count = run_streaming(streamed, CorrelationTableSink(streamed, chunk_size=7))
+    FederalContractsTracker(client=refreshed).refresh_correlation_table(engine='python')
+
+    assert count
+    assert _table(streamed) == _table(refreshed)
+
+
+def test_plain_sinks_get_records_without_ids(tmp_path):
+    path = tmp_path / 'correlations.jsonl'
+
+    count = run_streaming(_store(), JsonlSink(str(path)))
+
+    assert count == len(path.read_text().splitlines())
+    assert '"contract_id"' not in path.read_text()
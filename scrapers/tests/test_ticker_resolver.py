@@ -0,0 +1,61 @@
+import pytest
+
+from scrapers.ticker_resolver import TickerResolver, get_resolver
+
+
+def _write(tmp_path, text):
+    path = tmp_path / 'aliases.csv'
+    path.write_text(text)
+    return str(path)
+
+
+def test_word_aliases_only_match_whole_words():
+    resolver = TickerResolver([('ge', 'GE', 'word'), ('intel', 'INTC', 'substring')])
+
+    assert resolver.resolve('GE Aerospace') == ('GE', 'ge')
+    assert resolver.resolve('Aerospace  (GE)') == ('GE', 'ge')
+    assert resolver.resolve('Georgia Power') is None
+    assert resolver.resolve('Sage Systems') is None
+    # Substring aliases keep the old hardcoded behaviour and match inside words
+    assert resolver.resolve('Intelligent Systems') == ('INTC', 'intel')
+
+
+def test_the_alias_listed_first_wins_when_several_match():
+    resolver = TickerResolver([('general dynamics', 'GD', None), ('dynamics', 'DYN', None),
+                               ('general', 'GEN', 'word')])
+
+    assert resolver.resolve('General Dynamics Land Systems') == ('GD', 'general dynamics')
+    assert resolver.matches('General Dynamics Land Systems') == (
+        ('GD', 'general dynamics'), ('DYN', 'dynamics'), ('GEN', 'general'))
+    assert resolver.resolve('Fluid Dynamics Inc') == ('DYN', 'dynamics')
+    assert resolver.tickers_in('general dynamics') == {'GD', 'DYN', 'GEN'}
+
+
+def test_the_shipped_table_resolves_contractors():
+    resolver = get_resolver()
+
+    assert resolver.symbol('LOCKHEED MARTIN CORPORATION') == 'LMT'
+    assert resolver.symbol('Amazon Web Services, Inc.') == 'AMZN'
+    assert resolver.symbol('Acme Widgets LLC') is None
+
+
+def test_rows_are_loaded_in_table_order(tmp_path):
+    path = _write(tmp_path, 'alias,ticker,match\n"Boeing, The",ba,word\nboeing,BAX,\n')
+
+    resolver = TickerResolver.from_csv(path)
+
+    assert resolver.aliases == [('boeing, the', 'BA', 'word'), ('boeing', 'BAX', 'substring')]
+    assert resolver.resolve('BOEING, THE CO') == ('BA', 'boeing, the')
+
+
+@pytest.mark.parametrize('row', [
+    ',MSFT,substring',        # blank alias, which would match every name
+    'microsoft\n',            # ticker missing
+    'microsoft,  ,word',      # blank ticker
+    'boeing, the,BA,word',    # unquoted comma shifts the columns
+])
+def test_a_malformed_row_is_rejected(tmp_path, row):
+    path = _write(tmp_path, f'alias,ticker,match\namazon,AMZN,substring\n{row}\n')
+
+    with pytest.raises(ValueError, match='Bad alias row'):
+        TickerResolver.from_csv(path)
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scrapers.http_transport import Transport
+from scrapers.instrumentation import metrics
+from scrapers.usaspending_fetcher import USAspendingFetcher
+
+START, END = date(2024, 1, 1), date(2024, 1, 31)
+
+
+def _awards():
+    awards = []
+    for offset in range((END - START).days + 1):
+        day = (START + timedelta(days=offset)).isoformat()
+        # Zero to three awards a day, so some windows are empty and some span several pages
+        for _ in range(offset % 4):
+            n = len(awards)
+            awards.append({'Award ID': f'A{n}', 'Recipient Name': f'Company {n}', 'Award Amount': 1e7 + n,
+                           'Awarding Agency': 'NASA', 'Start Date': day, 'generated_internal_id': f'CONT_{n}'})
+    return awards
+
+
+class StubUSAspending:
+    """Serves spending_by_award from a fixed list of awards on a local port.
+
+    fail maps (window start, page) to the HTTP status to answer that page
+    with, once.
+    """
+
+    def __init__(self, awards):
+        self.awards = awards
+        self.fail = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                status, body = stub.answer(self.path, payload)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/v2"
+
+    def answer(self, path, payload):
+        window = payload['filters']['time_period'][0]
+        page, limit = payload['page'], payload['limit']
+        self.requests.append((window['start_date'], page))
+        status = self.fail.pop((window['start_date'], page), None)
+        if status:
+            return status, {'detail': 'unavailable'}
+        if path != '/api/v2/search/spending_by_award/':
+            return 404, {'detail': 'not found'}
+
+        matches = sorted((a for a in self.awards if window['start_date'] <= a['Start Date'] <= window['end_date']),
+                         key=lambda a: a['Award Amount'], reverse=True)
+        results = matches[(page - 1) * limit:page * limit]
+        return 200, {'results': results, 'page_metadata': {'page': page, 'hasNext': page * limit < len(matches)}}
+
+
+def _page_count(awards, window_days=5, page_size=2):
+    """Requests a full run makes: one per page, and one for each empty window"""
+    count, start = 0, START
+    while start <= END:
+        end = min(start + timedelta(days=window_days - 1), END)
+        matches = sum(1 for a in awards if start.isoformat() <= a['Start Date'] <= end.isoformat())
+        count += max(1, -(-matches // page_size))
+        start = end + timedelta(days=1)
+    return count
+
+
+@pytest.fixture
+def stub():
+    stub = StubUSAspending(_awards())
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+def _fetcher(stub, **kwargs):
+    transport = Transport(rates={}, backoff=0, max_retries=2)
+    return USAspendingFetcher(stub.url, max_workers=3, window_days=5, page_size=2, transport=transport, **kwargs)
+
+
+def test_every_award_in_every_window_comes_back_once(stub):
+    ids = [award['generated_internal_id'] for award in _fetcher(stub).iter_awards(START, END)]
+
+    assert sorted(ids) == sorted(award['generated_internal_id'] for award in stub.awards)
+    # Each window is walked page by page until hasNext is false, and no page is asked for twice
+    assert len(set(stub.requests)) == len(stub.requests) == _page_count(stub.awards)
+    for start in {start for start, _ in stub.requests}:
+        pages = sorted(page for window_start, page in stub.requests if window_start == start)
+        assert pages == list(range(1, len(pages) + 1))
+
+
+def test_a_failing_page_is_retried(stub):
+    stub.fail[('2024-01-06', 2)] = 503
+    metrics.reset()
+
+    awards = list(_fetcher(stub).iter_awards(START, END))
+
+    assert len(awards) == len(stub.awards)
+    assert metrics.summary()['counters']['http_retries{source="usaspending"}'] == 1
+
+
+def test_a_rejected_page_stops_the_stream(stub):
+    stub.fail[('2024-01-11', 1)] = 400
+
+    with pytest.raises(requests.HTTPError):
+        list(_fetcher(stub).iter_awards(START, END))
+
+
+def test_closing_the_stream_early_stops_the_workers(stub):
+    awards = _fetcher(stub, queue_size=1).iter_awards(START, END)
+
+    first = [next(awards) for _ in range(3)]
+    awards.close()
+
+    sent = len(stub.requests)
+    time.sleep(0.2)
+    assert len(first) == 3
+    assert len(stub.requests) == sent
+    assert sent < _page_count(stub.awards)
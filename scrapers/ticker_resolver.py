@@ -0,0 +1,124 @@
+import csv
+import os
+from collections import deque
+from functools import lru_cache
+
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'company_tickers.csv')
+MATCH_MODES = ('substring', 'word')
+
+
+def normalize_name(name):
+    """Lowercase and collapse whitespace"""
+    return ' '.join((name or '').lower().split())
+
+
+class _Automaton:
+    """Aho-Corasick automaton: every pattern occurrence in one pass over the text"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.out[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def iter_matches(self, text):
+        """Yield (end, pattern_index) for every occurrence; end is exclusive"""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for index in self.out[state]:
+                yield position + 1, index
+
+
+class TickerResolver:
+    """Company name -> ticker lookup compiled from an alias table.
+
+    Each alias matches either as a raw substring (how the old hardcoded
+    dicts behaved) or as a whole word. When several aliases hit, the one
+    listed first in the table wins, which is how the old dict scans
+    picked. Lookups are memoized in an LRU cache.
+
+    A row with a blank alias or ticker, or an unknown match mode, raises
+    ValueError: a blank alias would otherwise match every name.
+    """
+
+    def __init__(self, aliases, cache_size=65536):
+        # aliases: (alias, ticker, match) rows in priority order
+        self.aliases = []
+        for row in aliases:
+            alias, ticker, match = row
+            alias, ticker, match = normalize_name(alias), (ticker or '').strip().upper(), match or 'substring'
+            if not alias or not ticker or match not in MATCH_MODES:
+                raise ValueError(f"Bad alias row: {row!r}")
+            self.aliases.append((alias, ticker, match))
+        self._automaton = _Automaton([alias for alias, _, _ in self.aliases])
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._all_matches)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_ALIASES_PATH, **kwargs):
+        with open(path, newline='') as f:
+            rows = [(row['alias'], row['ticker'], row.get('match')) for row in csv.DictReader(f)]
+        return cls(rows, **kwargs)
+
+    def _all_matches(self, name):
+        text = normalize_name(name)
+        hits = set()
+        for end, index in self._automaton.iter_matches(text):
+            alias, _, match = self.aliases[index]
+            if match == 'word':
+                start = end - len(alias)
+                if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                    continue
+            hits.add(index)
+        return tuple((self.aliases[index][1], self.aliases[index][0]) for index in sorted(hits))
+
+    def matches(self, name):
+        """Every (ticker, alias) found in the name, highest priority first"""
+        return self._resolve_cached(name)
+
+    def resolve(self, name):
+        """(ticker, matched alias) for the best match, or None"""
+        hits = self._resolve_cached(name)
+        return hits[0] if hits else None
+
+    def symbol(self, name):
+        hit = self.resolve(name)
+        return hit[0] if hit else None
+
+    def tickers_in(self, name):
+        """Set of every ticker mentioned in the name"""
+        return {ticker for ticker, _ in self._resolve_cached(name)}
+
+    def aliases_for(self, tickers):
+        """Aliases that map to any of these tickers, in table order"""
+        tickers = set(tickers)
+        return [alias for alias, ticker, _ in self.aliases if ticker in tickers]
+
+
+@lru_cache(maxsize=None)
+def get_resolver(path=DEFAULT_ALIASES_PATH):
+    """Shared resolver, compiled once per alias file"""
+    return TickerResolver.from_csv(path)
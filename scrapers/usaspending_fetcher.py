@@ -0,0 +1,167 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from .http_transport import get_transport
+
+BASE_URL = "https://api.usaspending.gov/api/v2"
+
+AWARD_FIELDS = [
+    "Award ID",
+    "Recipient Name",
+    "Award Amount",
+    "Awarding Agency",
+    "Start Date",
+    "Description",
+    "Place of Performance State Code",
+    "generated_internal_id"
+]
+
+_DONE = object()
+
+
+def date_windows(start_date, end_date, window_days):
+    """Split [start_date, end_date] into consecutive inclusive windows"""
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+        yield window_start, window_end
+        window_start = window_end + timedelta(days=1)
+
+
+def normalize_award(item, count=0):
+    """Map a spending_by_award row onto the federal_contracts columns"""
+    # Clean company name
+    recipient = item.get('Recipient Name', item.get('recipient_name', 'Unknown'))
+    if not recipient or recipient == 'MULTIPLE RECIPIENTS':
+        return None
+
+    return {
+        'company_name': recipient,
+        'contract_amount': float(item.get('Award Amount', item.get('total_obligation')) or 0),
+        'agency': item.get('Awarding Agency', item.get('awarding_agency', 'Unknown')),
+        'award_date': item.get('Start Date') or datetime.now().strftime('%Y-%m-%d'),
+        'description': item.get('Description', item.get('description', 'Federal Contract')),
+        'contract_id': item.get('generated_internal_id', f"CONTRACT-{count}"),
+        'state': item.get('Place of Performance State Code', item.get('recipient_state_code', '')) or ''
+    }
+
+
+class USAspendingFetcher:
+    """Streams every spending_by_award result for a date range.
+
+    The range is split into windows that are fetched in parallel through the
+    shared Transport; each worker walks all pages of its window. Pages go
+    through a bounded queue so memory stays flat however many awards come
+    back.
+    """
+
+    def __init__(self, base_url=BASE_URL, max_workers=4, window_days=7, page_size=100,
+                 min_amount=10000000, queue_size=8, transport=None, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.window_days = window_days
+        self.page_size = page_size
+        self.min_amount = min_amount
+        self.queue_size = queue_size
+        # Retries, rate limiting and connection pooling live in the transport
+        self.transport = transport or get_transport()
+        # Optional ResponseCache; fresh pages are read from disk instead of the API
+        self.cache = cache
+
+    def _payload(self, start_date, end_date, page):
+        return {
+            "limit": self.page_size,
+            "page": page,
+            "fields": AWARD_FIELDS,
+            "sort": "Award Amount",
+            "order": "desc",
+            "filters": {
+                "award_type_codes": ["A", "B", "C", "D"],  # Contract types
+                "award_amounts": [
+                    {
+                        "lower_bound": self.min_amount
+                    }
+                ],
+                "time_period": [
+                    {
+                        "date_type": "action_date",
+                        "start_date": start_date.isoformat(),
+                        "end_date": end_date.isoformat()
+                    }
+                ]
+            }
+        }
+
+    def _post(self, payload):
+        # A search is a read, so identical in-flight pages are only sent once
+        return self.transport.post_json(f"{self.base_url}/search/spending_by_award/", payload,
+                                        source='usaspending', timeout=60, coalesce=True)
+
+    def iter_pages(self, start_date, end_date):
+        """Walk every page of one window"""
+        page = 1
+        while True:
+            results, page_metadata = self._fetch_page(self._payload(start_date, end_date, page))
+            if results:
+                yield results
+
+            if not (page_metadata or {}).get('hasNext') or not results:
+                return
+            page += 1
+
+    def _fetch_page(self, payload):
+        def fetch():
+            data = self._post(payload)
+            return data.get('results', []), data.get('page_metadata', {})
+
+        if self.cache is None:
+            return fetch()
+        return self.cache.fetch('usaspending', {'url': self.base_url, **payload}, fetch)
+
+    def iter_awards(self, start_date, end_date):
+        """Yield raw award rows for every window, fetched in parallel"""
+        windows = list(date_windows(start_date, end_date, self.window_days))
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch_window(window):
+            try:
+                for results in self.iter_pages(*window):
+                    if not put(results):
+                        return
+                put(_DONE)
+            except Exception as e:
+                put(e)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for window in windows:
+                executor.submit(fetch_window, window)
+
+            remaining = len(windows)
+            while remaining:
+                item = pages.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_recent_awards(self, days_back=30, end_date=None):
+        end_date = end_date or date.today()
+        return self.iter_awards(end_date - timedelta(days=days_back), end_date)
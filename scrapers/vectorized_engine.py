@@ -0,0 +1,222 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .correlation_engine import MAX_DAYS_DIFF, MIN_DAYS_DIFF, parse_trade_date
+from .instrumentation import metrics
+
+DAY_US = 86_400 * 1_000_000
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(dt):
+    """Microseconds since epoch; aware datetimes are taken in UTC"""
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - dt.utcoffset()
+    delta = dt - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _parse_column(values, parser):
+    """Parse a column of date strings once into (datetime64[us], aware, valid)"""
+    n = len(values)
+    micros = np.zeros(n, dtype=np.int64)
+    aware = np.zeros(n, dtype=bool)
+    valid = np.zeros(n, dtype=bool)
+
+    for i, value in enumerate(values):
+        try:
+            dt = parser(value)
+        except Exception:
+            continue
+        aware[i] = dt.tzinfo is not None
+        micros[i] = _to_micros(dt)
+        valid[i] = True
+
+    return micros.astype('datetime64[us]'), aware, valid
+
+
+def load_frame(symbols, dates, parser, amounts=None):
+    """Typed columnar view of a row set: categorical symbols, datetime64 dates, float64 amounts"""
+    date_values, aware, valid = _parse_column(dates, parser)
+    frame = pd.DataFrame({
+        'position': np.arange(len(dates), dtype=np.int64),
+        'symbol': pd.Categorical(symbols),
+        'date': date_values,
+        'aware': aware,
+        'valid': valid,
+    })
+    if amounts is not None:
+        frame['amount'] = pd.to_numeric(pd.Series(amounts, dtype=object), errors='coerce').astype(np.float64)
+    return frame
+
+
+def window_join(left_keys, left_dates, right_keys, right_dates, min_delta_us, max_delta_us):
+    """Range join on equal keys.
+
+    Returns (left_idx, right_idx, delta_us) for every pair with
+    left_keys[i] == right_keys[j] and
+    min_delta_us <= left_dates[i] - right_dates[j] <= max_delta_us.
+    Keys are non-negative ints; dates are datetime64[us] arrays.
+    """
+    left_keys = np.asarray(left_keys, dtype=np.int64)
+    right_keys = np.asarray(right_keys, dtype=np.int64)
+    left_t = np.asarray(left_dates, dtype='datetime64[us]').astype(np.int64)
+    right_t = np.asarray(right_dates, dtype='datetime64[us]').astype(np.int64)
+
+    order = np.lexsort((right_t, right_keys))
+    sorted_keys = right_keys[order]
+    sorted_t = right_t[order]
+
+    lo = np.zeros(len(left_keys), dtype=np.int64)
+    hi = np.zeros(len(left_keys), dtype=np.int64)
+
+    # One searchsorted per key partition, vectorized over every left row in it
+    group_keys, group_starts = np.unique(sorted_keys, return_index=True)
+    group_ends = np.append(group_starts[1:], len(sorted_keys))
+    for key, start, end in zip(group_keys, group_starts, group_ends):
+        rows = np.flatnonzero(left_keys == key)
+        if not len(rows):
+            continue
+        times = sorted_t[start:end]
+        lo[rows] = start + np.searchsorted(times, left_t[rows] - max_delta_us, side='left')
+        hi[rows] = start + np.searchsorted(times, left_t[rows] - min_delta_us, side='right')
+
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    left_idx = np.repeat(np.arange(len(left_keys), dtype=np.int64), counts)
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_idx = order[np.repeat(lo, counts) + offsets]
+
+    return left_idx, right_idx, left_t[left_idx] - right_t[right_idx]
+
+
+def _partition_codes(symbol_codes, aware):
+    """Naive and aware dates can't be compared, so they never share a partition"""
+    return np.asarray(symbol_codes, dtype=np.int64) * 2 + np.asarray(aware, dtype=np.int64)
+
+
+def _match_symbols(company_names, resolver):
+    """(symbol, matched alias) per company, resolving each distinct name once"""
+    lookup = {name: resolver.resolve(name) or (None, None)
+              for name in pd.unique(pd.Series(company_names, dtype=object))}
+    return [lookup[name] for name in company_names]
+
+
+def contract_trade_correlations(contracts, trades, resolver,
+                                min_days=MIN_DAYS_DIFF, max_days=MAX_DAYS_DIFF, include_ids=False):
+    """Vectorized twin of correlation_engine.correlate_contracts"""
+    if not contracts or not trades:
+        return []
+
+    with metrics.stage('match') as stage:
+        matches = _match_symbols([c['company_name'] for c in contracts], resolver)
+        stage.rows = len(contracts)
+    contract_symbols = [symbol for symbol, _ in matches]
+    buys = [t for t in trades if t['transaction_type'] == 'BUY']
+    categories = pd.Index(sorted({s for s in contract_symbols if s is not None} | {t['stock_symbol'] for t in buys}))
+
+    contract_frame = load_frame(
+        pd.Categorical(contract_symbols, categories=categories),
+        [c['award_date'] for c in contracts],
+        datetime.fromisoformat,
+        [c['contract_amount'] for c in contracts]
+    )
+    trade_frame = load_frame(
+        pd.Categorical([t['stock_symbol'] for t in buys], categories=categories),
+        [t['transaction_date'] for t in buys],
+        parse_trade_date
+    )
+
+    left = contract_frame[(contract_frame['symbol'].cat.codes >= 0) & contract_frame['valid']]
+    right = trade_frame[trade_frame['valid']]
+
+    with metrics.stage('join') as stage:
+        left_idx, right_idx, delta = window_join(
+            _partition_codes(left['symbol'].cat.codes, left['aware']), left['date'].to_numpy(),
+            _partition_codes(right['symbol'].cat.codes, right['aware']), right['date'].to_numpy(),
+            min_days * DAY_US, (max_days + 1) * DAY_US - 1
+        )
+        stage.rows = len(left_idx)
+
+    contract_pos = left['position'].to_numpy()[left_idx]
+    trade_pos = right['position'].to_numpy()[right_idx]
+    days = np.floor_divide(delta, DAY_US)
+    order = np.lexsort((trade_pos, contract_pos))
+
+    correlations = []
+    for i in order:
+        contract = contracts[contract_pos[i]]
+        trade = buys[trade_pos[i]]
+        correlation = {
+            'politician': trade['politician_name'],
+            'stock': contract_symbols[contract_pos[i]],
+            'company': contract['company_name'],
+            'trade_date': trade['transaction_date'][:10],
+            'contract_date': contract['award_date'],
+            'days_before_award': int(days[i]),
+            'contract_amount': contract['contract_amount'],
+            'agency': contract['agency']
+        }
+        if include_ids:
+            correlation['contract_id'] = contract['contract_id']
+            correlation['matched_alias'] = matches[contract_pos[i]][1]
+        correlations.append(correlation)
+    return correlations
+
+
+def quiver_correlations(congress, contracts, resolver, max_days=60):
+    """Vectorized twin of the QuiverClient.find_correlations loop"""
+    if not congress or not contracts:
+        return []
+
+    # One (contract, ticker) pair per ticker mentioned in the company name
+    pair_contracts = []
+    pair_tickers = []
+    for position, contract in enumerate(contracts):
+        for ticker in sorted(resolver.tickers_in(contract.get('Company'))):
+            pair_contracts.append(position)
+            pair_tickers.append(ticker)
+    pair_contracts = np.asarray(pair_contracts, dtype=np.int64)
+
+    categories = pd.Index(sorted(set(pair_tickers)))
+    contract_dates, contract_aware, contract_valid = _parse_column(
+        [contracts[i]['Date'] for i in pair_contracts], datetime.fromisoformat
+    )
+    trade_frame = load_frame(
+        # Tickers no contract mentions get code -1, which the join drops
+        pd.Categorical.from_codes(categories.get_indexer([t.get('Ticker') for t in congress]), categories=categories),
+        [t['Date'] for t in congress],
+        datetime.fromisoformat
+    )
+    contract_codes = pd.Categorical(pair_tickers, categories=categories).codes
+
+    keep = contract_valid
+    right = trade_frame[(trade_frame['symbol'].cat.codes >= 0) & trade_frame['valid']]
+
+    # trade_date < contract_date and (contract_date - trade_date).days < max_days
+    left_idx, right_idx, delta = window_join(
+        _partition_codes(contract_codes[keep], contract_aware[keep]), contract_dates[keep],
+        _partition_codes(right['symbol'].cat.codes, right['aware']), right['date'].to_numpy(),
+        1, max_days * DAY_US - 1
+    )
+
+    contract_pos = pair_contracts[keep][left_idx]
+    trade_pos = right['position'].to_numpy()[right_idx]
+    days = np.floor_divide(delta, DAY_US)
+    order = np.lexsort((contract_pos, trade_pos))
+
+    correlations = []
+    for i in order:
+        trade = congress[trade_pos[i]]
+        correlations.append({
+            'alert_type': 'CONGRESS_CONTRACT_CORRELATION',
+            'politician': trade['Representative'],
+            'stock': trade['Ticker'],
+            'trade_date': trade['Date'][:10],
+            'contract_value': contracts[contract_pos[i]]['Amount'],
+            'days_before_award': int(days[i]),
+            'confidence': 'HIGH'
+        })
+    return correlations